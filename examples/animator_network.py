@@ -50,7 +50,7 @@ viewport.add(pixels)
 # Render the scene with matplotlib
 #
 camera = gsp.core.Camera(camera_type="perspective")
-network_renderer = gsp_network.NetworkRenderer(server_url="http://localhost:5000/", jsondiff_allowed=False)
+network_renderer = gsp_network.NetworkRenderer(server_url="http://localhost:5000/", jsondiff_allowed=False, frame_format="rgba_zlib")
 gsp_animator = GspAnimatorNetwork(network_renderer)
 
 # =============================================================================
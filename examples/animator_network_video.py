@@ -55,7 +55,7 @@ for i in range(n_points):
 # Render the scene with matplotlib
 #
 camera = gsp.core.Camera(camera_type="ortho")
-renderer = gsp_network.NetworkRenderer(server_url="http://localhost:5000/", jsondiff_allowed=True)
+renderer = gsp_network.NetworkRenderer(server_url="http://localhost:5000/", jsondiff_allowed=True, frame_format="rgba_zlib")
 renderer.render(canvas, [viewport], [camera])
 
 video_path = os.path.join(__dirname__, f"output/{os.path.basename(__file__).replace('.py', '')}.mp4")
@@ -1,5 +1,4 @@
 # stdlib imports
-import io
 import os
 import __main__
 import time
@@ -142,16 +141,15 @@ class GspAnimatorNetwork:
                 changed_visuals.extend(_changed_visuals)
 
             # render the scene to get the new image
-            image_png_data = self._network_renderer.render(canvas, canvas.viewports, cameras)
+            image_data_np = self._network_renderer.render_rgba(canvas, canvas.viewports, cameras)
             # get the main script name
             main_script_name = os.path.basename(__main__.__file__) if hasattr(__main__, "__file__") else "interactive"
             main_script_basename = os.path.splitext(main_script_name)[0]
             # buid the output image path
             image_path = os.path.join(__dirname__, "../../output", f"{main_script_basename}_animator.png")
             image_path = os.path.abspath(image_path)
-            # save image_png_data in a image file
-            with open(image_path, "wb") as image_file:
-                image_file.write(image_png_data)
+            # save image_data_np in a image file
+            matplotlib.image.imsave(image_path, image_data_np)
             # log the event
             print(f"Saved animation preview image to: {image_path}")
             return
@@ -214,10 +212,8 @@ class GspAnimatorNetwork:
         assert self._viewports is not None, f"PANIC self._viewports is None"
         assert self._cameras is not None, f"PANIC self._cameras is None"
 
-        # render the scene to get the new image
-        image_png_data = self._network_renderer.render(self._canvas, self._viewports, self._cameras)
-        image_data_io = io.BytesIO(image_png_data)
-        image_data_np = matplotlib.image.imread(image_data_io, format="png")
+        # render the scene to get the new image - decoded according to the frame_format of the network renderer
+        image_data_np = self._network_renderer.render_rgba(self._canvas, self._viewports, self._cameras)
 
         assert self._axes_image is not None, f"PANIC self._axes_image is None"
         # update the image data
@@ -1,6 +1,6 @@
 import numpy as np
 from typing import Literal, Any
-from gsp.transform import TransformLinkBase, TransformRegistry
+from gsp.transform import TransformLinkBase, TransformRegistry, TransformElementwiseOp
 
 
 # =============================================================================
@@ -35,6 +35,13 @@ class TransformLinkMathOp(TransformLinkBase):
 
         return result
 
+    def _get_elementwise_op(self) -> TransformElementwiseOp | None:
+        # an elementwise operation - it is fused with the neighbour elementwise links, see TransformPlan
+        ufuncs = {"add": np.add, "sub": np.subtract, "mul": np.multiply, "div": np.true_divide}
+        if self.__operation not in ufuncs:
+            return None
+        return TransformElementwiseOp(ufuncs[self.__operation], self.__operand)
+
     def _to_json(self) -> dict[str, Any]:
         return {"type": "TransformMathOp", "operation": self.__operation, "operand": self.__operand}
 
@@ -8,7 +8,7 @@ from .random import Random
 
 
 class Camera:
-    __slots__ = ["uuid", "camera_type", "__position", "__mpl3d_camera"]
+    __slots__ = ["uuid", "camera_type", "__position", "__mpl3d_camera", "__version", "__versioned_transform"]
 
     def __init__(self, camera_type: Literal["ortho", "perspective"]):
         self.uuid = Random.random_uuid()
@@ -23,6 +23,12 @@ class Camera:
         self.__mpl3d_camera = mpl3d.camera.Camera(mode=camera_type)
         """The internal mpl3d camera """
 
+        self.__version = 0
+        """The number of modifications of the camera transform - see .get_version()"""
+
+        self.__versioned_transform = self.__mpl3d_camera.transform.copy()
+        """The transform at the last .get_version(), to detect the changes made directly on the mpl3d camera"""
+
     # A getter for the internal mpl3d camera.transform
     @property
     def transform(self) -> np.ndarray:
@@ -33,6 +39,16 @@ class Camera:
     def mpl3d_camera(self) -> mpl3d.camera.Camera:
         return self.__mpl3d_camera
 
+    def get_version(self) -> int:
+        """
+        Return the version of the camera transform. It changes each time the transform is modified - by .set_position(),
+        or directly on the mpl3d camera, e.g. by the mouse interaction - so renderers can skip the work for unchanged cameras.
+        """
+        if not np.array_equal(self.__versioned_transform, self.__mpl3d_camera.transform):
+            self.__versioned_transform = self.__mpl3d_camera.transform.copy()
+            self.__version += 1
+        return self.__version
+
     def get_position(self) -> np.ndarray:
         return self.__position.copy()
 
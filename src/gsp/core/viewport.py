@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import typing
+
 from .visual_base import VisualBase
 from .random import Random
 from .canvas import Canvas
@@ -15,6 +17,7 @@ class Viewport:
         "background_color",
         "_canvas",
         "visuals",
+        "_version",
     )
 
     def __init__(self, origin_x: int, origin_y: int, width: int, height: int, background_color: tuple[float, float, float, float] = (1, 1, 1, 1)) -> None:
@@ -28,6 +31,8 @@ class Viewport:
             height (int): The height of the viewport in the Canvas.
             background_color (tuple[float, float, float, float]): The background color of the viewport.
         """
+        self._version = 0
+        """The number of modifications of the viewport - see .get_version()"""
         self.uuid = Random.random_uuid()
         """The unique identifier of the viewport"""
         self.origin_x = origin_x
@@ -54,6 +59,7 @@ class Viewport:
             visual (VisualBase): The visual to add.
         """
         self.visuals.append(visual)
+        self._version += 1
 
     def remove(self, visual: VisualBase) -> None:
         """
@@ -63,6 +69,22 @@ class Viewport:
             visual (VisualBase): The visual to remove.
         """
         self.visuals.remove(visual)
+        self._version += 1
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        object.__setattr__(self, name, value)
+        # any assignment of a public attribute modifies the viewport
+        if not name.startswith("_"):
+            object.__setattr__(self, "_version", getattr(self, "_version", 0) + 1)
+
+    def get_version(self) -> int:
+        """
+        Return the version of the viewport. It changes each time the viewport is modified - attribute assignments,
+        .add() and .remove() - so renderers can skip the work for unchanged viewports.
+
+        NOTE: it does not include the version of its visuals, see VisualBase.get_version()
+        """
+        return self._version
 
     def set_canvas(self, canvas: Canvas | None) -> None:
         """
@@ -1,15 +1,33 @@
+# stdlib imports
+import typing
+import zlib
+
 # pip imports
 import blinker
+import numpy as np
 
 # local imports
 from .random import Random
 from .event import Event
+from .texture import Texture
+from ..types.diffable_ndarray.diffable_ndarray import DiffableNdarray
+from ..transform.transform_link_base import TransformLinkBase
 
 
 class VisualBase:
-    __slots__ = ("uuid", "pre_rendering", "post_transform", "post_rendering")
+    __slots__ = ("uuid", "pre_rendering", "post_transform", "post_rendering", "_version")
+
+    NDARRAY_CHECKSUM_ENABLED = False
+    """
+    True to track the in-place writes to the writeable np.ndarray attributes with a checksum of their content, at each .get_version().
+    It costs O(data) per call - i.e. per frame. By default, such a visual is not tracked, and always considered modified:
+    use DiffableNdarray or read-only arrays for the visuals to skip when unchanged.
+    """
 
     def __init__(self) -> None:
+        self._version = 0
+        """The number of attribute assignments of the visual - see .get_version()"""
+
         self.uuid = Random.random_uuid()
         """
         The unique identifier of the visual.
@@ -39,3 +57,65 @@ class VisualBase:
 
         self.post_rendering = blinker.Signal()
         """Event triggered after rendering the visual."""
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        object.__setattr__(self, name, value)
+        # any assignment of a public attribute modifies the visual
+        if not name.startswith("_"):
+            object.__setattr__(self, "_version", getattr(self, "_version", 0) + 1)
+
+    def get_version(self) -> tuple[typing.Any, ...] | None:
+        """
+        Return the version of the visual. It changes each time the visual is modified, so renderers can skip
+        the work for unchanged visuals by comparing it with the version of the previous rendering.
+
+        It covers the attribute assignments, the writes to DiffableNdarray attributes, and the changes of transform
+        chain attributes (through their fingerprint, see TransformLinkBase.run()). The read-only np.ndarray attributes
+        can not change in place. The writeable ones can not notify their writes, see NDARRAY_CHECKSUM_ENABLED.
+
+        Returns:
+            tuple | None: the version, or None if the visual can not be tracked - e.g. a list attribute, or a writeable
+                np.ndarray attribute. Such a visual must always be considered modified.
+        """
+        attribute_versions: list[typing.Any] = [self._version]
+        for attribute_name in VisualBase.__get_attribute_names(type(self)):
+            attribute_version = VisualBase.get_value_version(getattr(self, attribute_name, None))
+            if attribute_version is None:
+                return None
+            attribute_versions.append(attribute_version)
+        return tuple(attribute_versions)
+
+    @staticmethod
+    def __get_attribute_names(visual_class: type) -> list[str]:
+        """
+        Return the public data attributes of a visual class, from the __slots__ of the visual classes.
+        """
+        attribute_names: list[str] = []
+        for mro_class in visual_class.__mro__:
+            if mro_class is VisualBase or not issubclass(mro_class, VisualBase):
+                continue
+            slots = mro_class.__dict__.get("__slots__", ())
+            attribute_names.extend(slot for slot in ((slots,) if isinstance(slots, str) else slots) if not slot.startswith("_"))
+        return attribute_names
+
+    @staticmethod
+    def get_value_version(value: typing.Any) -> typing.Any:
+        """
+        Return the version of an attribute value, or None if it can not be tracked - see .get_version().
+        NOTE: it is not unique across values, e.g. 0 for all the read-only np.ndarray - compare the value identity too.
+        """
+        if isinstance(value, DiffableNdarray):
+            return value.get_version()
+        if isinstance(value, np.ndarray):
+            if not value.flags.writeable:
+                return 0
+            if not VisualBase.NDARRAY_CHECKSUM_ENABLED or value.dtype.hasobject:
+                return None
+            return zlib.crc32(np.ascontiguousarray(value).view(np.uint8))
+        if isinstance(value, Texture):
+            return VisualBase.get_value_version(value.image_data)
+        if isinstance(value, TransformLinkBase):
+            return value.get_fingerprint()
+        if isinstance(value, (list, dict)):
+            return None
+        return 0
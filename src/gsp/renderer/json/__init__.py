@@ -1,2 +1,3 @@
 from .renderer import JsonRenderer
-from .parser import JsonParser
\ No newline at end of file
+from .parser import JsonParser
+from .scene_delta import SceneDelta, SceneDeltaType, SceneOwnedArraysType
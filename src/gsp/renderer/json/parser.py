@@ -15,7 +15,7 @@ from ...core import Texture
 from ...visuals import Pixels
 from ...visuals import Image
 from ...visuals import Mesh
-from ...types import NdarrayLikeUtils, DiffableNdarrayDb
+from ...types import NdarrayLikeUtils, DiffableNdarrayDb, NdarraySerialisation
 
 
 class JsonParser:
@@ -23,25 +23,54 @@ class JsonParser:
     A parser to convert a JSON representation of a scene into GSP objects.
     """
 
-    def __init__(self) -> None:
-        self._diffable_ndarray_db = DiffableNdarrayDb()
+    def __init__(self, diffable_ndarray_db: DiffableNdarrayDb | None = None, reuse_objects: bool = False) -> None:
+        """
+        Arguments:
+            diffable_ndarray_db (DiffableNdarrayDb | None): the database of the DiffableNdarray received.
+                None for a new unbounded one. see DiffableNdarrayLruStore to bound it.
+            reuse_objects (bool): True to return the objects of the previous .parse() when their part of the scene is unchanged.
+                Visuals are always reused, and only their attributes which are not the very same object as in the previous
+                SceneDict are parsed again, and set on the visual - e.g. a SceneDict kept up to date with SceneDelta.apply().
+        """
+        self._diffable_ndarray_db = diffable_ndarray_db if diffable_ndarray_db is not None else DiffableNdarrayDb()
+        self._reuse_objects = reuse_objects
+        """True to reuse the objects of the previous .parse() when unchanged"""
+        self._parsed_objects: dict[str, tuple[dict[str, Any], Any]] = {}
+        """The objects of the previous .parse(), with a shallow copy of their info. Keyed by kind and uuid"""
 
     # =============================================================================
     # .parse()
     # =============================================================================
 
-    def parse(self, _scene: str | SceneDict) -> tuple[Canvas, list[Viewport], list[Camera]]:
+    def parse(self, _scene: str | bytes | SceneDict) -> tuple[Canvas, list[Viewport], list[Camera]]:
+        """
+        Parse a scene into GSP objects.
+
+        Arguments:
+            _scene (str | bytes | SceneDict): the scene as a SceneDict, as a JSON string,
+                or as msgpack bytes produced by NdarraySerialisation.to_msgpack()
+        """
         if isinstance(_scene, dict):
             scene_dict: SceneDict = _scene
+        elif isinstance(_scene, bytes):
+            scene_dict: SceneDict = NdarraySerialisation.from_msgpack(_scene)
         else:
             scene_dict: SceneDict = json.loads(_scene)
 
         # =============================================================================
         # parse canvas_info
         # =============================================================================
+        previous_objects = self._parsed_objects
+        self._parsed_objects = {}
+
         canvas_info = scene_dict["canvas"]
-        canvas = Canvas(canvas_info["width"], canvas_info["height"], canvas_info["dpi"])
-        canvas.uuid = canvas_info["uuid"]  # restore the original uuid
+        canvas = self._reuse_object(previous_objects, f"canvas:{canvas_info['uuid']}", canvas_info)
+        if canvas is not None:
+            canvas.viewports = []
+        else:
+            canvas = Canvas(canvas_info["width"], canvas_info["height"], canvas_info["dpi"])
+            canvas.uuid = canvas_info["uuid"]  # restore the original uuid
+        self._keep_object(f"canvas:{canvas_info['uuid']}", canvas_info, canvas)
 
         # =============================================================================
         # sanity check
@@ -63,45 +92,60 @@ class JsonParser:
             # parse camera_info
             # =============================================================================
 
-            camera = Camera(camera_info["type"])
-            camera.uuid = camera_info["uuid"]  # restore the original uuid
+            camera = self._reuse_object(previous_objects, f"camera:{camera_info['uuid']}", camera_info)
+            if camera is None:
+                camera = Camera(camera_info["type"])
+                camera.uuid = camera_info["uuid"]  # restore the original uuid
+            self._keep_object(f"camera:{camera_info['uuid']}", camera_info, camera)
             cameras.append(camera)
             # =============================================================================
             # parse viewport_info
             # =============================================================================
-            viewport = Viewport(
-                origin_x=viewport_info["origin_x"],
-                origin_y=viewport_info["origin_y"],
-                width=viewport_info["width"],
-                height=viewport_info["height"],
-                background_color=viewport_info["background_color"],
-            )
-            # restore the original uuid
-            viewport.uuid = viewport_info["uuid"]
+            viewport = self._reuse_object(previous_objects, f"viewport:{viewport_info['uuid']}", viewport_info)
+            if viewport is not None:
+                viewport.visuals = []
+            else:
+                viewport = Viewport(
+                    origin_x=viewport_info["origin_x"],
+                    origin_y=viewport_info["origin_y"],
+                    width=viewport_info["width"],
+                    height=viewport_info["height"],
+                    background_color=viewport_info["background_color"],
+                )
+                # restore the original uuid
+                viewport.uuid = viewport_info["uuid"]
+            self._keep_object(f"viewport:{viewport_info['uuid']}", viewport_info, viewport)
             canvas.add(viewport)
             viewports.append(viewport)
 
             for visual_info in viewport_info["visuals"]:
+                visual_key = f"visual:{viewport_info['uuid']}:{visual_info['uuid']}"
+                reused_visual = self._update_visual(previous_objects, visual_key, visual_info)
+                if reused_visual is not None:
+                    self._keep_object(visual_key, visual_info, reused_visual)
+                    viewport.add(reused_visual)
+                    continue
+
                 if visual_info["type"] == "Pixels":
                     pixels = Pixels(
-                        positions=NdarrayLikeUtils.from_json(visual_info["positions"], self._diffable_ndarray_db),
-                        sizes=NdarrayLikeUtils.from_json(visual_info["sizes"], self._diffable_ndarray_db),
-                        colors=NdarrayLikeUtils.from_json(visual_info["colors"], self._diffable_ndarray_db),
+                        positions=JsonParser._read_only(NdarrayLikeUtils.from_json(visual_info["positions"], self._diffable_ndarray_db)),
+                        sizes=JsonParser._read_only(NdarrayLikeUtils.from_json(visual_info["sizes"], self._diffable_ndarray_db)),
+                        colors=JsonParser._read_only(NdarrayLikeUtils.from_json(visual_info["colors"], self._diffable_ndarray_db)),
                     )
                     # restore the original uuid
                     pixels.uuid = visual_info["uuid"]
                     visual = pixels
                 elif visual_info["type"] == "Image":
                     texture = JsonParser._texture_from_json(visual_info["texture"])
-                    image = Image(position=np.array(visual_info["position"]), image_extent=visual_info["bounds"], texture=texture)
+                    image = Image(position=JsonParser._read_only(NdarraySerialisation.from_json(visual_info["position"])), image_extent=visual_info["bounds"], texture=texture)
                     # restore the original uuid
                     image.uuid = visual_info["uuid"]
                     visual = image
                 elif visual_info["type"] == "Mesh":
                     cmap = None if visual_info["cmap"] is None else matplotlib.pyplot.get_cmap(visual_info["cmap"])
                     mesh = Mesh(
-                        vertices_coords=np.array(visual_info["vertices"]),
-                        faces_indices=np.array(visual_info["faces"]),
+                        vertices_coords=JsonParser._read_only(NdarraySerialisation.from_json(visual_info["vertices"])),
+                        faces_indices=JsonParser._read_only(NdarraySerialisation.from_json(visual_info["faces"])),
                         cmap=cmap,
                         facecolors=visual_info.get("facecolors", "white"),
                         edgecolors=visual_info.get("edgecolors", "black"),
@@ -114,6 +158,7 @@ class JsonParser:
                 else:
                     raise NotImplementedError(f"Parsing for visual type {visual_info['type']} is not implemented.")
 
+                self._keep_object(visual_key, visual_info, visual)
                 viewport.add(visual)
 
         # =============================================================================
@@ -122,8 +167,96 @@ class JsonParser:
 
         return canvas, viewports, cameras
 
+    # =============================================================================
+    # Object reuse - see reuse_objects
+    # =============================================================================
+
+    def _reuse_object(self, previous_objects: dict[str, tuple[dict[str, Any], Any]], key: str, info: dict[str, Any]) -> Any:
+        """
+        Return the object parsed from this key by the previous .parse() if its info is unchanged, None otherwise.
+        The nested lists ("cameras", "viewports", "visuals") are not compared, they are parsed separately.
+        """
+        if self._reuse_objects is False or key not in previous_objects:
+            return None
+        previous_info, previous_object = previous_objects[key]
+        if previous_info.keys() != info.keys():
+            return None
+        for info_key, value in info.items():
+            if info_key in ("cameras", "viewports", "visuals"):
+                continue
+            if previous_info[info_key] != value:
+                return None
+        return previous_object
+
+    def _update_visual(self, previous_objects: dict[str, tuple[dict[str, Any], Any]], key: str, visual_info: dict[str, Any]) -> Any:
+        """
+        Return the visual parsed from this key by the previous .parse(), with its changed attributes set in place - so it keeps
+        its uuid, its version counter and its cached data, e.g. its spatial index or its LOD pyramid. None if it can not be updated.
+        The attributes are compared by identity, as they are big values like arrays.
+        """
+        if self._reuse_objects is False or key not in previous_objects:
+            return None
+        previous_info, visual = previous_objects[key]
+        if previous_info.keys() != visual_info.keys() or previous_info["type"] != visual_info["type"]:
+            return None
+        changed_keys = [info_key for info_key, value in visual_info.items() if info_key not in ("type", "uuid") and previous_info[info_key] is not value]
+        if not all(self._set_visual_attribute(visual, info_key, visual_info[info_key]) for info_key in changed_keys):
+            return None
+        return visual
+
+    def _set_visual_attribute(self, visual: Any, info_key: str, value: Any) -> bool:
+        """
+        Parse the value of a visual attribute, and set it on the visual - the assignment bumps the version of the visual.
+        Return False if the attribute is unknown, so the visual is parsed again.
+        """
+        if isinstance(visual, Pixels) and info_key in ("positions", "sizes", "colors"):
+            setattr(visual, info_key, JsonParser._read_only(NdarrayLikeUtils.from_json(value, self._diffable_ndarray_db)))
+        elif isinstance(visual, Image) and info_key == "position":
+            visual.position = JsonParser._read_only(NdarraySerialisation.from_json(value))
+        elif isinstance(visual, Image) and info_key == "bounds":
+            visual.image_extent = value
+        elif isinstance(visual, Image) and info_key == "texture":
+            visual.texture = JsonParser._texture_from_json(value)
+        elif isinstance(visual, Mesh) and info_key == "vertices":
+            visual.vertices_coords = JsonParser._read_only(NdarraySerialisation.from_json(value))
+        elif isinstance(visual, Mesh) and info_key == "faces":
+            visual.face_indices = JsonParser._read_only(NdarraySerialisation.from_json(value))
+        elif isinstance(visual, Mesh) and info_key == "cmap":
+            visual.cmap = None if value is None else matplotlib.pyplot.get_cmap(value)
+        elif isinstance(visual, Mesh) and info_key in ("facecolors", "edgecolors"):
+            setattr(visual, info_key, Mesh.to_rgba_colors(value))
+        elif isinstance(visual, Mesh) and info_key == "linewidths":
+            visual.linewidths = value
+        elif isinstance(visual, Mesh) and info_key == "mode":
+            visual.culling_mode = value
+        else:
+            return False
+        return True
+
+    def _keep_object(self, key: str, info: dict[str, Any], parsed_object: Any) -> None:
+        """
+        Keep the object parsed from this key, for the next .parse() to reuse it. see reuse_objects
+        """
+        if self._reuse_objects is False:
+            return
+        # shallow copy - the info dict may be updated in place, e.g. by SceneDelta.apply()
+        self._parsed_objects[key] = (dict(info), parsed_object)
+
+    @staticmethod
+    def _read_only(value: Any) -> Any:
+        """
+        Return a parsed np.ndarray as a read-only view - the attributes are replaced at the next .parse(), never modified
+        in place, so the renderers can skip the unchanged visuals, see VisualBase.get_version(). A view, as the array may
+        be shared, e.g. a binary leaf of the SceneDict.
+        """
+        if type(value) is not np.ndarray or not value.flags.writeable:
+            return value
+        read_only_value = value.view()
+        read_only_value.flags.writeable = False
+        return read_only_value
+
     @staticmethod
     def _texture_from_json(texture_dict: dict[str, Any]) -> Texture:
-        image_data = np.array(texture_dict["image_data"]).reshape(tuple(texture_dict["image_data_shape"]))
+        image_data = JsonParser._read_only(NdarraySerialisation.from_json(texture_dict["image_data"]).reshape(tuple(texture_dict["image_data_shape"])))
         texture = Texture(image_data)
         return texture
@@ -1,6 +1,6 @@
 # stdlib imports
 import typing
-from typing import Any
+from typing import Any, Callable
 import json
 
 # pip imports
@@ -12,16 +12,20 @@ from ...core.canvas import Canvas
 from ...core.viewport import Viewport
 from ...core.camera import Camera
 from ...core.texture import Texture
+from ...core.visual_base import VisualBase
 from ...core.types import SceneDict
 from ...visuals.pixels import Pixels
 from ...visuals.image import Image
 from ...visuals.mesh import Mesh
-from ...types import NdarrayLikeUtils, DiffableNdarrayDb, DiffableNdarraySerialisation
+from ...types import NdarrayLikeUtils, DiffableNdarray, DiffableNdarrayDb, DiffableNdarraySerialisation
+from ...types import NdarraySerialisation, NdarrayEncodingType
 
 
 class JsonRenderer:
     def __init__(self) -> None:
         self._diffable_ndarray_db = DiffableNdarrayDb()
+        self._attribute_json_cache: dict[tuple[str, str], tuple[Any, Any, NdarrayEncodingType, Any]] = {}
+        """The JSON of the visual attributes at the last .render(), keyed by (visual uuid, key): (value, value version, ndarray_encoding, JSON)"""
 
     # =============================================================================
     # .close()
@@ -34,7 +38,17 @@ class JsonRenderer:
     # =============================================================================
     # .render()
     # =============================================================================
-    def render(self, canvas: Canvas, viewports: list[Viewport], cameras: list[Camera]) -> SceneDict:
+    def render(self, canvas: Canvas, viewports: list[Viewport], cameras: list[Camera], ndarray_encoding: NdarrayEncodingType = "list") -> SceneDict:
+        """
+        Convert the scene to a SceneDict.
+
+        Arguments:
+            canvas (Canvas): The canvas to render.
+            viewports (list[Viewport]): The viewports to render.
+            cameras (list[Camera]): The cameras, one per viewport.
+            ndarray_encoding (NdarrayEncodingType): "list" to get a JSON-serializable SceneDict,
+                "binary" to keep the np.ndarray as is. Use NdarraySerialisation.to_msgpack() to serialize it.
+        """
 
         # =============================================================================
         # sanity checks
@@ -56,6 +70,15 @@ class JsonRenderer:
             },
         }
 
+        # the JSON of the unchanged visual attributes is reused from the last .render(), see ._attribute_to_json()
+        attribute_json_cache: dict[tuple[str, str], tuple[Any, Any, NdarrayEncodingType, Any]] = {}
+
+        def ndarray_like_to_json(value: Any) -> Any:
+            return NdarrayLikeUtils.to_json(value, self._diffable_ndarray_db, ndarray_encoding)
+
+        def ndarray_to_json(value: Any) -> Any:
+            return NdarraySerialisation.to_json(value, ndarray_encoding)
+
         for viewport, camera in zip(viewports, cameras):
             # =============================================================================
             # .to_json camera
@@ -87,29 +110,31 @@ class JsonRenderer:
                     visual_dict = {
                         "type": "Pixels",
                         "uuid": pixels.uuid,
-                        "positions": NdarrayLikeUtils.to_json(pixels.positions, self._diffable_ndarray_db),
-                        "sizes": NdarrayLikeUtils.to_json(pixels.sizes, self._diffable_ndarray_db),
-                        "colors": NdarrayLikeUtils.to_json(pixels.colors, self._diffable_ndarray_db),
+                        "positions": self._attribute_to_json(attribute_json_cache, pixels.uuid, "positions", pixels.positions, ndarray_encoding, ndarray_like_to_json),
+                        "sizes": self._attribute_to_json(attribute_json_cache, pixels.uuid, "sizes", pixels.sizes, ndarray_encoding, ndarray_like_to_json),
+                        "colors": self._attribute_to_json(attribute_json_cache, pixels.uuid, "colors", pixels.colors, ndarray_encoding, ndarray_like_to_json),
                     }
                 elif isinstance(visual, Image):
                     image: Image = visual
                     visual_dict = {
                         "type": "Image",
                         "uuid": image.uuid,
-                        "position": image.position.tolist(),
+                        "position": self._attribute_to_json(attribute_json_cache, image.uuid, "position", image.position, ndarray_encoding, ndarray_to_json),
                         "bounds": image.image_extent,
-                        "texture": JsonRenderer.texture_to_json(image.texture),
+                        "texture": self._attribute_to_json(
+                            attribute_json_cache, image.uuid, "texture", image.texture, ndarray_encoding, lambda texture: JsonRenderer.texture_to_json(texture, ndarray_encoding)
+                        ),
                     }
                 elif isinstance(visual, Mesh):
                     mesh = visual
                     visual_dict = {
                         "type": "Mesh",
                         "uuid": mesh.uuid,
-                        "vertices": mesh.vertices_coords.tolist(),
+                        "vertices": self._attribute_to_json(attribute_json_cache, mesh.uuid, "vertices", mesh.vertices_coords, ndarray_encoding, ndarray_to_json),
                         "cmap": None if mesh.cmap is None else mesh.cmap.name,
-                        "faces": mesh.face_indices.tolist(),
-                        "facecolors": mesh.facecolors.tolist(),
-                        "edgecolors": mesh.edgecolors.tolist(),
+                        "faces": self._attribute_to_json(attribute_json_cache, mesh.uuid, "faces", mesh.face_indices, ndarray_encoding, ndarray_to_json),
+                        "facecolors": self._attribute_to_json(attribute_json_cache, mesh.uuid, "facecolors", mesh.facecolors, ndarray_encoding, ndarray_to_json),
+                        "edgecolors": self._attribute_to_json(attribute_json_cache, mesh.uuid, "edgecolors", mesh.edgecolors, ndarray_encoding, ndarray_to_json),
                         "linewidths": mesh.linewidths,
                         "mode": mesh.culling_mode,
                     }
@@ -121,23 +146,58 @@ class JsonRenderer:
             # Add viewport to this canvas
             scene_dict["canvas"]["viewports"].append(viewport_dict)
 
+        # keep only the attributes of this scene - the removed visuals are forgotten
+        self._attribute_json_cache = attribute_json_cache
+
         return scene_dict
 
+    def _attribute_to_json(
+        self,
+        attribute_json_cache: dict[tuple[str, str], tuple[Any, Any, NdarrayEncodingType, Any]],
+        visual_uuid: str,
+        key: str,
+        value: Any,
+        ndarray_encoding: NdarrayEncodingType,
+        to_json: Callable[[Any], Any],
+    ) -> Any:
+        """
+        Return the JSON of a visual attribute, and add it to attribute_json_cache.
+
+        An unchanged attribute - same value object, same version, see VisualBase.get_value_version() - gets the same
+        JSON object as at the last .render(), without serializing it again. So SceneDelta.diff() skips it by identity.
+        NOTE: the DiffableNdarray are never reused - their JSON depends on what has already been sent.
+        """
+        if isinstance(value, DiffableNdarray):
+            return to_json(value)
+        value_version = VisualBase.get_value_version(value)
+        if value_version is None:
+            return to_json(value)
+
+        cache_key = (visual_uuid, key)
+        cache_entry = self._attribute_json_cache.get(cache_key)
+        if cache_entry is not None and cache_entry[0] is value and cache_entry[1] == value_version and cache_entry[2] == ndarray_encoding:
+            attribute_json = cache_entry[3]
+        else:
+            attribute_json = to_json(value)
+        attribute_json_cache[cache_key] = (value, value_version, ndarray_encoding, attribute_json)
+        return attribute_json
+
     # =============================================================================
     # .clear_cache()
     # =============================================================================
 
     def clear_cache(self) -> None:
         DiffableNdarraySerialisation.reset_db(self._diffable_ndarray_db)
+        self._attribute_json_cache.clear()
 
     # =============================================================================
     # .texture_to_json
     # =============================================================================
 
     @staticmethod
-    def texture_to_json(texture: Texture) -> dict[str, Any]:
+    def texture_to_json(texture: Texture, ndarray_encoding: NdarrayEncodingType = "list") -> dict[str, Any]:
         texture_dict: dict[str, Any] = {
-            "image_data": texture.image_data.tolist(),
+            "image_data": NdarraySerialisation.to_json(texture.image_data, ndarray_encoding),
             "image_data_shape": texture.image_data.shape,
         }
         return texture_dict
@@ -0,0 +1,299 @@
+# stdlib imports
+from typing import Any, Callable
+
+# pip imports
+import numpy as np
+
+# local imports
+from ...core.types import SceneDict
+
+SceneDeltaType = list[dict[str, Any]]
+"""A scene delta is a list of operations, see SceneDelta for the list of operations"""
+
+SceneOwnedArraysType = dict[tuple[str, str, str], list | np.ndarray]
+"""The arrays copied by SceneDelta.apply() at the first patch of an attribute, keyed by (viewport uuid, visual uuid, key)"""
+
+
+class SceneDelta:
+    """
+    Structural, array-aware delta between two SceneDict.
+
+    It works at the level of canvas/viewport/visual/attribute, and matches viewports and visuals by their uuid.
+    Changed array attributes are sent either as a whole attribute, or as slice patches on the first axis when
+    only a few rows changed (similar to the "multi_bbox" policy of DiffableNdarray).
+
+    The unchanged attributes are skipped by identity, without comparing them: JsonRenderer reuses the JSON of
+    the attributes whose version did not change. So the diff time scales with the number of changed attributes.
+
+    ### Operations
+    - {"op": "set_canvas", "key", "value"}: set a canvas attribute
+    - {"op": "set_cameras", "value"}: set the list of cameras
+    - {"op": "set_viewports_order", "viewport_uuids"}: set the list of viewports, unknown viewports are set by a later "set_viewport"
+    - {"op": "set_viewport", "viewport_uuid", "value"}: set a whole viewport
+    - {"op": "set_viewport_attr", "viewport_uuid", "key", "value"}: set a viewport attribute
+    - {"op": "set_visuals_order", "viewport_uuid", "visual_uuids"}: set the list of visuals, unknown visuals are set by a later "set_visual"
+    - {"op": "set_visual", "viewport_uuid", "visual_uuid", "value"}: set a whole visual
+    - {"op": "set_visual_attr", "viewport_uuid", "visual_uuid", "key", "value"}: set a visual attribute
+    - {"op": "patch_visual_attr", "viewport_uuid", "visual_uuid", "key", "start", "stop", "rows"}: set rows [start, stop) of an array attribute
+    """
+
+    PATCH_MAX_RATIO = 0.5
+    """Above this ratio of patched rows, the whole attribute is sent instead of slice patches"""
+    PATCH_MAX_RANGES = 8
+    """The maximum number of slice patches per attribute - the closest row ranges are merged above it"""
+
+    # =============================================================================
+    # .diff()
+    # =============================================================================
+
+    @staticmethod
+    def diff(old_scene: SceneDict, new_scene: SceneDict) -> SceneDeltaType:
+        """
+        Compute the delta to go from old_scene to new_scene.
+        """
+        delta: SceneDeltaType = []
+        old_canvas = old_scene["canvas"]
+        new_canvas = new_scene["canvas"]
+
+        # canvas attributes
+        for key, value in new_canvas.items():
+            if key in ("cameras", "viewports"):
+                continue
+            if key not in old_canvas or not SceneDelta._is_equal(old_canvas[key], value):
+                delta.append({"op": "set_canvas", "key": key, "value": value})
+
+        # cameras - they are small, always sent as a whole
+        if not SceneDelta._is_equal(old_canvas["cameras"], new_canvas["cameras"]):
+            delta.append({"op": "set_cameras", "value": new_canvas["cameras"]})
+
+        # viewports
+        old_viewports = {viewport_dict["uuid"]: viewport_dict for viewport_dict in old_canvas["viewports"]}
+        new_viewport_uuids = [viewport_dict["uuid"] for viewport_dict in new_canvas["viewports"]]
+        if new_viewport_uuids != list(old_viewports.keys()):
+            delta.append({"op": "set_viewports_order", "viewport_uuids": new_viewport_uuids})
+
+        for viewport_dict in new_canvas["viewports"]:
+            viewport_uuid = viewport_dict["uuid"]
+            old_viewport_dict = old_viewports.get(viewport_uuid)
+            if old_viewport_dict is None or old_viewport_dict.keys() != viewport_dict.keys():
+                delta.append({"op": "set_viewport", "viewport_uuid": viewport_uuid, "value": viewport_dict})
+                continue
+            SceneDelta._diff_viewport(delta, old_viewport_dict, viewport_dict)
+
+        return delta
+
+    @staticmethod
+    def _diff_viewport(delta: SceneDeltaType, old_viewport_dict: dict[str, Any], viewport_dict: dict[str, Any]) -> None:
+        viewport_uuid = viewport_dict["uuid"]
+
+        # viewport attributes
+        for key, value in viewport_dict.items():
+            if key == "visuals":
+                continue
+            if not SceneDelta._is_equal(old_viewport_dict[key], value):
+                delta.append({"op": "set_viewport_attr", "viewport_uuid": viewport_uuid, "key": key, "value": value})
+
+        # visuals
+        old_visuals = {visual_dict["uuid"]: visual_dict for visual_dict in old_viewport_dict["visuals"]}
+        new_visual_uuids = [visual_dict["uuid"] for visual_dict in viewport_dict["visuals"]]
+        if new_visual_uuids != list(old_visuals.keys()):
+            delta.append({"op": "set_visuals_order", "viewport_uuid": viewport_uuid, "visual_uuids": new_visual_uuids})
+
+        for visual_dict in viewport_dict["visuals"]:
+            visual_uuid = visual_dict["uuid"]
+            old_visual_dict = old_visuals.get(visual_uuid)
+            if old_visual_dict is None or old_visual_dict.keys() != visual_dict.keys() or old_visual_dict["type"] != visual_dict["type"]:
+                delta.append({"op": "set_visual", "viewport_uuid": viewport_uuid, "visual_uuid": visual_uuid, "value": visual_dict})
+                continue
+
+            # visual attributes
+            for key, value in visual_dict.items():
+                old_value = old_visual_dict[key]
+                # an unchanged attribute is the same object - see JsonRenderer._attribute_to_json()
+                if old_value is value:
+                    continue
+                op_base = {"viewport_uuid": viewport_uuid, "visual_uuid": visual_uuid, "key": key}
+                row_patches = SceneDelta._row_patches(old_value, value)
+                if row_patches is not None:
+                    delta.extend({"op": "patch_visual_attr", **op_base, **row_patch} for row_patch in row_patches)
+                elif not SceneDelta._is_equal(old_value, value):
+                    delta.append({"op": "set_visual_attr", **op_base, "value": value})
+
+    # =============================================================================
+    # .apply()
+    # =============================================================================
+
+    @staticmethod
+    def apply(old_scene: SceneDict, delta: SceneDeltaType, owned_arrays: SceneOwnedArraysType | None = None) -> SceneDict:
+        """
+        Apply a delta computed by .diff() to old_scene, and return the new scene.
+
+        The arrays of the scene may be shared - e.g. read-only views on a request body, arrays of NdarrayHashStore,
+        or the JSON reused by JsonRenderer - so a patched array is copied first. The copy is kept in owned_arrays,
+        so the next patches of the attribute write in place in it, in O(rows) instead of O(N).
+
+        NOTE: old_scene is updated in place, and shares its unchanged parts with the returned scene.
+
+        Arguments:
+            old_scene (SceneDict): the scene to update
+            delta (SceneDeltaType): the delta to apply
+            owned_arrays (SceneOwnedArraysType | None): the arrays owned by old_scene, updated by this call - keep it
+                with the scene, and start a new one with a new scene. None to copy the array at each patch.
+        """
+        if owned_arrays is None:
+            owned_arrays = {}
+        canvas_dict = old_scene["canvas"]
+        viewports_by_uuid = {viewport_dict["uuid"]: viewport_dict for viewport_dict in canvas_dict["viewports"]}
+        visuals_by_uuid: dict[str, dict[str, dict[str, Any]]] = {}
+        """cache of the visuals of each viewport, keyed by viewport uuid then visual uuid"""
+
+        def get_visuals(viewport_uuid: str) -> dict[str, dict[str, Any]]:
+            if viewport_uuid not in visuals_by_uuid:
+                visuals = viewports_by_uuid[viewport_uuid]["visuals"]
+                visuals_by_uuid[viewport_uuid] = {visual_dict["uuid"]: visual_dict for visual_dict in visuals}
+            return visuals_by_uuid[viewport_uuid]
+
+        for operation in delta:
+            op = operation["op"]
+            if op == "set_canvas":
+                canvas_dict[operation["key"]] = operation["value"]
+            elif op == "set_cameras":
+                canvas_dict["cameras"] = operation["value"]
+            elif op == "set_viewports_order":
+                # unknown viewports get a placeholder, set by a later "set_viewport"
+                canvas_dict["viewports"] = [viewports_by_uuid.get(uuid, {"uuid": uuid, "visuals": []}) for uuid in operation["viewport_uuids"]]
+                viewports_by_uuid = {viewport_dict["uuid"]: viewport_dict for viewport_dict in canvas_dict["viewports"]}
+                visuals_by_uuid.clear()
+                SceneDelta._drop_owned_arrays(owned_arrays, lambda owned_key: owned_key[0] not in viewports_by_uuid)
+            elif op == "set_viewport":
+                viewport_dict = viewports_by_uuid[operation["viewport_uuid"]]
+                viewport_dict.clear()
+                viewport_dict.update(operation["value"])
+                visuals_by_uuid.pop(operation["viewport_uuid"], None)
+                SceneDelta._drop_owned_arrays(owned_arrays, lambda owned_key: owned_key[0] == operation["viewport_uuid"])
+            elif op == "set_viewport_attr":
+                viewports_by_uuid[operation["viewport_uuid"]][operation["key"]] = operation["value"]
+            elif op == "set_visuals_order":
+                viewport_dict = viewports_by_uuid[operation["viewport_uuid"]]
+                visuals = get_visuals(operation["viewport_uuid"])
+                # unknown visuals get a placeholder, set by a later "set_visual"
+                viewport_dict["visuals"] = [visuals.get(uuid, {"uuid": uuid}) for uuid in operation["visual_uuids"]]
+                visuals_by_uuid.pop(operation["viewport_uuid"], None)
+                visual_uuids = set(operation["visual_uuids"])
+                SceneDelta._drop_owned_arrays(owned_arrays, lambda owned_key: owned_key[0] == operation["viewport_uuid"] and owned_key[1] not in visual_uuids)
+            elif op == "set_visual":
+                visual_dict = get_visuals(operation["viewport_uuid"])[operation["visual_uuid"]]
+                visual_dict.clear()
+                visual_dict.update(operation["value"])
+                SceneDelta._drop_owned_arrays(owned_arrays, lambda owned_key: owned_key[:2] == (operation["viewport_uuid"], operation["visual_uuid"]))
+            elif op == "set_visual_attr":
+                get_visuals(operation["viewport_uuid"])[operation["visual_uuid"]][operation["key"]] = operation["value"]
+                owned_arrays.pop((operation["viewport_uuid"], operation["visual_uuid"], operation["key"]), None)
+            elif op == "patch_visual_attr":
+                visual_dict = get_visuals(operation["viewport_uuid"])[operation["visual_uuid"]]
+                value = visual_dict[operation["key"]]
+                # patch in place - the arrays are copied once, at their first patch, see ._get_owned_array()
+                owned_key = (operation["viewport_uuid"], operation["visual_uuid"], operation["key"])
+                array = SceneDelta._get_owned_array(owned_arrays, owned_key, SceneDelta._get_array(value), is_list_allowed=isinstance(value, dict))
+                array[operation["start"] : operation["stop"]] = operation["rows"]
+                # a new attribute object, in O(1) - so JsonParser(reuse_objects=True) sees it changed, and the parsed np.ndarray is a new object
+                array = array.view() if isinstance(array, np.ndarray) else array
+                visual_dict[operation["key"]] = {**value, "data": array} if isinstance(value, dict) else array
+            else:
+                raise ValueError(f"Unknown scene delta operation: {op}")
+
+        return old_scene
+
+    # =============================================================================
+    # Private helpers
+    # =============================================================================
+
+    @staticmethod
+    def _is_equal(old_value: Any, new_value: Any) -> bool:
+        if old_value is new_value:
+            return True
+        if isinstance(old_value, np.ndarray) or isinstance(new_value, np.ndarray):
+            return isinstance(old_value, np.ndarray) and isinstance(new_value, np.ndarray) and np.array_equal(old_value, new_value)
+        return old_value == new_value
+
+    @staticmethod
+    def _get_owned_array(owned_arrays: SceneOwnedArraysType, owned_key: tuple[str, str, str], array: list | np.ndarray, is_list_allowed: bool) -> list | np.ndarray:
+        """
+        Return the array to patch in place: the array owned by the scene for this attribute, else a copy of it, added to owned_arrays.
+
+        A list wrapped in a dict is copied as a list - a shallow copy, as the patched rows are replaced, not modified.
+        A bare list attribute is converted to a np.ndarray, as JsonParser does, since a patched attribute must be
+        a new object and only a view is O(1).
+
+        Arguments:
+            array (list | np.ndarray): the array of the attribute, see ._get_array()
+            is_list_allowed (bool): True if the attribute can stay a list - i.e. the attribute is a dict wrapping it
+        """
+        owned_array = owned_arrays.get(owned_key)
+        # NOTE: the attribute must still be the owned array, or a view of it - e.g. not replaced by a new scene
+        if owned_array is None or (array is not owned_array and getattr(array, "base", None) is not owned_array):
+            owned_array = list(array) if isinstance(array, list) and is_list_allowed else np.array(array)
+            owned_arrays[owned_key] = owned_array
+        return owned_array
+
+    @staticmethod
+    def _drop_owned_arrays(owned_arrays: SceneOwnedArraysType, is_dropped: Callable[[tuple[str, str, str]], bool]) -> None:
+        """
+        Drop the owned arrays whose key matches is_dropped(owned_key) - their attribute has been replaced or removed.
+        """
+        for owned_key in [owned_key for owned_key in owned_arrays if is_dropped(owned_key)]:
+            del owned_arrays[owned_key]
+
+    @staticmethod
+    def _get_array(value: Any) -> Any:
+        """
+        Return the array of an attribute, or None if it is not an array.
+        - arrays are either a (nested) list, or a np.ndarray, or a NdarrayLikeUtils dict of type "ndarray"
+        """
+        if isinstance(value, dict) and value.get("type") == "ndarray":
+            value = value["data"]
+        if isinstance(value, (list, np.ndarray)):
+            return value
+        return None
+
+    @staticmethod
+    def _row_patches(old_value: Any, new_value: Any) -> list[dict[str, Any]] | None:
+        """
+        Return a list of {"start", "stop", "rows"} if only a few rows changed between the two arrays - empty if none
+        changed - or None if the attribute has to be sent as a whole.
+
+        The changed rows are grouped in at most PATCH_MAX_RANGES row ranges, by merging the ranges separated by the
+        smallest gaps - e.g. an edit at the first row and at the last row gives 2 patches, not the whole attribute.
+        """
+        old_array = SceneDelta._get_array(old_value)
+        new_array = SceneDelta._get_array(new_value)
+        if old_array is None or new_array is None or len(old_array) != len(new_array) or len(new_array) == 0:
+            return None
+        # the array container must be the same, e.g. same "type" and "dtype" for NdarrayLikeUtils dict
+        if isinstance(new_value, dict):
+            if not isinstance(old_value, dict) or old_value.keys() != new_value.keys():
+                return None
+            if any(not SceneDelta._is_equal(old_value[key], new_value[key]) for key in new_value if key != "data"):
+                return None
+
+        old_np = np.asarray(old_array)
+        new_np = np.asarray(new_array)
+        if old_np.shape != new_np.shape or old_np.dtype == object or new_np.dtype == object:
+            return None
+
+        changed_rows = np.flatnonzero((old_np != new_np).reshape(len(new_np), -1).any(axis=1))
+        if len(changed_rows) == 0:
+            return []
+
+        # split the changed rows at their gaps - only at the PATCH_MAX_RANGES - 1 largest ones
+        row_gaps = np.diff(changed_rows) - 1
+        split_indices = np.flatnonzero(row_gaps > 0)
+        if len(split_indices) > SceneDelta.PATCH_MAX_RANGES - 1:
+            largest_gaps = np.argpartition(row_gaps[split_indices], -(SceneDelta.PATCH_MAX_RANGES - 1))[-(SceneDelta.PATCH_MAX_RANGES - 1) :]
+            split_indices = np.sort(split_indices[largest_gaps])
+        starts = changed_rows[np.concatenate(([0], split_indices + 1))]
+        stops = changed_rows[np.concatenate((split_indices, [len(changed_rows) - 1]))] + 1
+        if np.sum(stops - starts) > SceneDelta.PATCH_MAX_RATIO * len(new_np):
+            return None
+
+        return [{"start": int(start), "stop": int(stop), "rows": new_array[start:stop]} for start, stop in zip(starts, stops)]
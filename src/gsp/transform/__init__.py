@@ -6,6 +6,8 @@ It allows you to load data, perform mathematical operations on numpy arrays.
 from .transform_link_base import TransformLinkBase
 from .transform_serialisation import TransformSerialisation
 from .transform_registry import TransformRegistry
+from .transform_plan import TransformPlan, TransformElementwiseOp
+from .transform_streaming import TransformStreaming
 
 from .links import TransformLinkAssertShape
 from .links import TransformLinkImmediate
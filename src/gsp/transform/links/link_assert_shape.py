@@ -23,6 +23,16 @@ class TransformLinkAssertShape(TransformLinkBase):
 
         return np_array
 
+    # Streaming methods - the shape is checked on the full shape, before any chunk is read
+
+    def _get_chunked_shape(self, input_shape: tuple[int, ...]) -> tuple[int, ...] | None:
+        if tuple(input_shape) != tuple(self.__expected_shape):
+            raise ValueError(f"Input array shape {input_shape} does not match the expected shape {self.__expected_shape}")
+        return input_shape
+
+    def _run_chunk(self, np_chunk: np.ndarray) -> np.ndarray:
+        return np_chunk
+
     def _to_json(self) -> dict[str, Any]:
         return {"type": "TransformAssertShape", "expected_shape": self.__expected_shape}
 
@@ -1,8 +1,10 @@
 from typing import Any
+from collections.abc import Iterator
 import numpy as np
 
 from ..transform_link_base import TransformLinkBase
 from ..transform_registry import TransformRegistry
+from ..transform_streaming import TransformStreaming
 
 
 class TransformLinkImmediate(TransformLinkBase):
@@ -20,6 +22,20 @@ class TransformLinkImmediate(TransformLinkBase):
 
         return self.__np_array
 
+    def _get_fingerprint(self) -> Any:
+        # the array is the parameter - its content is never hashed, it would cost a full pass at each run
+        # NOTE: the in-place writes to a writeable np.ndarray can not be seen - it is not tracked, as in VisualBase.get_version()
+        from ...types.diffable_ndarray.diffable_ndarray import DiffableNdarray
+
+        if isinstance(self.__np_array, DiffableNdarray):
+            return (id(self.__np_array), self.__np_array.get_version())
+        if self.__np_array.flags.writeable:
+            return None
+        return (id(self.__np_array),)
+
+    def _get_chunks(self, chunk_rows: int) -> tuple[tuple[int, ...], Iterator[np.ndarray]] | None:
+        return self.__np_array.shape, TransformStreaming.iter_row_chunks(self.__np_array, chunk_rows)
+
     # Serialization methods
 
     def _to_json(self) -> dict[str, Any]:
@@ -1,4 +1,7 @@
 # stdlib imports
+import ast
+import builtins
+import functools
 import typing
 import inspect
 
@@ -7,10 +10,22 @@ import numpy as np
 
 # local imports
 from ..transform_link_base import TransformLinkBase
+from ..transform_plan import TransformElementwiseOp
 from ..transform_registry import TransformRegistry
 
 
 class TransformLinkLambda(TransformLinkBase):
+    LAMBDA_BUILTIN_NAMES = ("abs", "all", "any", "bool", "float", "int", "len", "list", "max", "min", "pow", "range", "round", "slice", "sum", "tuple", "zip")
+    """The builtins available to the lambda functions, in addition to `np`. see .compile_lambda()"""
+
+    LAMBDA_BINARY_UFUNCS: dict[type[ast.operator], np.ufunc] = {
+        ast.Add: np.add,
+        ast.Sub: np.subtract,
+        ast.Mult: np.multiply,
+        ast.Div: np.true_divide,
+        ast.Pow: np.power,
+    }
+    """The binary operators of the lambda functions recognized as elementwise operations. see .get_lambda_elementwise_op()"""
 
     def __init__(self, lambda_func: typing.Callable[[np.ndarray], np.ndarray] | str) -> None:
         """
@@ -30,11 +45,22 @@ class TransformLinkLambda(TransformLinkBase):
             lambda_function_source = TransformLinkLambda.lambda_to_str(lambda_func)
             self.__lambda_func_source = lambda_function_source
 
+        self.__lambda_func = TransformLinkLambda.compile_lambda(self.__lambda_func_source)
+        """The compiled lambda function - shared by all the links with the same source, see .compile_lambda()"""
+        self.__elementwise_op = TransformLinkLambda.get_lambda_elementwise_op(self.__lambda_func_source)
+        """The elementwise operation of the lambda function if it is a simple one, else None - see .get_lambda_elementwise_op()"""
+
     def _run(self, np_array: np.ndarray) -> np.ndarray:
-        value = eval(self.__lambda_func_source)(np_array)
+        value = self.__lambda_func(np_array)
         new_array = typing.cast(np.ndarray, value)
         return new_array
 
+    def _get_fingerprint(self) -> typing.Any:
+        return self.__lambda_func_source
+
+    def _get_elementwise_op(self) -> TransformElementwiseOp | None:
+        return self.__elementwise_op
+
     def _to_json(self) -> dict[str, typing.Any]:
         return {"type": "TransformLinkLambda", "lambda_func_source": self.__lambda_func_source}
 
@@ -43,6 +69,86 @@ class TransformLinkLambda(TransformLinkBase):
         lambda_func_source = json_dict["lambda_func_source"]
         return TransformLinkLambda(lambda_func_source)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def compile_lambda(lambda_func_source: str) -> typing.Callable[[np.ndarray], np.ndarray]:
+        """
+        Compile the source of a lambda function, once per process for a given source - e.g. when many clients send the same transform.
+
+        The lambda is evaluated in a restricted namespace: `np` and LAMBDA_BUILTIN_NAMES only, without access to the dunder attributes.
+        NOTE: it limits the mistakes, it is not a sandbox - only run transforms from trusted sources.
+
+        Raises:
+            ValueError: if the source is not a single lambda expression, or uses a dunder name.
+        """
+        try:
+            expression_tree = ast.parse(lambda_func_source.strip(), mode="eval")
+        except SyntaxError as error:
+            raise ValueError(f"TransformLinkLambda: invalid lambda source {lambda_func_source!r}: {error}") from error
+        if not isinstance(expression_tree.body, ast.Lambda):
+            raise ValueError(f"TransformLinkLambda: the source MUST be a lambda expression, got {lambda_func_source!r}")
+        for node in ast.walk(expression_tree):
+            node_name = node.attr if isinstance(node, ast.Attribute) else node.id if isinstance(node, ast.Name) else ""
+            if node_name.startswith("__"):
+                raise ValueError(f"TransformLinkLambda: the source MUST NOT use dunder names, got {node_name!r}")
+
+        lambda_namespace = {
+            "__builtins__": {name: getattr(builtins, name) for name in TransformLinkLambda.LAMBDA_BUILTIN_NAMES},
+            "np": np,
+        }
+        lambda_code = compile(expression_tree, filename="<TransformLinkLambda>", mode="eval")
+        return eval(lambda_code, lambda_namespace)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def get_lambda_elementwise_op(lambda_func_source: str) -> TransformElementwiseOp | None:
+        """
+        Return the elementwise operation of a simple lambda function, so it can be fused with its neighbours - see TransformPlan.
+        Else return None, and the lambda function is run as is.
+
+        The simple lambda functions are `lambda x: x <op> c`, `lambda x: c <op> x` with <op> in LAMBDA_BINARY_UFUNCS
+        and c a number, `lambda x: -x`, and `lambda x: np.<ufunc>(x)` with a unary numpy ufunc, e.g. np.sqrt.
+        """
+        expression_tree = ast.parse(lambda_func_source.strip(), mode="eval")
+        lambda_node = expression_tree.body
+        if not isinstance(lambda_node, ast.Lambda) or len(lambda_node.args.args) != 1 or lambda_node.args.defaults:
+            return None
+        arg_name = lambda_node.args.args[0].arg
+        body_node = lambda_node.body
+
+        def is_arg(node: ast.expr) -> bool:
+            return isinstance(node, ast.Name) and node.id == arg_name
+
+        def get_number(node: ast.expr) -> int | float | None:
+            if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+                number = get_number(node.operand)
+                return -number if number is not None else None
+            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+                return node.value
+            return None
+
+        if isinstance(body_node, ast.BinOp) and type(body_node.op) in TransformLinkLambda.LAMBDA_BINARY_UFUNCS:
+            ufunc = TransformLinkLambda.LAMBDA_BINARY_UFUNCS[type(body_node.op)]
+            if is_arg(body_node.left) and get_number(body_node.right) is not None:
+                return TransformElementwiseOp(ufunc, get_number(body_node.right))
+            if is_arg(body_node.right) and get_number(body_node.left) is not None:
+                return TransformElementwiseOp(ufunc, get_number(body_node.left), is_operand_first=True)
+        elif isinstance(body_node, ast.UnaryOp) and isinstance(body_node.op, ast.USub) and is_arg(body_node.operand):
+            return TransformElementwiseOp(np.negative)
+        elif (
+            isinstance(body_node, ast.Call)
+            and isinstance(body_node.func, ast.Attribute)
+            and isinstance(body_node.func.value, ast.Name)
+            and body_node.func.value.id == "np"
+            and len(body_node.args) == 1
+            and not body_node.keywords
+            and is_arg(body_node.args[0])
+        ):
+            ufunc = getattr(np, body_node.func.attr, None)
+            if isinstance(ufunc, np.ufunc) and ufunc.nin == 1 and ufunc.nout == 1:
+                return TransformElementwiseOp(ufunc)
+        return None
+
     @staticmethod
     def lambda_to_str(lambda_func: typing.Callable[[np.ndarray], np.ndarray]) -> str:
         lines, lineno = inspect.getsourcelines(lambda_func)
@@ -1,19 +1,29 @@
 import io
 from typing import Any
+from collections.abc import Iterator
+import struct
 import typing
+import urllib.parse
+import urllib.request
+import zipfile
 import numpy as np
 import requests
 import requests_file
 
 from ..transform_link_base import TransformLinkBase
 from ..transform_registry import TransformRegistry
+from ..transform_streaming import TransformStreaming
 
 
 class TransformLinkLoad(TransformLinkBase):
 
     def __init__(self, data_url: str):
         """
-        Load data from a .npy file.
+        Load data from a .npy file, or from a member of a .npz file - e.g. `data.npz#positions`,
+        the member may be omitted if the .npz file has a single one.
+
+        A local file - a file:// url or a path - is memory-mapped: the loading is immediate, and the pages are read
+        lazily when the data is accessed. It is the same for the members of a .npz file, unless they are compressed.
         """
 
         super().__init__()
@@ -25,12 +35,31 @@ class TransformLinkLoad(TransformLinkBase):
     def _run(self, np_array: np.ndarray) -> np.ndarray:
         # Load the data from the file if not already loaded
         if self.__cached_data is None:
-            self.__cached_data = TransformLinkLoad.__load_npy_from_url(self.__data_url)
+            local_path = TransformLinkLoad.get_local_path(self.__data_url)
+            if local_path is not None:
+                self.__cached_data = TransformLinkLoad.__load_npy_from_path(local_path, TransformLinkLoad.get_npz_member_name(self.__data_url))
+            else:
+                self.__cached_data = TransformLinkLoad.__load_npy_from_url(self.__data_url)
 
         # Return the cached data
         np_array = typing.cast(np.ndarray, self.__cached_data)
         return np_array
 
+    def _get_chunks(self, chunk_rows: int) -> tuple[tuple[int, ...], Iterator[np.ndarray]] | None:
+        """
+        Stream the rows of the .npy file by chunks, without loading it in memory: a local file - a file:// url or a path -
+        is memory-mapped, a remote file is read with HTTP range requests.
+        """
+        local_path = TransformLinkLoad.get_local_path(self.__data_url)
+        if local_path is not None:
+            np_array = TransformLinkLoad.__load_npy_from_path(local_path, TransformLinkLoad.get_npz_member_name(self.__data_url))
+            return np_array.shape, TransformStreaming.iter_row_chunks(np_array, chunk_rows)
+        if urllib.parse.urlparse(self.__data_url).path.endswith(".npz"):
+            # the members of a remote .npz file can not be read by ranges - fallback on the full file
+            np_array = TransformLinkLoad.__load_npy_from_url(self.__data_url)
+            return np_array.shape, TransformStreaming.iter_row_chunks(np_array, chunk_rows)
+        return TransformLinkLoad.__get_remote_chunks(self.__data_url, chunk_rows)
+
     def _to_json(self) -> dict[str, Any]:
         return {"type": "TransformLoad", "data_url": self.__data_url}
 
@@ -39,14 +68,139 @@ class TransformLinkLoad(TransformLinkBase):
         data_url = json_dict["data_url"]
         return TransformLinkLoad(data_url)
 
+    @staticmethod
+    def get_local_path(data_url: str) -> str | None:
+        """
+        Return the local path of a file:// url or of a path, or None for a remote url.
+        """
+        parsed_url = urllib.parse.urlparse(data_url)
+        if parsed_url.scheme == "file":
+            return urllib.request.url2pathname(parsed_url.path)
+        # NOTE: a single letter scheme is a windows drive, e.g. C:\data.npy
+        if parsed_url.scheme == "" or len(parsed_url.scheme) == 1:
+            return urllib.parse.urldefrag(data_url).url
+        return None
+
+    @staticmethod
+    def get_npz_member_name(data_url: str) -> str | None:
+        """
+        Return the name of the .npz member of the url - its fragment, e.g. `positions` in `data.npz#positions` - or None.
+        """
+        return urllib.parse.urlparse(data_url).fragment or None
+
+    @staticmethod
+    def __load_npy_from_path(npy_path: str, npz_member_name: str | None) -> np.ndarray:
+        """
+        Load a local .npy file, or a member of a local .npz file, memory-mapped - read-only.
+        """
+        if not zipfile.is_zipfile(npy_path):
+            return np.load(npy_path, mmap_mode="r")
+
+        with zipfile.ZipFile(npy_path) as zip_file:
+            zip_info = zip_file.getinfo(TransformLinkLoad.__get_npz_member_filename(zip_file.namelist(), npz_member_name, npy_path))
+            if zip_info.compress_type != zipfile.ZIP_STORED:
+                # a compressed member must be decompressed in memory
+                with zip_file.open(zip_info) as member_file:
+                    return np.lib.format.read_array(member_file)
+
+        # a stored member is the .npy file as is, after the local file header of the zip - map its data
+        with open(npy_path, "rb") as npz_file:
+            npz_file.seek(zip_info.header_offset)
+            local_header = npz_file.read(30)
+            filename_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            member_offset = zip_info.header_offset + 30 + filename_length + extra_length
+            npz_file.seek(member_offset)
+            version = np.lib.format.read_magic(npz_file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(npz_file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(npz_file)
+            data_offset = npz_file.tell()
+            if dtype.hasobject or len(shape) == 0 or 0 in shape:
+                # nothing worth mapping, or not mappable
+                npz_file.seek(member_offset)
+                return np.lib.format.read_array(npz_file, allow_pickle=False)
+        return np.memmap(npy_path, dtype=dtype, mode="r", offset=data_offset, shape=shape, order="F" if fortran_order else "C")
+
+    @staticmethod
+    def __get_npz_member_filename(filenames: list[str], npz_member_name: str | None, npz_url: str) -> str:
+        """
+        Return the filename of the member in the .npz file - the only one if npz_member_name is None.
+        """
+        member_names = [filename[: -len(".npy")] for filename in filenames if filename.endswith(".npy")]
+        if npz_member_name is None:
+            if len(member_names) != 1:
+                raise ValueError(f"TransformLinkLoad: {npz_url} has {len(member_names)} members {member_names}, select one with {npz_url}#<member>")
+            npz_member_name = member_names[0]
+        if npz_member_name not in member_names:
+            raise ValueError(f"TransformLinkLoad: {npz_url} has no member {npz_member_name!r}, only {member_names}")
+        return npz_member_name + ".npy"
+
+    @staticmethod
+    def __get_remote_chunks(npy_url: str, chunk_rows: int) -> tuple[tuple[int, ...], Iterator[np.ndarray]]:
+        """
+        Read the header of a remote .npy file, and return its shape and an iterator over its row chunks,
+        each one read with an HTTP range request.
+        """
+        request_session = requests.Session()
+
+        # read the header - the magic string, the version, the header length, then the header itself
+        header_bytes = TransformLinkLoad.__get_url_range(request_session, npy_url, 0, 65536)
+        if header_bytes is None:
+            # the server does not support range requests - fallback on the full file
+            np_array = TransformLinkLoad.__load_npy_from_url(npy_url)
+            return np_array.shape, TransformStreaming.iter_row_chunks(np_array, chunk_rows)
+        header_stream = io.BytesIO(header_bytes)
+        version = np.lib.format.read_magic(header_stream)
+        header_length_size = 2 if version == (1, 0) else 4
+        data_offset = 8 + header_length_size + int.from_bytes(header_bytes[8 : 8 + header_length_size], "little")
+        if data_offset > len(header_bytes):
+            header_stream = io.BytesIO(typing.cast(bytes, TransformLinkLoad.__get_url_range(request_session, npy_url, 0, data_offset)))
+            np.lib.format.read_magic(header_stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header_stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header_stream)
+        if fortran_order or dtype.hasobject:
+            raise ValueError(f"TransformLinkLoad: a .npy file in fortran order or of objects can not be streamed by chunks, got {npy_url}")
+
+        def iter_chunks() -> Iterator[np.ndarray]:
+            row_shape = shape[1:]
+            row_bytes = dtype.itemsize * int(np.prod(row_shape))
+            row_count = shape[0] if len(shape) > 0 else 1
+            for chunk_start in range(0, row_count, chunk_rows):
+                chunk_stop = min(chunk_start + chunk_rows, row_count)
+                chunk_bytes = TransformLinkLoad.__get_url_range(
+                    request_session, npy_url, data_offset + chunk_start * row_bytes, data_offset + chunk_stop * row_bytes
+                )
+                if chunk_bytes is None:
+                    raise ValueError(f"TransformLinkLoad: the server stopped supporting range requests for {npy_url}")
+                yield np.frombuffer(chunk_bytes, dtype=dtype).reshape(((chunk_stop - chunk_start,) + row_shape) if len(shape) > 0 else ())
+            request_session.close()
+
+        return shape, iter_chunks()
+
+    @staticmethod
+    def __get_url_range(request_session: requests.Session, url: str, start: int, stop: int) -> bytes | None:
+        """
+        Return the bytes [start, stop) of the url - less at the end of the file - or None if the server ignores range requests.
+        """
+        if stop <= start:
+            return b""
+        response = request_session.get(url, headers={"Range": f"bytes={start}-{stop - 1}"})
+        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
+        if response.status_code != 206:
+            return None
+        return response.content
+
     @staticmethod
     def __load_npy_from_url(npy_url: str) -> np.ndarray:
         # Register the file:// adapter to handle local file URLs
         request_session = requests.Session()
         request_session.mount("file://", requests_file.FileAdapter())
 
-        # Fetch the .npy file from the URL
-        response = request_session.get(npy_url)
+        # Fetch the .npy file from the URL - without the fragment, which selects the .npz member
+        response = request_session.get(urllib.parse.urldefrag(npy_url).url)
         response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
 
         # Use BytesIO to create a file-like object from the response content
@@ -54,6 +208,9 @@ class TransformLinkLoad(TransformLinkBase):
 
         # Load the data from the in-memory stream
         np_array = np.load(data_stream)
+        if isinstance(np_array, np.lib.npyio.NpzFile):
+            member_filename = TransformLinkLoad.__get_npz_member_filename(np_array.zip.namelist(), TransformLinkLoad.get_npz_member_name(npy_url), npy_url)
+            np_array = np_array[member_filename[: -len(".npy")]]
 
         # Close the data stream
         data_stream.close()
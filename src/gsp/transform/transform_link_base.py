@@ -1,7 +1,27 @@
 from typing import Any
+from collections import OrderedDict
+from collections.abc import Iterator
+import json
+import typing
+import weakref
 import numpy as np
 
+from .transform_plan import TransformElementwiseOp, TransformPlan
+from .transform_streaming import TransformStreaming
+
+class _UntrackedFingerprint:
+    """A fingerprint which matches no other one - for the outputs which can not be tracked, see TransformLinkBase._get_fingerprint()"""
+
+
 class TransformLinkBase:
+    CACHE_MAX_BYTES = 512 * 1024 * 1024
+    """The maximum number of bytes of the outputs cached by all the links - the least recently used outputs are evicted above it"""
+
+    __cache_lru: "OrderedDict[int, tuple[weakref.ref[TransformLinkBase], int]]" = OrderedDict()
+    """Mapping from id(link) to (link weak reference, cached output bytes), in least recently used order. see .run()"""
+    __cache_bytes = 0
+    """The number of bytes of all the cached outputs"""
+
     def __init__(self):
         """
         Base class for data transformations.
@@ -9,6 +29,10 @@ class TransformLinkBase:
         """
         self.next_transform: TransformLinkBase | None = None
         self.previous_transform: TransformLinkBase | None = None
+        self._cached_output: np.ndarray | None = None
+        """The output of the last run of this link, see .run()"""
+        self._cached_fingerprint: Any = None
+        """The fingerprint of the cached output, None if there is no cached output. see .get_fingerprint()"""
 
 
     def chain(self, other_transform: 'TransformLinkBase') -> 'TransformLinkBase':
@@ -19,39 +43,224 @@ class TransformLinkBase:
         self.next_transform = other_transform
 
         return self.next_transform
-    
+
     ###########################################################################
 
     def _run(self, np_array: np.ndarray) -> np.ndarray:
         raise NotImplementedError("_run method must be implemented by subclasses")
-    
+
     def _to_json(self) -> dict[str, Any]:
         raise NotImplementedError("_to_json method must be implemented by subclasses")
-    
+
     @staticmethod
     def _from_json( json_dict: dict[str, Any]) -> 'TransformLinkBase':
         raise NotImplementedError("_from_json method must be implemented by subclasses")
 
+    def _get_fingerprint(self) -> Any:
+        """
+        Return a hashable fingerprint of the parameters of this link: with the same input and the same fingerprint,
+        ._run() MUST return the same output - it is how the outputs are cached, see .run()
+
+        By default, it is the JSON of the link. Override it if the JSON is expensive to build, e.g. for large arrays,
+        or if the output depends on something else than the parameters - or call .invalidate() when it changes.
+        Return None if the parameters can not be tracked: this link and the links downstream of it then run at each .run().
+        """
+        return json.dumps(self._to_json(), sort_keys=True, default=str)
+
+    def _get_elementwise_op(self) -> TransformElementwiseOp | None:
+        """
+        Return the elementwise operation of this link, or None if it is opaque - see TransformPlan.
+        An elementwise link is fused with its elementwise neighbours, in place in a single buffer.
+        """
+        return None
+
+    def _get_chunks(self, chunk_rows: int) -> tuple[tuple[int, ...], Iterator[np.ndarray]] | None:
+        """
+        Return the shape of the output of this link, and an iterator over its row chunks - ignoring its input.
+        Return None if this link is not a source of chunks. see TransformStreaming
+        """
+        return None
+
+    def _get_chunked_shape(self, input_shape: tuple[int, ...]) -> tuple[int, ...] | None:
+        """
+        Return the shape of the output of this link for an input of input_shape, if the link is row-independent:
+        each row chunk of the output depends only on the same row chunk of the input - so the link can be streamed.
+        Return None if it is not. see TransformStreaming
+
+        By default, only the elementwise links are row-independent.
+        """
+        return input_shape if self._get_elementwise_op() is not None else None
+
+    def _run_chunk(self, np_chunk: np.ndarray) -> np.ndarray:
+        """
+        Run this link on a row chunk of its input - only for row-independent links, see ._get_chunked_shape()
+        """
+        return self._run(np_chunk)
+
     ###########################################################################
 
     def run(self) -> np.ndarray:
         """
         Run the chain of transformations and return the resulting numpy array.
+
+        Each link caches its output, keyed by the fingerprint of its input and its own parameters.
+        So only the links downstream of a change run again, and an unchanged chain costs only its fingerprints.
+        The links downstream of a link which can not be tracked are not cached, see ._get_fingerprint().
+
+        NOTE: the returned array is the cached output of the last link - it is read-only, copy it to modify it.
+        """
+        chain_links = self.__get_chain_links()
+        chain_fingerprints = TransformLinkBase.__get_chain_fingerprints(chain_links)
+
+        # start from the last link whose cached output is up to date
+        start_index = len(chain_links) - 1
+        while start_index >= 0 and chain_links[start_index]._cached_fingerprint != chain_fingerprints[start_index]:
+            start_index -= 1
+        if start_index >= 0:
+            np_array = typing.cast(np.ndarray, chain_links[start_index]._cached_output)
+            TransformLinkBase.__cache_lru.move_to_end(id(chain_links[start_index]))
+        else:
+            np_array = np.array([])  # Start with an empty array
+
+        # Run the chain of transforms downstream of it - the consecutive elementwise links are fused, see TransformPlan
+        # NOTE: only the output of the last link of a fused step is cached
+        link_index = start_index
+        for step_links in TransformPlan.get_steps(chain_links[start_index + 1 :]):
+            np_array = TransformPlan.run_step(step_links, np_array)
+            link_index += len(step_links)
+            np_array = chain_links[link_index].__set_cached_output(np_array, chain_fingerprints[link_index])
+
+        return np_array
+
+    def run_chunks(self, chunk_rows: int = 1_000_000) -> Iterator[np.ndarray]:
+        """
+        Run the chain of transformations over row chunks of chunk_rows rows, and iterate over the resulting chunks
+        - e.g. to process data larger than the memory. see TransformStreaming
+
+        Raises:
+            ValueError: if the chain can not be streamed - raised by this call, before any chunk is read.
         """
+        _, chunks = TransformStreaming.run_chunks(self.__get_chain_links(), chunk_rows)
+        return chunks
 
+    def reduce_chunks(self, ufunc: np.ufunc, chunk_rows: int = 1_000_000) -> np.ndarray:
+        """
+        Reduce the output of the chain along its rows with a binary ufunc, chunk by chunk - e.g. np.minimum
+        for the minimum of each column. see TransformStreaming
+        """
+        return TransformStreaming.reduce_chunks(self.__get_chain_links(), ufunc, chunk_rows)
+
+    def get_fingerprint(self) -> Any:
+        """
+        Return the fingerprint of the output of the chain - it changes when the output of .run() may change.
+        Return None if the output can not be tracked, see ._get_fingerprint() - it may change at each .run().
+        """
+        chain_fingerprint = TransformLinkBase.__get_chain_fingerprints(self.__get_chain_links())[-1]
+        return None if isinstance(chain_fingerprint, _UntrackedFingerprint) else chain_fingerprint
+
+    def invalidate(self) -> None:
+        """
+        Drop the cached outputs of this link and of the links downstream of it, so they run again at the next .run()
+        - e.g. when the output of this link depends on a state which is not part of its fingerprint.
+        """
+        current_transform: TransformLinkBase | None = self
+        while current_transform is not None:
+            current_transform.__drop_cached_output()
+            current_transform = current_transform.next_transform
+
+    @staticmethod
+    def clear_cache() -> None:
+        """
+        Drop the cached outputs of all the links.
+        """
+        for link_ref, _ in list(TransformLinkBase.__cache_lru.values()):
+            link = link_ref()
+            if link is not None:
+                link.__drop_cached_output()
+        TransformLinkBase.__cache_lru.clear()
+        TransformLinkBase.__cache_bytes = 0
+
+    @staticmethod
+    def get_cache_bytes() -> int:
+        """
+        Return the number of bytes of all the cached outputs.
+        """
+        return TransformLinkBase.__cache_bytes
+
+    ###########################################################################
+
+    def __get_chain_links(self) -> list['TransformLinkBase']:
+        """
+        Return the links of the chain, from the first one to the last one.
+        """
         # Find the first transform in the chain
         first_transform = self
         while first_transform.previous_transform is not None:
             first_transform = first_transform.previous_transform
 
-        # Run the chain of transforms
-        np_array = np.array([])  # Start with an empty array
-        current_transform = first_transform
+        chain_links: list[TransformLinkBase] = []
+        current_transform: TransformLinkBase | None = first_transform
         while current_transform is not None:
-            # Run this transform
-            np_array = current_transform._run(np_array)
-            # Move to the next transform
+            chain_links.append(current_transform)
             current_transform = current_transform.next_transform
+        return chain_links
+
+    @staticmethod
+    def __get_chain_fingerprints(chain_links: list['TransformLinkBase']) -> list[Any]:
+        """
+        Return the fingerprint of the output of each link - from the fingerprint of its input and of its parameters.
+        Downstream of a link which can not be tracked, they are _UntrackedFingerprint, which match no cached output.
+        """
+        chain_fingerprints: list[Any] = []
+        input_fingerprint: Any = ()
+        for link in chain_links:
+            link_fingerprint = link._get_fingerprint()
+            if link_fingerprint is None or isinstance(input_fingerprint, _UntrackedFingerprint):
+                input_fingerprint = _UntrackedFingerprint()
+            else:
+                input_fingerprint = (input_fingerprint, type(link).__qualname__, link_fingerprint)
+            chain_fingerprints.append(input_fingerprint)
+        return chain_fingerprints
 
+    def __set_cached_output(self, np_array: np.ndarray, fingerprint: Any) -> np.ndarray:
+        """
+        Cache the output of this link, and evict the least recently used outputs above CACHE_MAX_BYTES.
+        Return the output as a read-only view, so the cached output can not be modified in place by the caller.
+        """
+        self.__drop_cached_output()
+        # NOTE: a view, not the array itself - the output may be owned by the caller, e.g. the input of TransformLinkImmediate
+        if isinstance(np_array, np.ndarray) and np_array.flags.writeable:
+            np_array = np_array.view()
+            np_array.flags.writeable = False
+        # NOTE: a memory-mapped output is not held in memory - e.g. the output of TransformLinkLoad on a local file
+        output_bytes = np_array.nbytes if isinstance(np_array, np.ndarray) and not isinstance(np_array, np.memmap) else 0
+        if output_bytes > TransformLinkBase.CACHE_MAX_BYTES or isinstance(fingerprint, _UntrackedFingerprint):
+            return np_array
+
+        # NOTE: the weak reference drops the accounting of a link when it is garbage collected
+        link_id = id(self)
+        TransformLinkBase.__cache_lru[link_id] = (weakref.ref(self, lambda _: TransformLinkBase.__forget_link(link_id)), output_bytes)
+        TransformLinkBase.__cache_bytes += output_bytes
+        self._cached_output = np_array
+        self._cached_fingerprint = fingerprint
+
+        while TransformLinkBase.__cache_bytes > TransformLinkBase.CACHE_MAX_BYTES:
+            _, (link_ref, _) = next(iter(TransformLinkBase.__cache_lru.items()))
+            link = link_ref()
+            if link is not None:
+                link.__drop_cached_output()
+            else:
+                TransformLinkBase.__forget_link(next(iter(TransformLinkBase.__cache_lru)))
         return np_array
-        
+
+    def __drop_cached_output(self) -> None:
+        self._cached_output = None
+        self._cached_fingerprint = None
+        TransformLinkBase.__forget_link(id(self))
+
+    @staticmethod
+    def __forget_link(link_id: int) -> None:
+        cache_entry = TransformLinkBase.__cache_lru.pop(link_id, None)
+        if cache_entry is not None:
+            TransformLinkBase.__cache_bytes -= cache_entry[1]
+
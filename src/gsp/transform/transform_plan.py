@@ -0,0 +1,102 @@
+# stdlib imports
+import typing
+
+# pip imports
+import numpy as np
+
+# local imports
+if typing.TYPE_CHECKING:
+    from .transform_link_base import TransformLinkBase
+
+
+class TransformElementwiseOp:
+    """
+    An elementwise operation of a link, as a numpy ufunc: `ufunc(x)`, `ufunc(x, operand)` or `ufunc(operand, x)`.
+    A link returns it from ._get_elementwise_op() to be fused with its neighbours, see TransformPlan.
+    """
+
+    __slots__ = ("ufunc", "operand", "is_operand_first")
+
+    def __init__(self, ufunc: np.ufunc, operand: typing.Any = None, is_operand_first: bool = False) -> None:
+        """
+        Arguments:
+            ufunc (np.ufunc): the numpy ufunc - unary if operand is None, else binary
+            operand (Any): the scalar operand of a binary ufunc, None for a unary ufunc
+            is_operand_first (bool): True to compute `ufunc(operand, x)` instead of `ufunc(x, operand)`
+        """
+        self.ufunc = ufunc
+        self.operand = operand
+        self.is_operand_first = is_operand_first
+
+    def apply(self, np_array: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Apply the operation on the array, in the `out` array if given - it may be np_array itself.
+        """
+        if self.operand is None:
+            return self.ufunc(np_array, out=out)
+        if self.is_operand_first:
+            return self.ufunc(self.operand, np_array, out=out)
+        return self.ufunc(np_array, self.operand, out=out)
+
+
+class TransformPlan:
+    """
+    Execution plan of a chain of links: the consecutive elementwise links are fused in a single step,
+    which allocates a single output buffer and applies each operation in place in it - with `out=`.
+    The other links - opaque to the planner - run one by one, as before.
+
+    So a chain of 5 elementwise links on a 10M x 3 float64 array allocates 240MB once instead of 5 times.
+    """
+
+    @staticmethod
+    def get_steps(chain_links: "list[TransformLinkBase]") -> "list[list[TransformLinkBase]]":
+        """
+        Split the links in steps: each step is either a single link, or consecutive elementwise links to fuse.
+        """
+        steps: list[list[TransformLinkBase]] = []
+        is_previous_elementwise = False
+        for link in chain_links:
+            is_elementwise = link._get_elementwise_op() is not None
+            if is_elementwise and is_previous_elementwise:
+                steps[-1].append(link)
+            else:
+                steps.append([link])
+            is_previous_elementwise = is_elementwise
+        return steps
+
+    @staticmethod
+    def run_step(step_links: "list[TransformLinkBase]", np_array: np.ndarray) -> np.ndarray:
+        """
+        Run a step of the plan on its input, and return the output of its last link. The input is never modified.
+        """
+        if len(step_links) == 1 or not TransformPlan.__is_fusable_input(np_array):
+            for link in step_links:
+                np_array = link._run(np_array)
+            return np_array
+
+        elementwise_ops = [typing.cast(TransformElementwiseOp, link._get_elementwise_op()) for link in step_links]
+
+        # the first operation allocates the buffer, the next ones work in place in it
+        buffer = elementwise_ops[0].apply(np_array)
+        for elementwise_op in elementwise_ops[1:]:
+            if not TransformPlan.__is_fusable_input(buffer):
+                buffer = elementwise_op.apply(buffer)
+            elif TransformPlan.__get_result_dtype(elementwise_op, buffer) == buffer.dtype:
+                elementwise_op.apply(buffer, out=buffer)
+            else:
+                # the dtype changes, e.g. an integer division - a new buffer is needed
+                buffer = elementwise_op.apply(buffer)
+        return buffer
+
+    @staticmethod
+    def __is_fusable_input(np_array: typing.Any) -> bool:
+        return isinstance(np_array, np.ndarray) and np_array.ndim > 0 and not np_array.dtype.hasobject
+
+    @staticmethod
+    def __get_result_dtype(elementwise_op: TransformElementwiseOp, np_array: np.ndarray) -> np.dtype:
+        """
+        Return the dtype of the result of the operation on the array - computed on a single element, as numpy
+        promotes the python scalars depending on their value.
+        """
+        probe_array = np_array.reshape(-1)[:1] if np_array.size > 0 else np.zeros(1, dtype=np_array.dtype)
+        return elementwise_op.apply(probe_array).dtype
@@ -0,0 +1,88 @@
+# stdlib imports
+import typing
+from collections.abc import Iterator
+
+# pip imports
+import numpy as np
+
+# local imports
+from .transform_plan import TransformPlan
+
+if typing.TYPE_CHECKING:
+    from .transform_link_base import TransformLinkBase
+
+
+class TransformStreaming:
+    """
+    Streaming execution of a chain of links over row chunks - the rows of the first axis - so the full array is never in memory.
+
+    - the first link is the source of the chunks, see TransformLinkBase._get_chunks(). e.g. TransformLinkLoad reads
+      the chunks from a memory-mapped local file, or with HTTP range requests.
+    - the next links must be row-independent, see TransformLinkBase._get_chunked_shape(). The elementwise links
+      are fused per chunk, see TransformPlan. The shape assertions are checked once, on the shape of the full array,
+      before any chunk is read.
+    - the reductions along the rows - e.g. the bounding box of the data - are explicit, see .reduce_chunks()
+    """
+
+    @staticmethod
+    def run_chunks(chain_links: "list[TransformLinkBase]", chunk_rows: int) -> tuple[tuple[int, ...], Iterator[np.ndarray]]:
+        """
+        Return the shape of the full output of the chain, and an iterator over its row chunks.
+
+        Raises:
+            ValueError: if the first link is not a source of chunks, or if a link is not row-independent,
+                or if a shape assertion fails. It is raised by this call, before any chunk is read.
+        """
+        assert chunk_rows > 0, f"chunk_rows must be > 0, got {chunk_rows}"
+        source_link, downstream_links = chain_links[0], chain_links[1:]
+        source_chunks = source_link._get_chunks(chunk_rows)
+        if source_chunks is None:
+            raise ValueError(f"{type(source_link).__name__} can not be streamed by chunks - the first link of the chain must be a chunk source, e.g. TransformLinkLoad")
+        output_shape, chunks = source_chunks
+
+        # check the links, and compute the shape of the output, without reading any chunk
+        for link in downstream_links:
+            link_output_shape = link._get_chunked_shape(output_shape)
+            if link_output_shape is None:
+                raise ValueError(f"{type(link).__name__} is not row-independent, it can not be streamed by chunks - use .run()")
+            output_shape = link_output_shape
+
+        return output_shape, TransformStreaming.__iter_output_chunks(chunks, TransformPlan.get_steps(downstream_links))
+
+    @staticmethod
+    def reduce_chunks(chain_links: "list[TransformLinkBase]", ufunc: np.ufunc, chunk_rows: int) -> np.ndarray:
+        """
+        Reduce the output of the chain along its rows with a binary ufunc, chunk by chunk - e.g. np.minimum for the
+        minimum of each column, or np.add for their sum.
+
+        Raises:
+            ValueError: same as .run_chunks(), or if the output has no rows.
+        """
+        _, chunks = TransformStreaming.run_chunks(chain_links, chunk_rows)
+        reduced_array: np.ndarray | None = None
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            chunk_reduced = ufunc.reduce(chunk, axis=0)
+            reduced_array = chunk_reduced if reduced_array is None else ufunc(reduced_array, chunk_reduced)
+        if reduced_array is None:
+            raise ValueError("The output of the chain has no rows to reduce")
+        return reduced_array
+
+    @staticmethod
+    def iter_row_chunks(np_array: np.ndarray, chunk_rows: int) -> Iterator[np.ndarray]:
+        """
+        Iterate over the row chunks of an array - views, not copies. A 0-d array is a single chunk.
+        """
+        if np_array.ndim == 0:
+            yield np_array
+            return
+        for chunk_start in range(0, len(np_array), chunk_rows):
+            yield np_array[chunk_start : chunk_start + chunk_rows]
+
+    @staticmethod
+    def __iter_output_chunks(chunks: Iterator[np.ndarray], steps: "list[list[TransformLinkBase]]") -> Iterator[np.ndarray]:
+        for chunk in chunks:
+            for step_links in steps:
+                chunk = TransformPlan.run_step(step_links, chunk) if len(step_links) > 1 else step_links[0]._run_chunk(chunk)
+            yield chunk
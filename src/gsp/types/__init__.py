@@ -1,4 +1,7 @@
 from .diffable_ndarray.diffable_ndarray import DiffableNdarray
 from .diffable_ndarray.diffable_ndarray_serialisation import DiffableNdarraySerialisation, DiffableNdarrayDb, DiffableNdarraySerialisationError
+from .diffable_ndarray.diffable_ndarray_lru_store import DiffableNdarrayLruStore, DiffableNdarrayLruNamespace, DiffableNdarrayLruStats
 from .ndarray_like_utils import NdarrayLikeUtils, NdarrayLikeSerializedType
 from .ndarray_like_type import NdarrayLikeType
+from .ndarray_serialisation import NdarraySerialisation, NdarrayEncodingType
+from .spatial_index import SpatialIndex
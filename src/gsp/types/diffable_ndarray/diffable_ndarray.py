@@ -1,6 +1,10 @@
+import collections
 import numpy as np
 import typing
 
+DiffTrackingPolicy = typing.Literal["bbox", "multi_bbox", "row_bitmap"]
+"""How a DiffableNdarray tracks its modifications. see DiffableNdarray"""
+
 
 class DiffableNdarray(np.ndarray):
     """
@@ -16,22 +20,46 @@ class DiffableNdarray(np.ndarray):
     retrieve the bounding box and the modified region.
 
     ### Analysis
-    Here we took the policy to have a single bounding box for all modifications.
+    The default policy is to have a single bounding box for all modifications.
     This may produce a larger bounding box than strictly necessary if modifications
     are scattered. To track per indice modifications, would reduce the serialised size
     further, but would increase the local memory usage.
 
-    ### Possible other policies
-    - Track per indice modifications (more memory usage, smaller serialised size)
-    - Track single bounding box per axis (less memory usage, larger serialised size)
-    - Track multiple bounding boxes (more memory usage, smaller serialised size, more complex code/maintenance)
+    ### Tracking policies
+    - "bbox": a single bounding box for all modifications (least memory usage, larger serialised size)
+    - "multi_bbox": up to `max_boxes` bounding boxes, the closest ones are merged when there are too many
+    - "row_bitmap": one dirty flag per row of the first axis, patches are the runs of consecutive dirty rows
+      (one bool per row of memory usage, smallest serialised size for scattered rows)
+
+    Whatever the policy, the single bounding box is always tracked, so .get_diff_slices() and .get_diff_data() are available.
+    Use .get_diff_patches() to get the patches according to the policy.
+
+    ### Tracked mutations
+    - item assignment: `arr[key] = value`, with any numpy key (int, slice, Ellipsis, np.newaxis, integer arrays, boolean masks)
+    - in-place ufuncs: `arr *= 2`, `np.add(a, b, out=arr)`, `np.add.at(arr, indices, 1)`
+    - in-place numpy functions: `np.copyto(arr, ...)`, `np.put(arr, ...)`, `np.putmask(arr, ...)`, `np.place(arr, ...)`, `np.fill_diagonal(arr, ...)`, `arr.fill(...)`
+    - writes through views: `view = arr[10:20]; view[:] = 0` marks the rows 10 to 20 of `arr` as modified
     """
 
-    def __new__(cls, input_array) -> "DiffableNdarray":
+    MODIFIED_ROWS_LOG_SIZE = 64
+    """The number of modifications logged for .get_modified_rows_since()"""
+
+    def __new__(cls, input_array, tracking_policy: DiffTrackingPolicy = "bbox", max_boxes: int = 8) -> "DiffableNdarray":
+        """
+        Arguments:
+            input_array: the array-like data
+            tracking_policy (DiffTrackingPolicy): how modifications are tracked, "bbox", "multi_bbox" or "row_bitmap"
+            max_boxes (int): the maximum number of bounding boxes for the "multi_bbox" policy
+        """
         obj = np.asarray(input_array).view(cls)
+        assert tracking_policy != "row_bitmap" or obj.ndim >= 1, "row_bitmap policy requires at least one dimension"
         obj._uuid = DiffableNdarray.get_new_uuid()
-        obj._diff_min = typing.cast(list[int | None], [None] * obj.ndim)
-        obj._diff_max = typing.cast(list[int | None], [None] * obj.ndim)
+        obj._tracking_policy = tracking_policy
+        obj._max_boxes = max_boxes
+        obj._root = None
+        obj._version = 0
+        obj._modified_rows_log = collections.deque(maxlen=DiffableNdarray.MODIFIED_ROWS_LOG_SIZE)
+        obj._reset_diff()
         return obj
 
     def __array_finalize__(self, obj):
@@ -42,36 +70,201 @@ class DiffableNdarray(np.ndarray):
         # Copy the attribute from the original object (if it exists)
         # FIXME what is the difference with __new__ ? when it comes to those attributes ?
         self._uuid = obj._uuid if hasattr(obj, "_uuid") else DiffableNdarray.get_new_uuid()
+        self._tracking_policy = obj._tracking_policy if hasattr(obj, "_tracking_policy") else "bbox"
+        self._max_boxes = obj._max_boxes if hasattr(obj, "_max_boxes") else 8
         self._diff_min = obj._diff_min if hasattr(obj, "_diff_min") else [None] * self.ndim
         self._diff_max = obj._diff_max if hasattr(obj, "_diff_max") else [None] * self.ndim
+        self._diff_boxes = obj._diff_boxes if hasattr(obj, "_diff_boxes") else []
+        # A view on a DiffableNdarray gets its own tracking state, and forwards its modifications to the root array it views
+        obj_root = getattr(obj, "_root", None)
+        if obj_root is None and isinstance(obj, DiffableNdarray):
+            obj_root = obj
+        # NOTE: shape and strides are not final yet here (e.g. for a transpose), only ndim can be relied on,
+        # so views always use the "bbox" policy, and map their modifications to the root at modification time
+        self._version = 0
+        """The number of modifications of this array, never reset - see .get_version()"""
+        self._modified_rows_log: collections.deque[tuple[int, int, int]] = collections.deque(maxlen=DiffableNdarray.MODIFIED_ROWS_LOG_SIZE)
+        """The (version, start, stop) rows of the first axis of the last modifications - see .get_modified_rows_since()"""
+        if obj_root is not None and self.base is not None and np.may_share_memory(self, obj_root):
+            self._root: DiffableNdarray | None = obj_root
+            """The DiffableNdarray this array is a view on, None if it is not a view"""
+            self._tracking_policy = "bbox"
+            self._reset_diff()
+            return
+        self._root = None
+        self._diff_rows = obj._diff_rows if hasattr(obj, "_diff_rows") else None
 
     def _reset_diff(self) -> None:
         self._diff_min: list[int | None] = [None] * self.ndim
         self._diff_max: list[int | None] = [None] * self.ndim
+        self._diff_boxes: list[list[tuple[int, int]]] = []
+        """bounding boxes for the "multi_bbox" policy, each box is a (start, stop) per axis"""
+        self._diff_rows: np.ndarray | None = np.zeros(self.shape[0], dtype=bool) if self._tracking_policy == "row_bitmap" else None
+        """dirty flag per row of the first axis for the "row_bitmap" policy"""
 
     def __setitem__(self, key, value) -> None:
-        # Update diff bounds
-        indexes = self._normalize_key(key)
-        self._update_diff_minmax(indexes)
+        # Normalize the key first - it raises on unsupported keys
+        indexes, rows = self._normalize_key(key)
         super().__setitem__(key, value)
+        # Update diff bounds - only once the assignment succeeded
+        self._update_diff_minmax(indexes, rows)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # Run the ufunc on plain np.ndarray - ndarray.__array_ufunc__ refuses subclasses overriding it
+        inputs_np = [np.asarray(_input) if isinstance(_input, DiffableNdarray) else _input for _input in inputs]
+        outputs = kwargs.get("out", None)
+        if outputs is not None:
+            kwargs["out"] = tuple(np.asarray(output) if isinstance(output, DiffableNdarray) else output for output in outputs)
+        else:
+            outputs = (None,) * ufunc.nout
+
+        results = super().__array_ufunc__(ufunc, method, *inputs_np, **kwargs)
+        if results is NotImplemented:
+            return NotImplemented
+
+        # ufunc.at() modifies its first input in place at the given indices - e.g. np.add.at(arr, indices, 1)
+        if method == "at":
+            if isinstance(inputs[0], DiffableNdarray):
+                indexes, rows = inputs[0]._normalize_key(inputs[1])
+                inputs[0]._update_diff_minmax(indexes, rows)
+            return None
+
+        # Track the in-place modifications - e.g. arr += 1 or np.add(arr, 1, out=arr)
+        for output in outputs:
+            if isinstance(output, DiffableNdarray):
+                output._update_diff_minmax([(0, dim) for dim in output.shape], None)
+
+        # Return the DiffableNdarray outputs as is, and wrap the new arrays as DiffableNdarray
+        if ufunc.nout == 1:
+            results = (results,)
+        results = tuple(
+            output if output is not None else (result.view(DiffableNdarray) if isinstance(result, np.ndarray) else result)
+            for result, output in zip(results, outputs)
+        )
+        return results[0] if ufunc.nout == 1 else results
+
+    _INPLACE_FUNCTIONS = {np.copyto: "dst", np.put: "a", np.putmask: "a", np.place: "arr", np.fill_diagonal: "a"}
+    """numpy functions which modify one of their arguments in place, and the name of this argument"""
+
+    def __array_function__(self, func, types, args, kwargs):
+        result = super().__array_function__(func, types, args, kwargs)
+
+        # Track the numpy functions modifying an array in place - e.g. np.copyto(arr, values)
+        if func in DiffableNdarray._INPLACE_FUNCTIONS:
+            modified = args[0] if len(args) > 0 else kwargs.get(DiffableNdarray._INPLACE_FUNCTIONS[func])
+            if isinstance(modified, DiffableNdarray):
+                modified._update_diff_minmax([(0, dim) for dim in modified.shape], None)
+        return result
+
+    def fill(self, value) -> None:
+        super().fill(value)
+        self._update_diff_minmax([(0, dim) for dim in self.shape], None)
+
+    def _normalize_key(self, key) -> tuple[list[tuple[int, int]], slice | np.ndarray]:
+        """
+        Convert an index key into the bounding box it modifies, as a (start, stop) per axis, and the exact
+        rows of the first axis it modifies, as a slice or an array of indices.
 
-    def _normalize_key(self, key) -> list[tuple[int, int]]:
-        # Convert key to a tuple of slices/indices for each axis
+        Supported keys: int (including negative and numpy integers), slice, Ellipsis, np.newaxis,
+        integer arrays and boolean masks, and tuples of them.
+        """
+        empty_modification = ([(0, 0)] * self.ndim, slice(0, 0))
+
+        # Convert key to a list of entries, with array-like entries as np.ndarray
         if not isinstance(key, tuple):
             key = (key,)
-        key = list(key) + [slice(None)] * (self.ndim - len(key))
-        indexes = []
-        for i, k in enumerate(key):
-            if isinstance(k, int):
-                indexes.append((k, k + 1))
+        key = [np.asarray(k) if isinstance(k, (list, np.ndarray, bool, np.bool_)) else k for k in key]
+
+        # Expand the Ellipsis, or pad with full slices, to cover all the axes
+        def consumed_axis_count(k) -> int:
+            if k is None or k is Ellipsis:
+                return 0
+            if isinstance(k, np.ndarray) and k.dtype == bool:
+                return k.ndim
+            return 1
+
+        missing_axis_count = self.ndim - sum(consumed_axis_count(k) for k in key)
+        ellipsis_indexes = [i for i, k in enumerate(key) if k is Ellipsis]
+        if len(ellipsis_indexes) > 1:
+            raise IndexError("an index can only have a single ellipsis ('...')")
+        elif len(ellipsis_indexes) == 1:
+            ellipsis_index = ellipsis_indexes[0]
+            key = key[:ellipsis_index] + [slice(None)] * missing_axis_count + key[ellipsis_index + 1 :]
+        else:
+            key = key + [slice(None)] * missing_axis_count
+
+        def indices_minmax(axis_indices: np.ndarray) -> tuple[int, int]:
+            if axis_indices.size == 0:
+                return (0, 0)
+            return (int(axis_indices.min()), int(axis_indices.max()) + 1)
+
+        indexes: list[tuple[int, int]] = []
+        rows: slice | np.ndarray = slice(0, 0)
+        axis = 0
+        for k in key:
+            if k is None:
+                # np.newaxis does not consume any axis
+                continue
+            elif isinstance(k, np.ndarray) and k.dtype == bool:
+                # boolean mask - consumes k.ndim axes
+                if k.ndim == 0:
+                    if bool(k) is False:
+                        return empty_modification
+                    continue
+                mask_indices = np.nonzero(k)
+                for axis_indices in mask_indices:
+                    indexes.append(indices_minmax(axis_indices))
+                if axis == 0:
+                    rows = mask_indices[0]
+                axis += k.ndim
+            elif isinstance(k, np.ndarray):
+                # integer array
+                if not np.issubdtype(k.dtype, np.integer):
+                    raise TypeError(f"Unsupported index array dtype: {k.dtype}")
+                axis_indices = np.where(k < 0, k + self.shape[axis], k)
+                indexes.append(indices_minmax(axis_indices))
+                if axis == 0:
+                    rows = axis_indices.ravel()
+                axis += 1
+            elif isinstance(k, (int, np.integer)):
+                index = int(k) + self.shape[axis] if k < 0 else int(k)
+                if index < 0 or index >= self.shape[axis]:
+                    raise IndexError(f"index {int(k)} is out of bounds for axis {axis} with size {self.shape[axis]}")
+                indexes.append((index, index + 1))
+                if axis == 0:
+                    rows = slice(index, index + 1)
+                axis += 1
             elif isinstance(k, slice):
-                start, stop, step = k.indices(self.shape[i])
+                axis_range = range(*k.indices(self.shape[axis]))
+                if len(axis_range) == 0:
+                    return empty_modification
+                start = min(axis_range[0], axis_range[-1])
+                stop = max(axis_range[0], axis_range[-1]) + 1
                 indexes.append((start, stop))
+                if axis == 0:
+                    rows = slice(start, stop) if abs(axis_range.step) == 1 else np.arange(start, stop, abs(axis_range.step))
+                axis += 1
             else:
                 raise TypeError(f"Unsupported index type: {type(k)}")
-        return indexes
 
-    def _update_diff_minmax(self, indexes: list[tuple[int, int]]) -> None:
+        if axis > self.ndim:
+            raise IndexError(f"too many indices for array: array is {self.ndim}-dimensional, but {axis} were indexed")
+
+        return indexes, rows
+
+    def _update_diff_minmax(self, indexes: list[tuple[int, int]], rows: slice | np.ndarray | None = None) -> None:
+        """
+        Update the tracked modifications with the bounding box `indexes`, and the exact `rows` of the first axis if known.
+        """
+        # ignore empty modifications
+        if any(start >= stop for start, stop in indexes):
+            return
+
+        self._version += 1
+        if self.ndim >= 1:
+            self._modified_rows_log.append((self._version, indexes[0][0], indexes[0][1]))
+
+        # the single bounding box is always tracked
         for axis, (start, stop) in enumerate(indexes):
             diff_min = self._diff_min[axis]
             diff_max = self._diff_max[axis]
@@ -80,6 +273,103 @@ class DiffableNdarray(np.ndarray):
             if diff_max is None or stop > diff_max:
                 self._diff_max[axis] = stop
 
+        # honor the tracking policy
+        if self._tracking_policy == "multi_bbox":
+            self._diff_boxes.append(list(indexes))
+            while len(self._diff_boxes) > self._max_boxes:
+                self._merge_closest_boxes()
+        elif self._tracking_policy == "row_bitmap":
+            assert self._diff_rows is not None
+            if rows is not None:
+                self._diff_rows[rows] = True
+            else:
+                start, stop = indexes[0]
+                self._diff_rows[start:stop] = True
+
+        # forward the modification to the array this one is a view on
+        if self._root is not None:
+            self._root._update_diff_from_view(self, indexes)
+
+    def _update_diff_from_view(self, view: "DiffableNdarray", indexes: list[tuple[int, int]]) -> None:
+        """
+        Mark as modified the elements of this array viewed by the bounding box `indexes` of `view`.
+
+        The view elements are mapped back to this array from their memory offsets, so it works for
+        any view (slices with steps, transposes, reshapes...).
+        """
+        # the offsets can be mapped back to indices only on a C-contiguous array - mark it all as modified otherwise
+        if self.size == 0 or not self.flags.c_contiguous:
+            self._update_diff_minmax([(0, dim) for dim in self.shape], None)
+            return
+
+        view_offset = view.__array_interface__["data"][0] - self.__array_interface__["data"][0]
+
+        # fast path: a view with the same strides is a box of this array - e.g. arr[10:20] or arr[2:4, 1:3]
+        if view.ndim == self.ndim and view.strides == self.strides:
+            view_start = np.unravel_index(view_offset // self.itemsize, self.shape)
+            root_indexes = [(int(start) + view_start_axis, int(stop) + view_start_axis) for (start, stop), view_start_axis in zip(indexes, view_start)]
+            self._update_diff_minmax(root_indexes, None)
+            return
+
+        # general path: computed from the strides in O(ndim), without any per-element offset - e.g. a transpose or a reshape
+        first_offset = view_offset + sum(min(start * stride, (stop - 1) * stride) for (start, stop), stride in zip(indexes, view.strides))
+        first_index = [int(axis_index) for axis_index in np.unravel_index(first_offset // self.itemsize, self.shape)]
+
+        # - exact box if each view axis moves along a distinct axis of this array, without wrapping - e.g. arr.T[1, 4:10:3]
+        root_indexes = [(axis_index, axis_index + 1) for axis_index in first_index]
+        is_box = True
+        mapped_axes: set[int] = set()
+        for (start, stop), stride in zip(indexes, view.strides):
+            if stop - start <= 1:
+                continue
+            root_axis = next((axis for axis in range(self.ndim) if abs(stride) % self.strides[axis] == 0), None)
+            if root_axis is None or root_axis in mapped_axes:
+                is_box = False
+                break
+            mapped_axes.add(root_axis)
+            root_stop = first_index[root_axis] + (stop - start - 1) * (abs(stride) // self.strides[root_axis]) + 1
+            if root_stop > self.shape[root_axis]:
+                is_box = False
+                break
+            root_indexes[root_axis] = (first_index[root_axis], root_stop)
+
+        # - else the bounding box of the byte range of the modified elements
+        if not is_box:
+            last_offset = view_offset + sum(max(start * stride, (stop - 1) * stride) for (start, stop), stride in zip(indexes, view.strides))
+            last_index = [int(axis_index) for axis_index in np.unravel_index(last_offset // self.itemsize, self.shape)]
+            root_indexes = []
+            for axis, dim in enumerate(self.shape):
+                # the next axes are bounded only while the range is within a single index of the previous axes
+                is_single_prefix = all(first_index[prefix_axis] == last_index[prefix_axis] for prefix_axis in range(axis))
+                root_indexes.append((first_index[axis], last_index[axis] + 1) if is_single_prefix else (0, dim))
+        self._update_diff_minmax(root_indexes, None)
+
+    def _merge_closest_boxes(self) -> None:
+        """
+        Merge the two boxes whose merged box adds the least volume. Used by the "multi_bbox" policy.
+        """
+
+        def box_volume(box: list[tuple[int, int]]) -> int:
+            return int(np.prod([stop - start for start, stop in box]))
+
+        def merge_boxes(box1: list[tuple[int, int]], box2: list[tuple[int, int]]) -> list[tuple[int, int]]:
+            return [(min(start1, start2), max(stop1, stop2)) for (start1, stop1), (start2, stop2) in zip(box1, box2)]
+
+        best_cost: int | None = None
+        best_pair = (0, 1)
+        for index1 in range(len(self._diff_boxes)):
+            for index2 in range(index1 + 1, len(self._diff_boxes)):
+                box1, box2 = self._diff_boxes[index1], self._diff_boxes[index2]
+                cost = box_volume(merge_boxes(box1, box2)) - box_volume(box1) - box_volume(box2)
+                if best_cost is None or cost < best_cost:
+                    best_cost = cost
+                    best_pair = (index1, index2)
+
+        index1, index2 = best_pair
+        merged_box = merge_boxes(self._diff_boxes[index1], self._diff_boxes[index2])
+        del self._diff_boxes[index2]
+        self._diff_boxes[index1] = merged_box
+
     def _get_diff_slices(self) -> None | tuple[slice, ...]:
         if any(m is None for m in self._diff_min):
             return None  # No changes
@@ -115,10 +405,44 @@ class DiffableNdarray(np.ndarray):
         """
         new_copy = super().copy(order=order).view(DiffableNdarray)
         new_copy._uuid = DiffableNdarray.get_new_uuid()
+        new_copy._tracking_policy = self._tracking_policy
+        new_copy._max_boxes = self._max_boxes
         new_copy._diff_min = self._diff_min.copy()
         new_copy._diff_max = self._diff_max.copy()
+        new_copy._diff_boxes = [box.copy() for box in self._diff_boxes]
+        new_copy._diff_rows = self._diff_rows.copy() if self._diff_rows is not None else None
+        new_copy._root = None
         return new_copy
 
+    def get_tracking_policy(self) -> DiffTrackingPolicy:
+        """
+        Return the tracking policy of this DiffableNdarray. see DiffableNdarray
+        """
+        return self._tracking_policy
+
+    def get_version(self) -> int:
+        """
+        Return the number of modifications of this array. Unlike the diff, it is not reset by .clear_diff(),
+        so it tells if the array changed since an earlier call, e.g. to skip the rendering of unchanged visuals.
+        """
+        return self._version
+
+    def get_modified_rows_since(self, version: int) -> tuple[int, int] | None:
+        """
+        Return the (start, stop) range of the rows of the first axis modified since .get_version() returned `version`.
+        It is independent of the diff, so it works even if the diff has been cleared since - e.g. by the serialisation.
+
+        Returns:
+            tuple[int, int] | None: the range of modified rows, (0, 0) if none. None if the modifications are too old
+                to be known - only the last MODIFIED_ROWS_LOG_SIZE modifications are logged.
+        """
+        if version == self._version:
+            return (0, 0)
+        if version > self._version or self.ndim == 0 or len(self._modified_rows_log) == 0 or self._modified_rows_log[0][0] > version + 1:
+            return None
+        modified_rows = [(start, stop) for log_version, start, stop in self._modified_rows_log if log_version > version]
+        return (min(start for start, _ in modified_rows), max(stop for _, stop in modified_rows))
+
     def is_modified(self) -> bool:
         slices = self._get_diff_slices()
         return slices is not None
@@ -145,6 +469,31 @@ class DiffableNdarray(np.ndarray):
 
         return diff_data
 
+    def get_diff_patches(self) -> list[tuple[tuple[slice, ...], np.ndarray]]:
+        """
+        Return the modified regions according to the tracking policy, as a list of (slices, data).
+        Raises an assertion error if there are no modifications (use is_modified() to check).
+        """
+        diff_slices = self._get_diff_slices()
+        assert diff_slices is not None, "No modifications to get diff patches from (use is_modified() to check)"
+
+        if self._tracking_policy == "multi_bbox":
+            slices_list = [tuple(slice(start, stop) for start, stop in box) for box in self._diff_boxes]
+        elif self._tracking_policy == "row_bitmap":
+            # build the runs of consecutive dirty rows
+            assert self._diff_rows is not None
+            dirty_rows = np.flatnonzero(self._diff_rows)
+            run_breaks = np.flatnonzero(np.diff(dirty_rows) > 1)
+            run_starts = np.concatenate(([dirty_rows[0]], dirty_rows[run_breaks + 1]))
+            run_stops = np.concatenate((dirty_rows[run_breaks] + 1, [dirty_rows[-1] + 1]))
+            full_axes = tuple(slice(0, dim) for dim in self.shape[1:])
+            slices_list = [(slice(int(start), int(stop)),) + full_axes for start, stop in zip(run_starts, run_stops)]
+        else:
+            slices_list = [diff_slices]
+
+        diff_patches = [(slices, np.asarray(self[slices])) for slices in slices_list]
+        return diff_patches
+
     # TODO to rename .clear_modifications() ?
     def clear_diff(self) -> None:
         """
@@ -0,0 +1,203 @@
+# stdlib imports
+import dataclasses
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, MutableMapping
+from dataclasses import dataclass
+
+# local imports
+from .diffable_ndarray import DiffableNdarray
+
+
+@dataclass
+class DiffableNdarrayLruStats:
+    bytes_held: int = 0
+    """The number of bytes currently held"""
+    array_count: int = 0
+    """The number of arrays currently held"""
+    hits: int = 0
+    """The number of lookups which found the array"""
+    misses: int = 0
+    """The number of lookups which did not find the array"""
+    evictions: int = 0
+    """The number of arrays evicted to stay within the byte budget"""
+
+
+class DiffableNdarrayLruStore:
+    """
+    A bounded LRU store of DiffableNdarray, split in namespaces (typically one per client) sharing a single byte budget.
+
+    Each namespace is a dict-like view, usable as DiffableNdarrayDb.from_json_db:
+    ```
+    store = DiffableNdarrayLruStore(max_bytes=256 * 1024 * 1024)
+    diffable_ndarray_db = DiffableNdarrayDb(from_json_db=store.get_namespace(client_id))
+    ```
+
+    When the store is over budget, the least recently used arrays are evicted, whatever their namespace.
+    A later diff patch for an evicted array raises DiffableNdarraySerialisationError in DiffableNdarraySerialisation.from_json(),
+    so the client has to resend the full data - e.g. the 410 GONE path of the network server.
+    The on_evict callback lets the owner of a namespace drop the state built on its arrays at the same time - e.g. the scene of the client.
+    """
+
+    __slots__ = ("__arrays", "__namespace_uuids", "__namespace_stats", "__max_bytes", "__on_evict")
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, on_evict: Callable[[str], None] | None = None) -> None:
+        """
+        Arguments:
+            max_bytes (int): The maximum number of bytes held by the store. Least recently used arrays are evicted above it.
+            on_evict (Callable[[str], None] | None): called with the namespace of each array evicted to stay within the budget
+        """
+        self.__arrays: OrderedDict[tuple[str, str], DiffableNdarray] = OrderedDict()
+        """Mapping from (namespace, uuid) to DiffableNdarray, in least recently used order"""
+        self.__namespace_uuids: dict[str, dict[str, None]] = {}
+        """The uuids held by each namespace, for iteration"""
+        self.__namespace_stats: dict[str, DiffableNdarrayLruStats] = {}
+        """The stats of each namespace"""
+        self.__max_bytes = max_bytes
+        """The maximum number of bytes held by the store"""
+        self.__on_evict = on_evict
+        """Called with the namespace of each evicted array, None if not set"""
+
+    def get_namespace(self, namespace: str) -> "DiffableNdarrayLruNamespace":
+        """
+        Return the dict-like view on a namespace. It is created if needed.
+        """
+        self._ensure_namespace(namespace)
+        return DiffableNdarrayLruNamespace(self, namespace)
+
+    def get_namespaces(self) -> list[str]:
+        return list(self.__namespace_uuids.keys())
+
+    def drop_namespace(self, namespace: str) -> None:
+        """
+        Remove a namespace and all its arrays, e.g. when a client disconnects.
+        """
+        for uuid in list(self.__namespace_uuids.get(namespace, {}).keys()):
+            self._pop(namespace, uuid)
+        self.__namespace_uuids.pop(namespace, None)
+        self.__namespace_stats.pop(namespace, None)
+
+    def get_stats(self, namespace: str | None = None) -> DiffableNdarrayLruStats:
+        """
+        Return a copy of the stats of a namespace, or the sum over all namespaces if namespace is None.
+        """
+        if namespace is not None:
+            return dataclasses.replace(self.__namespace_stats[namespace])
+        total_stats = DiffableNdarrayLruStats()
+        for namespace_stats in self.__namespace_stats.values():
+            for stats_field in dataclasses.fields(DiffableNdarrayLruStats):
+                setattr(total_stats, stats_field.name, getattr(total_stats, stats_field.name) + getattr(namespace_stats, stats_field.name))
+        return total_stats
+
+    def get_bytes_held(self) -> int:
+        return sum(namespace_stats.bytes_held for namespace_stats in self.__namespace_stats.values())
+
+    def clear(self) -> None:
+        for namespace in list(self.__namespace_uuids.keys()):
+            self.drop_namespace(namespace)
+
+    # =============================================================================
+    # Namespace operations - used by DiffableNdarrayLruNamespace
+    # =============================================================================
+
+    def _ensure_namespace(self, namespace: str) -> None:
+        """
+        Create the namespace if needed - e.g. a namespace view used after .drop_namespace()
+        """
+        if namespace not in self.__namespace_uuids:
+            self.__namespace_uuids[namespace] = {}
+            self.__namespace_stats[namespace] = DiffableNdarrayLruStats()
+
+    def _contains(self, namespace: str, uuid: str) -> bool:
+        """
+        Check if the array is in the store, and count it as a hit or a miss.
+        """
+        self._ensure_namespace(namespace)
+        namespace_stats = self.__namespace_stats[namespace]
+        is_contained = (namespace, uuid) in self.__arrays
+        if is_contained:
+            namespace_stats.hits += 1
+        else:
+            namespace_stats.misses += 1
+        return is_contained
+
+    def _get(self, namespace: str, uuid: str) -> DiffableNdarray:
+        """
+        Return the array and mark it as recently used. Raises KeyError if it is not in the store.
+        """
+        key = (namespace, uuid)
+        array = self.__arrays[key]
+        self.__arrays.move_to_end(key)
+        return array
+
+    def _put(self, namespace: str, uuid: str, array: DiffableNdarray) -> None:
+        """
+        Add an array to the store, and evict the least recently used arrays if the store is over budget.
+        """
+        self._ensure_namespace(namespace)
+        if (namespace, uuid) in self.__arrays:
+            self._pop(namespace, uuid)
+        self.__arrays[(namespace, uuid)] = array
+        self.__namespace_uuids[namespace][uuid] = None
+        namespace_stats = self.__namespace_stats[namespace]
+        namespace_stats.bytes_held += array.nbytes
+        namespace_stats.array_count += 1
+
+        # evict the least recently used arrays - but always keep the array just added
+        bytes_held = self.get_bytes_held()
+        while bytes_held > self.__max_bytes and len(self.__arrays) > 1:
+            (evicted_namespace, evicted_uuid), evicted_array = next(iter(self.__arrays.items()))
+            self._pop(evicted_namespace, evicted_uuid)
+            self.__namespace_stats[evicted_namespace].evictions += 1
+            bytes_held -= evicted_array.nbytes
+            if self.__on_evict is not None:
+                self.__on_evict(evicted_namespace)
+
+    def _pop(self, namespace: str, uuid: str) -> DiffableNdarray:
+        """
+        Remove an array from the store and return it. Raises KeyError if it is not in the store.
+        """
+        array = self.__arrays.pop((namespace, uuid))
+        del self.__namespace_uuids[namespace][uuid]
+        namespace_stats = self.__namespace_stats[namespace]
+        namespace_stats.bytes_held -= array.nbytes
+        namespace_stats.array_count -= 1
+        return array
+
+    def _uuids(self, namespace: str) -> list[str]:
+        return list(self.__namespace_uuids.get(namespace, {}).keys())
+
+    def _count(self, namespace: str) -> int:
+        return len(self.__namespace_uuids.get(namespace, {}))
+
+
+class DiffableNdarrayLruNamespace(MutableMapping[str, DiffableNdarray]):
+    """
+    Dict-like view on a namespace of a DiffableNdarrayLruStore, mapping uuid to DiffableNdarray.
+    """
+
+    __slots__ = ("__store", "__namespace")
+
+    def __init__(self, store: DiffableNdarrayLruStore, namespace: str) -> None:
+        self.__store = store
+        self.__namespace = namespace
+
+    def get_namespace(self) -> str:
+        return self.__namespace
+
+    def __contains__(self, uuid: object) -> bool:
+        return isinstance(uuid, str) and self.__store._contains(self.__namespace, uuid)
+
+    def __getitem__(self, uuid: str) -> DiffableNdarray:
+        return self.__store._get(self.__namespace, uuid)
+
+    def __setitem__(self, uuid: str, array: DiffableNdarray) -> None:
+        self.__store._put(self.__namespace, uuid, array)
+
+    def __delitem__(self, uuid: str) -> None:
+        self.__store._pop(self.__namespace, uuid)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__store._uuids(self.__namespace))
+
+    def __len__(self) -> int:
+        return self.__store._count(self.__namespace)
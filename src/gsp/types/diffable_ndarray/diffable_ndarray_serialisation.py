@@ -1,4 +1,5 @@
 # stdlib imports
+from collections.abc import MutableMapping
 from typing import Any, Literal
 from dataclasses import dataclass, field
 
@@ -7,13 +8,21 @@ import numpy as np
 
 # local imports
 from .diffable_ndarray import DiffableNdarray
+from ..ndarray_serialisation import NdarraySerialisation, NdarrayEncodingType
 
 
 @dataclass
 class DiffableNdarrayDb:
-    to_json_db: dict[str, DiffableNdarray] = field(default_factory=dict)
+    """
+    The databases of DiffableNdarray already sent/received, keyed by their UUIDs.
+
+    They are unbounded dicts by default. For long-running receivers, use a namespace of a DiffableNdarrayLruStore
+    as from_json_db, to bound the memory with a byte budget.
+    """
+
+    to_json_db: MutableMapping[str, DiffableNdarray] = field(default_factory=dict)
     """A simple in-memory database to store DiffableNdarray instances by their UUIDs during serialization."""
-    from_json_db: dict[str, DiffableNdarray] = field(default_factory=dict)
+    from_json_db: MutableMapping[str, DiffableNdarray] = field(default_factory=dict)
     """A simple in-memory database to store DiffableNdarray instances by their UUIDs during deserialization."""
 
 
@@ -38,10 +47,16 @@ class DiffableNdarraySerialisation:
     # =============================================================================
     @staticmethod
     def to_json(
-        diff_ndarray: DiffableNdarray, diff_db: DiffableNdarrayDb
+        diff_ndarray: DiffableNdarray, diff_db: DiffableNdarrayDb, ndarray_encoding: NdarrayEncodingType = "list"
     ) -> dict[str, Any]:
         """
         Serialize the DiffableNdarray to a JSON-serializable dictionary.
+        The dictionary carries the array dtype (and shape for the full data), so the receiver keeps the same dtype whatever the encoding.
+
+        Arguments:
+            diff_ndarray (DiffableNdarray): the array to serialize
+            diff_db (DiffableNdarrayDb): the database tracking the arrays already sent
+            ndarray_encoding (NdarrayEncodingType): how the "data" field is encoded. see NdarraySerialisation
         """
 
         is_in_db = diff_ndarray.get_uuid() in diff_db.to_json_db
@@ -59,8 +74,10 @@ class DiffableNdarraySerialisation:
             # Serialize the entire array
             json_dict = {
                 "uuid": diff_ndarray.get_uuid(),
+                "dtype": diff_ndarray.dtype.str,
+                "shape": list(diff_ndarray.shape),
                 "slices": None,
-                "data": diff_ndarray.tolist(),
+                "data": NdarraySerialisation.to_json(diff_ndarray, ndarray_encoding),
             }
             return json_dict
 
@@ -84,24 +101,38 @@ class DiffableNdarraySerialisation:
             diff_ndarray.is_modified() is True
         ), "There should be modifications to serialize"
 
-        # There are modifications, serialize only the delta region
-        diff_slices = DiffableNdarray.get_diff_slices(diff_ndarray)
-        diff_data = DiffableNdarray.get_diff_data(diff_ndarray)
+        # There are modifications, serialize only the delta regions - more than one depending on the tracking policy
+        diff_patches = diff_ndarray.get_diff_patches()
 
         # clear the modified flag since we are serializing the diff
         diff_ndarray.clear_diff()
 
         # Ensure the delta_region is valid
-        assert (
-            diff_data is not None
-        ), "diff region should not be None if delta slices exists"
+        assert len(diff_patches) > 0, "diff patches should not be empty if the array is modified"
 
         # Serialize the slices and the delta region
-        json_dict = {
-            "uuid": diff_ndarray.get_uuid(),
-            "slices": DiffableNdarraySerialisation._slices_to_json(diff_slices),
-            "data": diff_data.tolist(),
-        }
+        if len(diff_patches) == 1:
+            diff_slices, diff_data = diff_patches[0]
+            json_dict = {
+                "uuid": diff_ndarray.get_uuid(),
+                "dtype": diff_ndarray.dtype.str,
+                "slices": DiffableNdarraySerialisation._slices_to_json(diff_slices),
+                "data": NdarraySerialisation.to_json(diff_data, ndarray_encoding),
+            }
+        else:
+            json_dict = {
+                "uuid": diff_ndarray.get_uuid(),
+                "dtype": diff_ndarray.dtype.str,
+                "slices": None,
+                "data": None,
+                "patches": [
+                    {
+                        "slices": DiffableNdarraySerialisation._slices_to_json(diff_slices),
+                        "data": NdarraySerialisation.to_json(diff_data, ndarray_encoding),
+                    }
+                    for diff_slices, diff_data in diff_patches
+                ],
+            }
         return json_dict
 
     # =============================================================================
@@ -114,38 +145,38 @@ class DiffableNdarraySerialisation:
     ) -> "DiffableNdarray":
         """
         Deserialize a JSON-serializable dictionary back to a DiffableNdarray.
+        Patches are decoded straight to the dtype of the received array, and applied in place.
         """
 
         # Check if the array is already in the database
         is_in_db = json_dict["uuid"] in diffable_db.from_json_db
 
         # Determine the type of patch
-        is_patch_full_data = (
-            json_dict["slices"] is None and json_dict["data"] is not None
-        )
-        is_patch_diff_data = (
-            json_dict["slices"] is not None and json_dict["data"] is not None
-        )
-        is_patch_empty = json_dict["slices"] is None and json_dict["data"] is None
-
-        # Sanity check - only one of the above should be true
-        assert (
-            sum([is_patch_full_data, is_patch_empty, is_patch_diff_data]) == 1
-        ), "PANIC is_patch_* logic error"
+        patch_type = DiffableNdarraySerialisation.get_patch_type(json_dict)
+        is_patch_full_data = patch_type == "full_data"
+        is_patch_diff_data = patch_type == "diff_data"
+        is_patch_multi_diff_data = patch_type == "multi_diff_data"
+        is_patch_empty = patch_type == "empty"
 
         # If it is a full data patch
         if is_patch_full_data:
             if is_in_db:
                 # update the existing array in place
                 recv_arr = diffable_db.from_json_db[json_dict["uuid"]]
-                recv_arr[:] = np.array(json_dict["data"])
+                recv_arr[...] = NdarraySerialisation.from_json(json_dict["data"], recv_arr.dtype)
                 # clear the modifications since we received the full data
                 recv_arr.clear_diff()
                 # return it
                 return recv_arr
             else:
-                # create a new array
-                new_arr = DiffableNdarray(np.array(json_dict["data"]))
+                # create a new array - with the sent dtype, if any (older payloads do not carry it)
+                new_array_np = NdarraySerialisation.from_json(json_dict["data"], json_dict.get("dtype"))
+                # NOTE: copy if needed, as binary/base64 data may be a read-only view on the received buffer
+                if not new_array_np.flags.writeable or not new_array_np.flags.owndata:
+                    new_array_np = new_array_np.copy()
+                if "shape" in json_dict:
+                    new_array_np = new_array_np.reshape(json_dict["shape"])
+                new_arr = DiffableNdarray(new_array_np)
                 # add to the database
                 diffable_db.from_json_db[json_dict["uuid"]] = new_arr
                 # return it
@@ -176,12 +207,31 @@ class DiffableNdarraySerialisation:
                 diff_slices = DiffableNdarraySerialisation._slices_from_json(
                     json_dict["slices"]
                 )
-                diff_data = np.array(json_dict["data"])
+                diff_data = NdarraySerialisation.from_json(json_dict["data"], existing_arr.dtype)
                 # apply the diff patch to the existing array
                 existing_arr.apply_patch(diff_slices, diff_data)
                 # return it
                 return existing_arr
 
+        # if it is a multiple diff patch ?
+        if is_patch_multi_diff_data:
+            if not is_in_db:
+                raise DiffableNdarraySerialisationError(
+                    "DiffableNdarray not found in database, cannot apply multi diff patch"
+                )
+            else:
+                # get the existing array as from the database
+                existing_arr = diffable_db.from_json_db[json_dict["uuid"]]
+                # apply each diff patch to the existing array
+                for patch_dict in json_dict["patches"]:
+                    diff_slices = DiffableNdarraySerialisation._slices_from_json(
+                        patch_dict["slices"]
+                    )
+                    diff_data = NdarraySerialisation.from_json(patch_dict["data"], existing_arr.dtype)
+                    existing_arr.apply_patch(diff_slices, diff_data)
+                # return it
+                return existing_arr
+
         raise DiffableNdarraySerialisationError(
             "DiffableNdarray - Invalid patch format"
         )
@@ -189,28 +239,32 @@ class DiffableNdarraySerialisation:
     @staticmethod
     def get_patch_type(
         json_dict: dict[str, Any],
-    ) -> Literal["full_data", "diff_data", "empty"]:
+    ) -> Literal["full_data", "diff_data", "multi_diff_data", "empty"]:
         """
         Analyse the type of patch represented by the JSON dictionary.
 
         Returns:
             "full_data" if the patch contains full data,
             "diff_data" if the patch contains a diff,
+            "multi_diff_data" if the patch contains several diffs (in "patches"),
             "empty" if the patch is empty (no data, no slices).
         """
 
         # Determine the type of patch
+        is_patch_multi_diff_data = json_dict.get("patches") is not None
         is_patch_full_data = (
             json_dict["slices"] is None and json_dict["data"] is not None
         )
         is_patch_diff_data = (
             json_dict["slices"] is not None and json_dict["data"] is not None
         )
-        is_patch_empty = json_dict["slices"] is None and json_dict["data"] is None
+        is_patch_empty = (
+            json_dict["slices"] is None and json_dict["data"] is None and not is_patch_multi_diff_data
+        )
 
         # Sanity check - only one of the above should be true
         assert (
-            sum([is_patch_full_data, is_patch_empty, is_patch_diff_data]) == 1
+            sum([is_patch_full_data, is_patch_empty, is_patch_diff_data, is_patch_multi_diff_data]) == 1
         ), "PANIC is_patch_* logic error"
 
         if is_patch_full_data:
@@ -219,6 +273,8 @@ class DiffableNdarraySerialisation:
             return "empty"
         if is_patch_diff_data:
             return "diff_data"
+        if is_patch_multi_diff_data:
+            return "multi_diff_data"
 
         raise DiffableNdarraySerialisationError("Invalid patch format")
 
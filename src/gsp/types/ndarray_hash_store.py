@@ -0,0 +1,139 @@
+# stdlib imports
+import hashlib
+from collections import OrderedDict
+from typing import Any
+
+# pip imports
+import numpy as np
+
+
+class NdarrayHashStore:
+    """
+    A bounded LRU store of np.ndarray keyed by the hash of their content.
+
+    It is used for content-addressed transfer: the client replaces each np.ndarray of a scene
+    by its hash, and only uploads the arrays the server does not hold yet.
+    - client side: .replace_with_hashes() to build the scene skeleton and the hash to array mapping
+    - server side: .resolve_hashes() with the uploaded arrays to restore the scene, then .put() them for the next requests
+    """
+
+    __slots__ = ("__arrays", "__max_bytes", "__bytes_held")
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024) -> None:
+        """
+        Arguments:
+            max_bytes (int): The maximum number of bytes held by the store. Least recently used arrays are evicted above it.
+        """
+        self.__arrays: OrderedDict[str, np.ndarray] = OrderedDict()
+        """Mapping from array hash to np.ndarray, in least recently used order"""
+        self.__max_bytes = max_bytes
+        """The maximum number of bytes held by the store"""
+        self.__bytes_held = 0
+        """The number of bytes currently held by the store"""
+
+    def __contains__(self, array_hash: str) -> bool:
+        return array_hash in self.__arrays
+
+    def __len__(self) -> int:
+        return len(self.__arrays)
+
+    def get_bytes_held(self) -> int:
+        return self.__bytes_held
+
+    def get(self, array_hash: str) -> np.ndarray | None:
+        """
+        Return the array for this hash, or None if it is not in the store. Mark it as recently used.
+        """
+        array = self.__arrays.get(array_hash)
+        if array is not None:
+            self.__arrays.move_to_end(array_hash)
+        return array
+
+    def put(self, array_hash: str, array: np.ndarray) -> None:
+        """
+        Add an array to the store, and evict the least recently used arrays if the store is over budget.
+        """
+        if array_hash in self.__arrays:
+            self.__arrays.move_to_end(array_hash)
+            return
+        self.__arrays[array_hash] = array
+        self.__bytes_held += array.nbytes
+        # evict the least recently used arrays - but always keep the array just added
+        while self.__bytes_held > self.__max_bytes and len(self.__arrays) > 1:
+            _, evicted_array = self.__arrays.popitem(last=False)
+            self.__bytes_held -= evicted_array.nbytes
+
+    def clear(self) -> None:
+        self.__arrays.clear()
+        self.__bytes_held = 0
+
+    # =============================================================================
+    # Scene helpers
+    # =============================================================================
+
+    @staticmethod
+    def hash_ndarray(array: np.ndarray) -> str:
+        """
+        Return the hash of the array content, dtype and shape.
+        """
+        array = np.ascontiguousarray(array)
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{array.dtype.str}{array.shape}".encode("utf-8"))
+        hasher.update(array.reshape(-1).view(np.uint8).data)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def replace_with_hashes(obj: Any, min_nbytes: int = 0) -> tuple[Any, dict[str, np.ndarray]]:
+        """
+        Replace each np.ndarray leaf of a JSON-like object by {"__ndarray_hash__": hash}.
+        Arrays smaller than min_nbytes are left inline, as the hash would not be worth it.
+
+        Returns:
+            The object with hashes, and the mapping from hash to np.ndarray.
+        """
+        hashed_arrays: dict[str, np.ndarray] = {}
+
+        def replace(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {key: replace(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [replace(item) for item in value]
+            if isinstance(value, np.ndarray) and value.nbytes >= min_nbytes:
+                array_hash = NdarrayHashStore.hash_ndarray(value)
+                hashed_arrays[array_hash] = value
+                return {"__ndarray_hash__": array_hash}
+            return value
+
+        return replace(obj), hashed_arrays
+
+    def resolve_hashes(self, obj: Any, uploaded_arrays: dict[str, np.ndarray] | None = None) -> tuple[Any, list[str]]:
+        """
+        Replace each {"__ndarray_hash__": hash} of a JSON-like object by the array from uploaded_arrays, or else from this store.
+
+        The arrays uploaded with a request are resolved from uploaded_arrays, not from the store - they may be evicted
+        from it before the resolution if they exceed its budget. .put() them after the resolution.
+
+        Arguments:
+            obj (Any): the JSON-like object with hashes
+            uploaded_arrays (dict[str, np.ndarray] | None): the mapping from hash to np.ndarray uploaded with the object, if any
+
+        Returns:
+            The resolved object, and the list of hashes missing from the store. The object is unusable if the list is not empty.
+        """
+        missing_hashes: list[str] = []
+
+        def resolve(value: Any) -> Any:
+            if isinstance(value, dict):
+                if "__ndarray_hash__" in value:
+                    array = uploaded_arrays.get(value["__ndarray_hash__"]) if uploaded_arrays is not None else None
+                    if array is None:
+                        array = self.get(value["__ndarray_hash__"])
+                    if array is None:
+                        missing_hashes.append(value["__ndarray_hash__"])
+                    return array
+                return {key: resolve(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [resolve(item) for item in value]
+            return value
+
+        return resolve(obj), missing_hashes
@@ -11,6 +11,7 @@ from ..transform.transform_link_base import TransformLinkBase
 from ..transform import TransformLinkImmediate, TransformLinkLambda
 from .diffable_ndarray.diffable_ndarray import DiffableNdarray
 from .diffable_ndarray.diffable_ndarray_serialisation import DiffableNdarraySerialisation, DiffableNdarrayDb
+from .ndarray_serialisation import NdarraySerialisation, NdarrayEncodingType
 from .ndarray_like_type import NdarrayLikeType
 
 NdarrayLikeSerializedType = dict[str, Any]
@@ -25,9 +26,14 @@ class NdarrayLikeUtils:
     """
 
     @staticmethod
-    def to_json(data: NdarrayLikeType, diffable_ndarray_db: DiffableNdarrayDb) -> NdarrayLikeSerializedType:
+    def to_json(data: NdarrayLikeType, diffable_ndarray_db: DiffableNdarrayDb, ndarray_encoding: NdarrayEncodingType = "list") -> NdarrayLikeSerializedType:
         """
         Convert the input data to a JSON-serializable format.
+
+        Arguments:
+            data (NdarrayLikeType): The data to serialize.
+            diffable_ndarray_db (DiffableNdarrayDb): The database tracking the DiffableNdarray already sent.
+            ndarray_encoding (NdarrayEncodingType): How np.ndarray are encoded. "list" and "base64" are JSON-serializable, "binary" requires NdarraySerialisation.to_msgpack() to be sent.
         """
         if isinstance(data, TransformLinkBase):
             link_head = typing.cast(TransformLinkBase, data)
@@ -35,11 +41,11 @@ class NdarrayLikeUtils:
             return serialized_dict
         elif isinstance(data, DiffableNdarray):
             diffable_array = typing.cast(DiffableNdarray, data)
-            serialized_dict = {"type": "delta_ndarray", "data": DiffableNdarraySerialisation.to_json(diffable_array, diff_db=diffable_ndarray_db)}
+            serialized_dict = {"type": "delta_ndarray", "data": DiffableNdarraySerialisation.to_json(diffable_array, diff_db=diffable_ndarray_db, ndarray_encoding=ndarray_encoding)}
             return serialized_dict
         elif isinstance(data, np.ndarray):
             ndarray = typing.cast(np.ndarray, data)
-            serialized_dict = {"type": "ndarray", "data": ndarray.tolist()}
+            serialized_dict = {"type": "ndarray", "data": NdarraySerialisation.to_json(ndarray, ndarray_encoding)}
             return serialized_dict
         else:
             raise TypeError("Input must be either a numpy ndarray or a TransformLinkBase instance.")
@@ -62,9 +68,9 @@ class NdarrayLikeUtils:
             diffable_ndarray = DiffableNdarraySerialisation.from_json(diff_arr_dict, diffable_ndarray_db)
             return diffable_ndarray
         elif serialized_data["type"] == "ndarray":
-            if not isinstance(serialized_data["data"], list):
-                raise TypeError("Expected 'data' to be a list.")
-            array_np = np.array(serialized_data["data"])
+            if not isinstance(serialized_data["data"], (list, dict, np.ndarray)):
+                raise TypeError("Expected 'data' to be a list, a base64 dict or a np.ndarray.")
+            array_np = NdarraySerialisation.from_json(serialized_data["data"])
             return array_np
         else:
             raise TypeError("Input list elements must be either dicts or numeric types.")
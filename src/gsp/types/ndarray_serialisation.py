@@ -0,0 +1,226 @@
+# stdlib imports
+import base64
+import json
+import struct
+from typing import Any, Literal
+import typing
+
+# pip imports
+import numpy as np
+import msgpack
+
+NdarrayEncodingType = Literal["list", "base64", "binary"]
+"""
+How np.ndarray are encoded in a SceneDict.
+- "list": nested python lists, JSON-serializable (historical behavior)
+- "base64": {"dtype", "shape", "base64"} dict of the little-endian buffer, JSON-serializable and dtype-preserving
+- "binary": np.ndarray kept as is, to be packed as raw little-endian buffers by NdarraySerialisation.to_msgpack()
+"""
+
+
+class NdarraySerialisation:
+    """
+    Serialisation of plain np.ndarray leaves of a scene.
+
+    In "binary" encoding, the arrays are carried as raw little-endian buffers inside a msgpack envelope,
+    with their dtype and shape as metadata. They are decoded with np.frombuffer, so no per-element python
+    object is created on either side.
+
+    NOTE: arrays decoded from msgpack are read-only views on the received buffer.
+    """
+
+    MSGPACK_EXT_CODE = 1
+    """msgpack extension type code used for np.ndarray"""
+
+    MULTIPART_ALIGNMENT = 16
+    """Byte alignment of each binary part in a multipart buffer"""
+
+    # =============================================================================
+    # Leaf encoding
+    # =============================================================================
+
+    @staticmethod
+    def to_json(array: np.ndarray, ndarray_encoding: NdarrayEncodingType = "list") -> list | np.ndarray:
+        """
+        Encode a np.ndarray as a SceneDict leaf.
+
+        Arguments:
+            array (np.ndarray): the array to encode
+            ndarray_encoding (NdarrayEncodingType): "list" for nested lists, "base64" for a base64 dict,
+                "binary" to keep a little-endian C-contiguous np.ndarray
+        """
+        if ndarray_encoding == "list":
+            return array.tolist()
+        elif ndarray_encoding == "base64":
+            array_le = NdarraySerialisation.to_little_endian(array)
+            return {
+                "dtype": array_le.dtype.str,
+                "shape": list(array_le.shape),
+                "base64": base64.b64encode(array_le.reshape(-1).view(np.uint8).data).decode("ascii"),
+            }
+        elif ndarray_encoding == "binary":
+            return NdarraySerialisation.to_little_endian(array)
+        else:
+            raise ValueError(f"Unknown ndarray_encoding: {ndarray_encoding}")
+
+    @staticmethod
+    def from_json(data: list | dict | np.ndarray, dtype: np.dtype | str | None = None) -> np.ndarray:
+        """
+        Decode a SceneDict leaf produced by .to_json() into a np.ndarray.
+        - binary leaves are returned as is, without copy
+        - base64 leaves are decoded with np.frombuffer, as read-only arrays
+
+        Arguments:
+            data: the encoded leaf
+            dtype: the dtype of list leaves, as lists do not carry it. If None, numpy infers it
+        """
+        if isinstance(data, np.ndarray):
+            return data
+        if isinstance(data, dict):
+            array_bytes = base64.b64decode(data["base64"])
+            return np.frombuffer(array_bytes, dtype=np.dtype(data["dtype"])).reshape(data["shape"])
+        return np.asarray(data, dtype=dtype)
+
+    @staticmethod
+    def to_little_endian(array: np.ndarray) -> np.ndarray:
+        """
+        Return a plain np.ndarray, C-contiguous and little-endian. It is a no-copy view when already the case.
+        """
+        if array.dtype.hasobject:
+            raise TypeError(f"Unsupported dtype for binary encoding: {array.dtype}")
+        dtype_le = array.dtype.newbyteorder("<")
+        return np.asarray(array, dtype=dtype_le, order="C")
+
+    # =============================================================================
+    # msgpack envelope
+    # =============================================================================
+
+    @staticmethod
+    def to_msgpack(obj: Any) -> bytes:
+        """
+        Pack a JSON-like object (e.g. a SceneDict) with msgpack. np.ndarray leaves are packed as raw buffers.
+        """
+        packed = msgpack.packb(obj, default=NdarraySerialisation._msgpack_default, use_bin_type=True)
+        return typing.cast(bytes, packed)
+
+    @staticmethod
+    def from_msgpack(data: bytes) -> Any:
+        """
+        Unpack a msgpack buffer produced by .to_msgpack(). np.ndarray leaves are restored with np.frombuffer.
+        """
+        return msgpack.unpackb(data, ext_hook=NdarraySerialisation._msgpack_ext_hook, raw=False)
+
+    @staticmethod
+    def _msgpack_default(obj: Any) -> Any:
+        if isinstance(obj, np.ndarray):
+            array = NdarraySerialisation.to_little_endian(obj)
+            header = typing.cast(bytes, msgpack.packb([array.dtype.str, list(array.shape)]))
+            # single copy of the array data into the payload
+            payload = b"".join((struct.pack("<I", len(header)), header, array.reshape(-1).view(np.uint8).data))
+            return msgpack.ExtType(NdarraySerialisation.MSGPACK_EXT_CODE, payload)
+        if isinstance(obj, np.generic):
+            return obj.item()
+        raise TypeError(f"Cannot serialize object of type {type(obj)}")
+
+    @staticmethod
+    def _msgpack_ext_hook(code: int, payload: bytes) -> Any:
+        if code != NdarraySerialisation.MSGPACK_EXT_CODE:
+            return msgpack.ExtType(code, payload)
+        (header_length,) = struct.unpack_from("<I", payload, 0)
+        dtype_str, shape = msgpack.unpackb(payload[4 : 4 + header_length], raw=False)
+        array = np.frombuffer(payload, dtype=np.dtype(dtype_str), offset=4 + header_length)
+        return array.reshape(shape)
+
+    # =============================================================================
+    # multipart envelope
+    # =============================================================================
+    #
+    # Layout of a multipart buffer:
+    # - uint32 little-endian length of the part table, followed by the part table in JSON
+    #   - one entry per np.ndarray: {"dtype", "shape", "offset", "nbytes"}, offset is relative to the data section
+    # - uint32 little-endian length of the skeleton, followed by the skeleton in JSON
+    #   - np.ndarray leaves are replaced by {"__ndarray_part__": index_in_part_table}
+    # - padding up to MULTIPART_ALIGNMENT, then the data section with each part aligned on MULTIPART_ALIGNMENT
+    #
+
+    @staticmethod
+    def to_multipart(obj: Any) -> bytes:
+        """
+        Pack a JSON-like object (e.g. a SceneDict) as a small JSON skeleton followed by one binary part per np.ndarray leaf.
+        The array data is copied only once, into the returned buffer.
+        """
+        part_arrays: list[np.ndarray] = []
+        part_table: list[dict[str, Any]] = []
+        data_length = 0
+
+        def json_default(value: Any) -> Any:
+            nonlocal data_length
+            if isinstance(value, np.ndarray):
+                array = NdarraySerialisation.to_little_endian(value)
+                offset = NdarraySerialisation._align(data_length)
+                part_table.append({"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset, "nbytes": array.nbytes})
+                part_arrays.append(array)
+                data_length = offset + array.nbytes
+                return {"__ndarray_part__": len(part_arrays) - 1}
+            if isinstance(value, np.generic):
+                return value.item()
+            raise TypeError(f"Cannot serialize object of type {type(value)}")
+
+        skeleton_bytes = json.dumps(obj, default=json_default).encode("utf-8")
+        table_bytes = json.dumps(part_table).encode("utf-8")
+
+        # build the list of chunks to join
+        chunks: list[Any] = [
+            struct.pack("<I", len(table_bytes)),
+            table_bytes,
+            struct.pack("<I", len(skeleton_bytes)),
+            skeleton_bytes,
+        ]
+        header_length = 8 + len(table_bytes) + len(skeleton_bytes)
+        chunks.append(b"\x00" * (NdarraySerialisation._align(header_length) - header_length))
+        position = 0
+        for part_info, array in zip(part_table, part_arrays):
+            chunks.append(b"\x00" * (part_info["offset"] - position))
+            chunks.append(array.reshape(-1).view(np.uint8).data)
+            position = part_info["offset"] + part_info["nbytes"]
+
+        return b"".join(chunks)
+
+    @staticmethod
+    def from_multipart(data: bytes | memoryview) -> Any:
+        """
+        Unpack a buffer produced by .to_multipart().
+        np.ndarray leaves are read-only np.frombuffer views on `data`, no array data is copied.
+        """
+        (table_length,) = struct.unpack_from("<I", data, 0)
+        part_table: list[dict[str, Any]] = json.loads(bytes(data[4 : 4 + table_length]))
+        (skeleton_length,) = struct.unpack_from("<I", data, 4 + table_length)
+        skeleton_start = 8 + table_length
+        data_start = NdarraySerialisation._align(skeleton_start + skeleton_length)
+
+        def json_object_hook(json_dict: dict[str, Any]) -> Any:
+            if "__ndarray_part__" not in json_dict:
+                return json_dict
+            part_info = part_table[json_dict["__ndarray_part__"]]
+            dtype = np.dtype(part_info["dtype"])
+            array = np.frombuffer(data, dtype=dtype, count=part_info["nbytes"] // dtype.itemsize, offset=data_start + part_info["offset"])
+            return array.reshape(part_info["shape"])
+
+        return json.loads(bytes(data[skeleton_start : skeleton_start + skeleton_length]), object_hook=json_object_hook)
+
+    @staticmethod
+    def _align(offset: int) -> int:
+        alignment = NdarraySerialisation.MULTIPART_ALIGNMENT
+        return (offset + alignment - 1) // alignment * alignment
+
+
+###############################################################################
+#   Example usage
+#
+if __name__ == "__main__":
+    positions = np.random.uniform(-1, 1, (5, 3)).astype(np.float32)
+    packed = NdarraySerialisation.to_msgpack({"positions": NdarraySerialisation.to_json(positions, "binary")})
+    print("Packed size:", len(packed))
+    unpacked = NdarraySerialisation.from_msgpack(packed)
+    print("Unpacked positions:", unpacked["positions"].dtype, unpacked["positions"].shape)
+    assert np.array_equal(unpacked["positions"], positions)
@@ -0,0 +1,271 @@
+# stdlib imports
+import zlib
+
+# pip imports
+import numpy as np
+
+# local imports
+from .diffable_ndarray.diffable_ndarray import DiffableNdarray
+
+
+class SpatialIndex:
+    """
+    Spatial index of a (N, D) array of positions, for bounding box and nearest point queries in sublinear time.
+
+    It is a uniform grid over the bounding box of the positions, sized for about POINTS_PER_CELL points per cell.
+    The points are sorted by cell, so the points of a cell are a contiguous range. A query only scans the cells
+    it overlaps - it is pure numpy, and works for any dimension, e.g. 3d positions or 2d screen positions.
+
+    The index keeps a reference on the positions, not a copy - .sync() must be called after they are modified.
+    For a DiffableNdarray, only the modified rows are indexed again, see .sync(): the points which changed cell are
+    kept in a small overlay, sorted by index, on top of the sorted points - so a sync costs O(modified rows + moved points),
+    not O(N). The overlay is merged back, with a full build, when it exceeds MOVED_POINTS_RATIO of the points.
+
+    ```
+    spatial_index = SpatialIndex(positions)
+    inside_indices = spatial_index.query_bbox(np.array([-0.1, -0.1, -0.1]), np.array([0.1, 0.1, 0.1]))
+    nearest_index, nearest_distance = spatial_index.query_nearest(np.array([0.0, 0.0, 0.0]))
+    ```
+    """
+
+    __slots__ = (
+        "__positions",
+        "__positions_version",
+        "__grid_min",
+        "__cell_size",
+        "__ring_distance",
+        "__grid_size",
+        "__point_cells",
+        "__sorted_indices",
+        "__cell_starts",
+        "__is_moved",
+        "__moved_indices",
+        "__moved_cells",
+    )
+
+    POINTS_PER_CELL = 8
+    """The average number of points per cell of the grid"""
+    MOVED_POINTS_RATIO = 0.1
+    """Above this ratio of points in the overlay of the moved points, the index is built again, see .sync()"""
+
+    def __init__(self, positions: np.ndarray) -> None:
+        """
+        Arguments:
+            positions (np.ndarray): the positions to index, shape (N, D)
+        """
+        assert positions.ndim == 2, f"positions must have shape (N, D), got {positions.shape}"
+        self.__positions = positions
+        """The indexed positions - a reference, not a copy"""
+        self.__positions_version = SpatialIndex.__get_positions_version(positions)
+        """The version of the positions when they were indexed, see .is_synced()"""
+        self.__build()
+
+    # =============================================================================
+    # Public functions
+    # =============================================================================
+
+    def get_positions(self) -> np.ndarray:
+        return self.__positions
+
+    def is_synced(self, positions: np.ndarray) -> bool:
+        """
+        Return True if the index is up to date with these positions.
+        """
+        return positions is self.__positions and SpatialIndex.__get_positions_version(positions) == self.__positions_version
+
+    def sync(self, positions: np.ndarray) -> "SpatialIndex":
+        """
+        Bring the index up to date with the positions, and return it - or a new index if it had to be built from scratch.
+
+        - for the same DiffableNdarray, only the rows modified since the last sync are indexed again.
+        - for another array with the same content - e.g. the output of a transform chain - the index is reused as is.
+        - otherwise a new index is built.
+        """
+        if self.is_synced(positions):
+            return self
+        if positions.shape == self.__positions.shape:
+            if isinstance(positions, DiffableNdarray) and positions is self.__positions:
+                assert isinstance(self.__positions_version, int)
+                modified_rows = positions.get_modified_rows_since(self.__positions_version)
+                if modified_rows is not None and self.__update_rows(*modified_rows):
+                    self.__positions_version = positions.get_version()
+                    return self
+            elif not isinstance(positions, DiffableNdarray) and SpatialIndex.__get_positions_version(positions) == self.__positions_version:
+                self.__positions = positions
+                return self
+        return SpatialIndex(positions)
+
+    def query_bbox(self, bbox_min: np.ndarray, bbox_max: np.ndarray) -> np.ndarray:
+        """
+        Return the sorted indices of the positions inside the bounding box [bbox_min, bbox_max], bounds included.
+        """
+        bbox_min = np.asarray(bbox_min, dtype=np.float64)
+        bbox_max = np.asarray(bbox_max, dtype=np.float64)
+        cell_min = self.__get_cell_coords(bbox_min[np.newaxis])[0]
+        cell_max = self.__get_cell_coords(bbox_max[np.newaxis])[0]
+
+        # a bbox covering most of the grid is faster to answer with a linear scan
+        covered_cell_count = int(np.prod(cell_max - cell_min + 1))
+        if covered_cell_count >= len(self.__point_cells):
+            candidate_indices = np.arange(len(self.__positions))
+        else:
+            axis_ranges = [np.arange(cell_min[axis], cell_max[axis] + 1) for axis in range(len(cell_min))]
+            cell_coords = np.stack([axis_coords.ravel() for axis_coords in np.meshgrid(*axis_ranges, indexing="ij")], axis=1)
+            candidate_indices = self.__gather_cells(self.__get_cell_ids(cell_coords))
+
+        candidate_positions = self.__positions[candidate_indices]
+        is_inside = np.all((candidate_positions >= bbox_min) & (candidate_positions <= bbox_max), axis=1)
+        return np.sort(candidate_indices[is_inside])
+
+    def query_nearest(self, point: np.ndarray, max_distance: float = np.inf) -> tuple[int, float] | None:
+        """
+        Return (index, distance) of the position nearest to the point, or None if there is none within max_distance.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        if len(self.__positions) == 0:
+            return None
+        center_cell = self.__get_cell_coords(point[np.newaxis])[0]
+        dimension = len(center_cell)
+        best_index, best_distance = -1, np.inf
+
+        # scan the rings of cells around the cell of the point, until no closer point can be found
+        for ring in range(int(self.__grid_size.max()) + 1):
+            ring_min = np.maximum(center_cell - ring, 0)
+            ring_max = np.minimum(center_cell + ring, self.__grid_size - 1)
+            axis_ranges = [np.arange(ring_min[axis], ring_max[axis] + 1) for axis in range(dimension)]
+            cell_coords = np.stack([axis_coords.ravel() for axis_coords in np.meshgrid(*axis_ranges, indexing="ij")], axis=1)
+            # keep only the cells on the ring itself - the inner ones are already scanned
+            cell_coords = cell_coords[np.abs(cell_coords - center_cell).max(axis=1) == ring]
+
+            candidate_indices = self.__gather_cells(self.__get_cell_ids(cell_coords))
+            if len(candidate_indices) > 0:
+                candidate_distances = np.linalg.norm(self.__positions[candidate_indices] - point, axis=1)
+                candidate_best = int(np.argmin(candidate_distances))
+                if candidate_distances[candidate_best] < best_distance:
+                    best_index, best_distance = int(candidate_indices[candidate_best]), float(candidate_distances[candidate_best])
+
+            # the cells beyond this ring are at least `ring` cells away from the point
+            ring_distance = ring * self.__ring_distance
+            if best_distance <= ring_distance or ring_distance > max_distance:
+                break
+            if np.all(ring_min == 0) and np.all(ring_max == self.__grid_size - 1):
+                break
+
+        if best_index < 0 or best_distance > max_distance:
+            return None
+        return best_index, best_distance
+
+    # =============================================================================
+    # Private functions
+    # =============================================================================
+
+    @staticmethod
+    def __get_positions_version(positions: np.ndarray) -> int | tuple[int, ...]:
+        """
+        Return the version of the positions - the DiffableNdarray version, or a checksum of the content of another array.
+        """
+        if isinstance(positions, DiffableNdarray):
+            return positions.get_version()
+        return (len(positions), zlib.crc32(np.ascontiguousarray(positions).view(np.uint8)))
+
+    def __build(self) -> None:
+        """
+        Build the grid, and sort the points by cell.
+        """
+        positions = self.__positions
+        point_count, dimension = positions.shape
+        grid_min = positions.min(axis=0).astype(np.float64) if point_count > 0 else np.zeros(dimension)
+        grid_max = positions.max(axis=0).astype(np.float64) if point_count > 0 else np.ones(dimension)
+
+        # cubic cells, sized for POINTS_PER_CELL points per cell if the points were uniformly spread
+        # NOTE: flat axes - e.g. 2d points in 3d - get a single cell, and are ignored to size the cells
+        grid_extent = grid_max - grid_min
+        is_flat_axis = grid_extent <= 1e-12
+        cell_count = max(1.0, point_count / SpatialIndex.POINTS_PER_CELL)
+        if np.all(is_flat_axis):
+            cell_size = 1.0
+        else:
+            cell_size = float(np.prod(grid_extent[~is_flat_axis]) / cell_count) ** (1.0 / np.count_nonzero(~is_flat_axis))
+        grid_size = np.where(is_flat_axis, 1, np.maximum(np.ceil(grid_extent / cell_size), 1)).astype(np.int64)
+        grid_extent = np.where(is_flat_axis, 1e-12, grid_extent)
+
+        self.__grid_min = grid_min
+        """The minimum corner of the grid"""
+        self.__grid_size = grid_size
+        """The number of cells along each axis"""
+        self.__cell_size = grid_extent / grid_size
+        """The size of a cell along each axis"""
+        self.__ring_distance = float(self.__cell_size[~is_flat_axis].min()) if not np.all(is_flat_axis) else np.inf
+        """The minimum distance between a point and the cells one ring further from its cell, see .query_nearest()"""
+        self.__point_cells = self.__get_cell_ids(self.__get_cell_coords(positions))
+        """The cell of each point at the build, shape (N,)"""
+        self.__sorted_indices = np.argsort(self.__point_cells, kind="stable")
+        """The point indices sorted by their cell at the build, shape (N,)"""
+        self.__cell_starts = np.searchsorted(self.__point_cells[self.__sorted_indices], np.arange(int(np.prod(self.__grid_size)) + 1))
+        """The start of the points of each cell in __sorted_indices, shape (cell_count + 1,)"""
+        self.__is_moved = np.zeros(point_count, dtype=bool)
+        """True for the points whose cell changed since the build - they are in the overlay, not in __sorted_indices. shape (N,)"""
+        self.__moved_indices = np.zeros(0, dtype=np.int64)
+        """The overlay: the indices of the moved points, sorted - shape (K,)"""
+        self.__moved_cells = np.zeros(0, dtype=np.int64)
+        """The overlay: the current cell of each moved point - shape (K,)"""
+
+    def __update_rows(self, start: int, stop: int) -> bool:
+        """
+        Index again the points of rows [start, stop), in O(rows + moved points). Return False if the index must be built
+        again from scratch.
+        """
+        if start >= stop:
+            return True
+        positions = self.__positions[start:stop]
+        # the points which left the grid would be in the wrong cells - build again
+        if np.any(positions < self.__grid_min) or np.any(positions > self.__grid_min + self.__cell_size * self.__grid_size):
+            return False
+
+        # the rows whose cell differs from their cell at the build go in the overlay, the others in the sorted points
+        new_cells = self.__get_cell_ids(self.__get_cell_coords(positions))
+        is_moved_row = new_cells != self.__point_cells[start:stop]
+        self.__is_moved[start:stop] = is_moved_row
+
+        # replace the overlay entries of the rows - the overlay is sorted by index, so they are a contiguous range of it
+        overlay_start, overlay_stop = np.searchsorted(self.__moved_indices, [start, stop])
+        self.__moved_indices = np.concatenate(
+            (self.__moved_indices[:overlay_start], np.arange(start, stop, dtype=np.int64)[is_moved_row], self.__moved_indices[overlay_stop:])
+        )
+        self.__moved_cells = np.concatenate((self.__moved_cells[:overlay_start], new_cells[is_moved_row], self.__moved_cells[overlay_stop:]))
+
+        # merge the overlay back when it is too large for the queries to stay fast
+        if len(self.__moved_indices) > SpatialIndex.MOVED_POINTS_RATIO * len(self.__point_cells):
+            self.__build()
+        return True
+
+    def __get_cell_coords(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Return the integer cell coordinates of the positions, clipped to the grid - shape (N, D)
+        """
+        cell_coords = np.floor((positions - self.__grid_min) / self.__cell_size).astype(np.int64)
+        return np.clip(cell_coords, 0, self.__grid_size - 1)
+
+    def __get_cell_ids(self, cell_coords: np.ndarray) -> np.ndarray:
+        """
+        Return the flat cell ids of the cell coordinates - shape (N,)
+        """
+        return np.ravel_multi_index(tuple(cell_coords.T), tuple(self.__grid_size)) if len(cell_coords) > 0 else np.zeros(0, dtype=np.int64)
+
+    def __gather_cells(self, cell_ids: np.ndarray) -> np.ndarray:
+        """
+        Return the indices of the points in these cells.
+        """
+        range_starts = self.__cell_starts[cell_ids]
+        range_counts = self.__cell_starts[cell_ids + 1] - range_starts
+        total_count = int(range_counts.sum())
+        point_indices = np.zeros(0, dtype=np.int64)
+        if total_count > 0:
+            # concatenate the ranges [start, start + count) without a python loop
+            range_offsets = np.repeat(range_starts - np.concatenate(([0], np.cumsum(range_counts)[:-1])), range_counts)
+            point_indices = self.__sorted_indices[range_offsets + np.arange(total_count)]
+        if len(self.__moved_indices) == 0:
+            return point_indices
+        # the moved points are in the overlay, with their current cell
+        point_indices = point_indices[~self.__is_moved[point_indices]]
+        return np.concatenate((point_indices, self.__moved_indices[np.isin(self.__moved_cells, cell_ids)]))
@@ -6,8 +6,10 @@ This module contains different types of visual elements that can be added to a s
 Currently supported visuals are:
 - Pixels: to display a grid of colored pixels
 - Image: to display an image within specified bounds
+- Mesh: to display a triangular mesh, with its level-of-detail pyramid in MeshLodPyramid
 """
 
 from . pixels import Pixels
 from . image import Image
-from . mesh import Mesh
\ No newline at end of file
+from . mesh import Mesh
+from . mesh_lod import MeshLodPyramid, MeshLodLevel
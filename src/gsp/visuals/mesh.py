@@ -4,6 +4,8 @@ import numpy as np
 import meshio
 
 from ..core.visual_base import VisualBase
+from .mesh_lod import MeshLodPyramid
+from ..types.spatial_index import SpatialIndex
 import matplotlib.colors
 
 
@@ -18,6 +20,8 @@ class Mesh(VisualBase):
         "edgecolors",
         "linewidths",
         "culling_mode",
+        "_lod_pyramid",
+        "_spatial_index",
     )
 
     def __init__(
@@ -54,8 +58,41 @@ class Mesh(VisualBase):
         self.face_indices = faces_indices
         """Triangular faces of the mesh, contains the vertex indices of the 3 points of the triangle, shape (M, 3)"""
         self.cmap = cmap
-        self.facecolors = matplotlib.colors.to_rgba_array(facecolors)
-        self.edgecolors = matplotlib.colors.to_rgba_array(edgecolors)
+        self.facecolors = Mesh.to_rgba_colors(facecolors)
+        """Face colors, read-only RGBA shape (M, 4) or (1, 4) - see .to_rgba_colors()"""
+        self.edgecolors = Mesh.to_rgba_colors(edgecolors)
+        """Edge colors, read-only RGBA shape (M, 4) or (1, 4) - see .to_rgba_colors()"""
         self.linewidths = linewidths
         self.culling_mode = culling_mode
         """Culling mode, either "front", "back", or "all" """
+        self._lod_pyramid: MeshLodPyramid | None = None
+        """The level-of-detail pyramid of the mesh, built on demand - see .get_lod_pyramid()"""
+        self._spatial_index: SpatialIndex | None = None
+        """The spatial index of the vertices, built on demand - see .get_spatial_index()"""
+
+    @staticmethod
+    def to_rgba_colors(colors) -> np.ndarray:
+        """
+        Convert matplotlib colors to a read-only RGBA np.ndarray. Read-only, so the mesh version is tracked - see
+        VisualBase.get_version() - and an unchanged mesh is skipped by the renderers. Assign new colors to change them.
+        """
+        rgba_colors = matplotlib.colors.to_rgba_array(colors)
+        rgba_colors.flags.writeable = False
+        return rgba_colors
+
+    def get_lod_pyramid(self) -> MeshLodPyramid:
+        """
+        Return the level-of-detail pyramid of the mesh, with decimated versions of it.
+        It is built at the first call, and built again only if the geometry of the mesh changed.
+        """
+        if self._lod_pyramid is None or not self._lod_pyramid.is_valid_for(self.vertices_coords, self.face_indices):
+            self._lod_pyramid = MeshLodPyramid(self.vertices_coords, self.face_indices)
+        return self._lod_pyramid
+
+    def get_spatial_index(self) -> SpatialIndex:
+        """
+        Return the spatial index of the vertices, for bounding box and nearest vertex queries.
+        It is built at the first call, and kept up to date at the next calls - incrementally if vertices_coords is a DiffableNdarray.
+        """
+        self._spatial_index = SpatialIndex(self.vertices_coords) if self._spatial_index is None else self._spatial_index.sync(self.vertices_coords)
+        return self._spatial_index
@@ -0,0 +1,130 @@
+# stdlib imports
+import zlib
+
+# pip imports
+import numpy as np
+
+
+class MeshLodLevel:
+    """
+    A decimated version of a mesh, see MeshLodPyramid.
+    """
+
+    __slots__ = ("grid_size", "vertices_coords", "face_indices", "source_face_indices")
+
+    def __init__(self, grid_size: int, vertices_coords: np.ndarray, face_indices: np.ndarray, source_face_indices: np.ndarray) -> None:
+        self.grid_size = grid_size
+        """The number of cells per axis of the clustering grid, 0 for the original mesh"""
+        self.vertices_coords = vertices_coords
+        """The vertices of the level, shape (N, 3)"""
+        self.face_indices = face_indices
+        """The triangular faces of the level, shape (M, 3)"""
+        self.source_face_indices = source_face_indices
+        """The index of the original face of each face of the level, e.g. to pick its per-face color, shape (M,)"""
+
+    def get_face_count(self) -> int:
+        return len(self.face_indices)
+
+
+class MeshLodPyramid:
+    """
+    Level-of-detail pyramid of a mesh: the original mesh, followed by decimated versions with fewer and fewer faces.
+
+    The levels are built by vertex clustering: the vertices are grouped on a regular grid over the mesh bounding box,
+    each group is replaced by its mean vertex, and the faces which become degenerate or duplicated are removed.
+    It is fast and keeps the overall shape, which is what matters when a face covers less than a pixel.
+
+    ```
+    lod_pyramid = MeshLodPyramid(mesh.vertices_coords, mesh.face_indices)
+    lod_level = lod_pyramid.select_level(max_face_count=100_000)
+    ```
+    """
+
+    __slots__ = ("levels", "bbox_corners", "geometry_checksum")
+
+    GRID_SIZES = (1024, 512, 256, 128, 64, 32, 16, 8)
+    """The grid sizes tried for the decimated levels, from the finest to the coarsest"""
+
+    MIN_REDUCTION_RATIO = 0.75
+    """A decimated level is kept only if it has less than this ratio of the faces of the previous level"""
+
+    MIN_FACE_COUNT = 256
+    """No level coarser than the first one under this number of faces is built"""
+
+    def __init__(self, vertices_coords: np.ndarray, face_indices: np.ndarray) -> None:
+        vertices_coords = np.asarray(vertices_coords, dtype=np.float64)
+        face_indices = np.asarray(face_indices)
+
+        self.geometry_checksum = MeshLodPyramid.get_geometry_checksum(vertices_coords, face_indices)
+        """Checksum of the mesh geometry the pyramid is built from, see .is_valid_for()"""
+
+        bbox_min = vertices_coords.min(axis=0) if len(vertices_coords) > 0 else np.zeros(3)
+        bbox_max = vertices_coords.max(axis=0) if len(vertices_coords) > 0 else np.zeros(3)
+        self.bbox_corners = np.array([[x, y, z] for x in (bbox_min[0], bbox_max[0]) for y in (bbox_min[1], bbox_max[1]) for z in (bbox_min[2], bbox_max[2])])
+        """The 8 corners of the bounding box of the mesh, shape (8, 3), e.g. to compute its projected size"""
+
+        self.levels: list[MeshLodLevel] = [MeshLodLevel(0, vertices_coords, face_indices, np.arange(len(face_indices)))]
+        """The levels, from the original mesh to the coarsest one"""
+
+        for grid_size in MeshLodPyramid.GRID_SIZES:
+            previous_face_count = self.levels[-1].get_face_count()
+            if previous_face_count <= MeshLodPyramid.MIN_FACE_COUNT:
+                break
+            lod_level = MeshLodPyramid.decimate(vertices_coords, face_indices, grid_size)
+            if lod_level.get_face_count() < MeshLodPyramid.MIN_REDUCTION_RATIO * previous_face_count:
+                self.levels.append(lod_level)
+
+    def is_valid_for(self, vertices_coords: np.ndarray, face_indices: np.ndarray) -> bool:
+        """
+        Return True if the pyramid is built from this geometry.
+        """
+        return self.geometry_checksum == MeshLodPyramid.get_geometry_checksum(vertices_coords, face_indices)
+
+    def select_level(self, max_face_count: float) -> MeshLodLevel:
+        """
+        Return the finest level with at most max_face_count faces, or the coarsest level if none fits.
+        """
+        for lod_level in self.levels:
+            if lod_level.get_face_count() <= max_face_count:
+                return lod_level
+        return self.levels[-1]
+
+    @staticmethod
+    def get_geometry_checksum(vertices_coords: np.ndarray, face_indices: np.ndarray) -> tuple[int, ...]:
+        vertices_array = np.ascontiguousarray(vertices_coords)
+        faces_array = np.ascontiguousarray(face_indices)
+        return (len(vertices_array), len(faces_array), zlib.crc32(vertices_array.view(np.uint8)), zlib.crc32(faces_array.view(np.uint8)))
+
+    @staticmethod
+    def decimate(vertices_coords: np.ndarray, face_indices: np.ndarray, grid_size: int) -> MeshLodLevel:
+        """
+        Decimate a mesh by vertex clustering on a grid of grid_size cells per axis.
+        """
+        if len(vertices_coords) == 0 or len(face_indices) == 0:
+            return MeshLodLevel(grid_size, vertices_coords, face_indices, np.arange(len(face_indices)))
+
+        # the cells are cubes, so the decimation is the same along each axis
+        bbox_min = vertices_coords.min(axis=0)
+        bbox_extent = float((vertices_coords.max(axis=0) - bbox_min).max()) or 1.0
+        vertex_cells = np.floor((vertices_coords - bbox_min) * (grid_size / bbox_extent)).astype(np.int64)
+        np.clip(vertex_cells, 0, grid_size - 1, out=vertex_cells)
+        vertex_cell_ids = (vertex_cells[:, 0] * grid_size + vertex_cells[:, 1]) * grid_size + vertex_cells[:, 2]
+
+        # one vertex per non-empty cell, at the mean of its vertices
+        _, vertex_clusters = np.unique(vertex_cell_ids, return_inverse=True)
+        vertex_clusters = vertex_clusters.ravel()
+        cluster_count = int(vertex_clusters.max()) + 1
+        cluster_sizes = np.bincount(vertex_clusters, minlength=cluster_count)
+        cluster_vertices = np.stack([np.bincount(vertex_clusters, weights=vertices_coords[:, axis], minlength=cluster_count) for axis in range(3)], axis=1)
+        cluster_vertices /= cluster_sizes[:, np.newaxis]
+
+        # remove the degenerate faces - with 2 vertices in the same cell
+        cluster_faces = vertex_clusters[face_indices]
+        is_kept = (cluster_faces[:, 0] != cluster_faces[:, 1]) & (cluster_faces[:, 1] != cluster_faces[:, 2]) & (cluster_faces[:, 2] != cluster_faces[:, 0])
+        source_face_indices = np.flatnonzero(is_kept)
+
+        # remove the duplicated faces - the same 3 vertices, whatever their order - keeping the first one
+        _, unique_indices = np.unique(np.sort(cluster_faces[source_face_indices], axis=1), axis=0, return_index=True)
+        source_face_indices = source_face_indices[np.sort(unique_indices)]
+
+        return MeshLodLevel(grid_size, cluster_vertices, cluster_faces[source_face_indices], source_face_indices)
@@ -3,10 +3,12 @@ import numpy as np
 
 from ..core.visual_base import VisualBase
 from ..types.ndarray_like_type import NdarrayLikeType
+from ..types.ndarray_like_utils import NdarrayLikeUtils
+from ..types.spatial_index import SpatialIndex
 
 
 class Pixels(VisualBase):
-    __slots__ = ("positions", "sizes", "colors")
+    __slots__ = ("positions", "sizes", "colors", "_spatial_index")
 
     def __init__(
         self,
@@ -38,3 +40,14 @@ class Pixels(VisualBase):
         self.positions = positions
         self.sizes = sizes
         self.colors = colors
+        self._spatial_index: SpatialIndex | None = None
+        """The spatial index of the positions, built on demand - see .get_spatial_index()"""
+
+    def get_spatial_index(self) -> SpatialIndex:
+        """
+        Return the spatial index of the positions, for bounding box and nearest point queries.
+        It is built at the first call, and kept up to date at the next calls - incrementally if positions is a DiffableNdarray.
+        """
+        positions = NdarrayLikeUtils.to_numpy(self.positions)
+        self._spatial_index = SpatialIndex(positions) if self._spatial_index is None else self._spatial_index.sync(positions)
+        return self._spatial_index
@@ -4,12 +4,14 @@ import os
 import typing
 
 # pip imports
+import numpy as np
 import matplotlib.collections
 import matplotlib.pyplot
 import matplotlib.axes
 import matplotlib.figure
 import matplotlib.collections
 import matplotlib.image
+import matplotlib.colors
 import mpl3d.camera
 
 # local imports
@@ -19,10 +21,52 @@ from gsp.core.camera import Camera
 from gsp.visuals.pixels import Pixels
 from gsp.visuals.image import Image
 from gsp.visuals.mesh import Mesh
+from gsp.core.visual_base import VisualBase
 
 
 class MatplotlibRenderer:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        blit: bool = False,
+        mesh_face_budget: int | None = 200_000,
+        pixels_density_threshold: int | None = 1_000_000,
+        pixels_density_cmap: str | matplotlib.colors.Colormap | None = None,
+        pixels_density_norm: typing.Literal["linear", "log"] = "log",
+    ) -> None:
+        """
+        Arguments:
+            blit (bool): True to redraw only the viewports whose visuals changed since the previous render, using a cached
+                background per viewport. It is meant for offscreen rendering (server, animators), as the visual artists
+                are animated artists, not drawn by the GUI - show_image and interactive are not supported.
+            mesh_face_budget (int | None): the maximum number of faces rendered per Mesh visual. Above it, or when the mesh
+                has more faces than the pixels it covers, a decimated level of the mesh is rendered - see Mesh.get_lod_pyramid().
+                None to always render the full meshes.
+            pixels_density_threshold (int | None): above this number of points, a Pixels visual is rendered as a density image -
+                the points are binned per screen pixel - instead of a scatter plot. None to always render a scatter plot.
+            pixels_density_cmap (str | Colormap | None): the colormap of the density image. None to use the colors of the points,
+                with an opacity depending on the density.
+            pixels_density_norm ("linear" | "log"): how the number of points per pixel is mapped to [0, 1] for the density image.
+        """
+        self._blit = blit
+        """True to redraw only the changed viewports, see __init__"""
+        self._mesh_face_budget = mesh_face_budget
+        """The maximum number of faces rendered per Mesh visual, None for no level of detail. see __init__"""
+        self._pixels_density_threshold = pixels_density_threshold
+        """Above this number of points, Pixels visuals are rendered as a density image. see __init__"""
+        self._pixels_density_cmap = matplotlib.colormaps[pixels_density_cmap] if isinstance(pixels_density_cmap, str) else pixels_density_cmap
+        """The colormap of the density images, None to use the colors of the points. see __init__"""
+        self._pixels_density_norm = pixels_density_norm
+        """How the density is mapped to [0, 1] in the density images. see __init__"""
+        self._visual_render_versions: dict[str, tuple[typing.Any, ...]] = {}
+        """Mapping from visual UUID to its render version at the previous render, to skip the unchanged visuals"""
+        self._viewport_render_versions: dict[str, tuple[typing.Any, ...]] = {}
+        """Mapping from viewport UUID to its render version at the previous render, to skip the sync of unchanged axes"""
+        self._blit_backgrounds: dict[str, typing.Any] = {}
+        """Mapping from viewport UUID to the cached background of its axes. Only in blit mode"""
+        self._blit_changed_viewports: set[str] = set()
+        """UUIDs of the viewports to redraw at the next draw. Only in blit mode"""
+        self._blit_stale_canvases: set[str] = set()
+        """UUIDs of the canvases to fully redraw at the next draw, e.g. after a resize. Only in blit mode"""
         self._figures: dict[str, matplotlib.figure.Figure] = {}
         """Mapping from canvas UUID to matplotlib Figure"""
         self._axes: dict[str, matplotlib.axes.Axes] = {}
@@ -33,6 +77,14 @@ class MatplotlibRenderer:
         """Mapping from visual UUID to matplotlib PolyCollection. For Mesh visuals."""
         self._axesImages: dict[str, matplotlib.image.AxesImage] = {}
         """Mapping from visual UUID to matplotlib AxesImage. For Image visuals."""
+        self._densityImages: dict[str, matplotlib.image.AxesImage] = {}
+        """Mapping from visual UUID to matplotlib AxesImage. For Pixels visuals rendered as a density image."""
+        self._meshCaches: dict[str, typing.Any] = {}
+        """Mapping from visual UUID to its MatplotlibRendererMeshCache - the topology and buffers of a Mesh visual, kept between renders"""
+        self._pickTargets: dict[str, typing.Any] = {}
+        """Mapping from visual UUID to its MatplotlibRendererPickTarget - the screen geometry of the visual at the last render, see .pick()"""
+        self._canvasViewports: dict[str, list[Viewport]] = {}
+        """Mapping from canvas UUID to the viewports of its last render, see .pick()"""
 
     def close(self) -> None:
         """Close all matplotlib figures managed by this renderer."""
@@ -46,6 +98,15 @@ class MatplotlibRenderer:
         self._pathCollections.clear()
         self._polyCollections.clear()
         self._axesImages.clear()
+        self._densityImages.clear()
+        self._meshCaches.clear()
+        self._pickTargets.clear()
+        self._canvasViewports.clear()
+        self._visual_render_versions.clear()
+        self._viewport_render_versions.clear()
+        self._blit_backgrounds.clear()
+        self._blit_changed_viewports.clear()
+        self._blit_stale_canvases.clear()
 
     # =============================================================================
     # .render()
@@ -61,6 +122,9 @@ class MatplotlibRenderer:
         interactive: bool = False,
         image_format: str = "png",
     ) -> bytes:
+        # sanity check - in blit mode, the visual artists are animated artists, not drawn by the GUI
+        if self._blit and (show_image or interactive):
+            raise ValueError("show_image and interactive are not supported in blit mode")
 
         self.__render(canvas, viewports=viewports, cameras=cameras)
 
@@ -69,10 +133,16 @@ class MatplotlibRenderer:
         image_png_data = b""
 
         # honor return_image option
-        if return_image:
+        if return_image and self._blit and image_format == "png":
+            # encode the framebuffer, redrawn only where visuals changed
+            image_png_buffer = io.BytesIO()
+            matplotlib.image.imsave(image_png_buffer, self.__draw_rgba(canvas, viewports), format="png")
+            image_png_data = image_png_buffer.getvalue()
+        elif return_image:
             # Render the image to a PNG buffer
             image_png_buffer = io.BytesIO()
-            matplotlib.pyplot.savefig(image_png_buffer, format=image_format)
+            # NOTE: save the figure of this canvas, not the current pyplot figure - several renderers may be alive
+            self._figures[canvas.uuid].savefig(image_png_buffer, format=image_format)
             image_png_buffer.seek(0)
             image_png_data = image_png_buffer.getvalue()
             image_png_buffer.close()
@@ -104,6 +174,77 @@ class MatplotlibRenderer:
         # return the PNG image data if requested else return empty bytes
         return image_png_data
 
+    # =============================================================================
+    # .render_rgba()
+    # =============================================================================
+
+    def render_rgba(self, canvas: Canvas, viewports: list[Viewport], cameras: list[Camera]) -> np.ndarray:
+        """
+        Render the scene and return the framebuffer as a (height, width, 4) uint8 np.ndarray, without any image encoding.
+
+        NOTE: with an Agg-based backend, it is a view on the framebuffer of the figure, overwritten by the next render. Copy it to keep it.
+        """
+        self.__render(canvas, viewports=viewports, cameras=cameras)
+        return self.__draw_rgba(canvas, viewports)
+
+    # =============================================================================
+    # .pick()
+    # =============================================================================
+
+    def pick(self, canvas: Canvas, x: float, y: float, tolerance: float = 3.0) -> tuple[Viewport, str, int] | None:
+        """
+        Return the (viewport, visual uuid, element index) under a position of the canvas at the last render, or None if there is none.
+
+        The element index is the point index for Pixels visuals, and the face index for Mesh visuals - other visuals are not pickable.
+        It reuses the screen positions of the last render, so it is up to date with the last render, not with later changes of the scene.
+        The spatial index of a visual is built at its first pick after a render, and the next picks are fast - e.g. for hover tooltips.
+
+        Arguments:
+            canvas (Canvas): the rendered canvas
+            x (float): the x position in pixels, from the left of the canvas - as the viewport origins and matplotlib mouse events
+            y (float): the y position in pixels, from the bottom of the canvas
+            tolerance (float): the distance in pixels a point may be from its marker and still be picked
+        """
+        # the last viewport is drawn on top
+        for viewport in reversed(self._canvasViewports.get(canvas.uuid, [])):
+            axes = self._axes.get(viewport.uuid)
+            if axes is None or not axes.bbox.contains(x, y):
+                continue
+
+            # the position in the clip coordinates of the viewport
+            clip_x = (x - axes.bbox.x0) / axes.bbox.width * 2.0 - 1.0
+            clip_y = (y - axes.bbox.y0) / axes.bbox.height * 2.0 - 1.0
+            # the last visual is drawn on top
+            for visual in reversed(viewport.visuals):
+                pick_target = self._pickTargets.get(visual.uuid + viewport.uuid)
+                if pick_target is None:
+                    continue
+                element_index = pick_target.pick(clip_x, clip_y, tolerance)
+                if element_index is not None:
+                    return viewport, visual.uuid, element_index
+            return None
+        return None
+
+    def __draw_rgba(self, canvas: Canvas, viewports: list[Viewport]) -> np.ndarray:
+        """
+        Draw the figure of the canvas, and return its framebuffer. see .render_rgba()
+        """
+        figure = self._figures[canvas.uuid]
+        if hasattr(figure.canvas, "buffer_rgba"):
+            # Agg-based backend - draw, and use the framebuffer directly
+            if self._blit:
+                self.__draw_blit(canvas, viewports)
+            else:
+                figure.canvas.draw()
+            return np.asarray(figure.canvas.buffer_rgba())
+
+        # other backends - get the raw RGBA buffer through savefig. It draws the animated artists too, so it works in blit mode
+        # NOTE: blit mode keeps the whole figure up to date, so later draws are done from scratch
+        width, height = figure.canvas.get_width_height(physical=True)
+        image_rgba_buffer = io.BytesIO()
+        figure.savefig(image_rgba_buffer, format="rgba")
+        return np.frombuffer(image_rgba_buffer.getbuffer(), dtype=np.uint8).reshape(height, width, 4)
+
     ###########################################################################
     ###########################################################################
     # .__render()
@@ -120,22 +261,46 @@ class MatplotlibRenderer:
             figure = matplotlib.pyplot.figure(frameon=False, dpi=canvas.dpi)
             figure.set_size_inches(canvas.width / canvas.dpi, canvas.height / canvas.dpi)
             self._figures[canvas.uuid] = figure
+            self._blit_stale_canvases.add(canvas.uuid)
+
+        # keep the figure in sync with the canvas - it may have changed since the figure creation
+        if figure.get_dpi() != canvas.dpi:
+            figure.set_dpi(canvas.dpi)
+            self._blit_stale_canvases.add(canvas.uuid)
+        if tuple(figure.get_size_inches()) != (canvas.width / canvas.dpi, canvas.height / canvas.dpi):
+            figure.set_size_inches(canvas.width / canvas.dpi, canvas.height / canvas.dpi)
+            self._blit_stale_canvases.add(canvas.uuid)
 
         # sanity check - viewports and cameras must have the same length
         assert len(viewports) == len(cameras), "Number of viewports must be equal to number of cameras."
 
+        rendered_full_uuids: set[str] = set()
+        """full uuids of the visuals rendered, to remove the artists of the others"""
+        self._canvasViewports[canvas.uuid] = list(viewports)
+
         for viewport, camera in zip(viewports, cameras):
+            axes_rect = (
+                viewport.origin_x / canvas.width,
+                viewport.origin_y / canvas.height,
+                viewport.width / canvas.width,
+                viewport.height / canvas.height,
+            )
+            viewport_render_version = (viewport, viewport.get_version(), canvas.width, canvas.height)
             # create an axes for each viewport
-            if viewport.uuid in self._axes:
+            if viewport.uuid in self._axes and self._viewport_render_versions.get(viewport.uuid) == viewport_render_version:
+                # unchanged viewport - the axes is up to date
                 axes = self._axes[viewport.uuid]
+            elif viewport.uuid in self._axes:
+                axes = self._axes[viewport.uuid]
+                # keep the axes in sync with the viewport - it may have changed since the axes creation
+                if tuple(axes.get_position().bounds) != axes_rect:
+                    axes.set_position(axes_rect)
+                    self._blit_stale_canvases.add(canvas.uuid)
+                if axes.get_facecolor() != matplotlib.colors.to_rgba(viewport.background_color):
+                    axes.set_facecolor(viewport.background_color)
+                    self._blit_stale_canvases.add(canvas.uuid)
             else:
                 # print(f"Creating new axes for viewport {viewport.uuid}")
-                axes_rect = (
-                    viewport.origin_x / canvas.width,
-                    viewport.origin_y / canvas.height,
-                    viewport.width / canvas.width,
-                    viewport.height / canvas.height,
-                )
                 axes: matplotlib.axes.Axes = figure.add_axes(axes_rect)
                 axes.set_facecolor(viewport.background_color)
                 axes.set_xlim(-1, 1)
@@ -149,9 +314,18 @@ class MatplotlibRenderer:
                 axes.spines["left"].set_visible(False)
                 # cache the axes
                 self._axes[viewport.uuid] = axes
+                self._blit_stale_canvases.add(canvas.uuid)
+            self._viewport_render_versions[viewport.uuid] = viewport_render_version
 
             for visual in viewport.visuals:
                 full_uuid = visual.uuid + viewport.uuid
+                rendered_full_uuids.add(full_uuid)
+
+                # skip the visuals unchanged since the previous render with the same camera - their artist is up to date
+                visual_render_version = MatplotlibRenderer.__get_visual_render_version(visual, camera, viewport_render_version)
+                if visual_render_version is not None and self._visual_render_versions.get(full_uuid) == visual_render_version:
+                    continue
+
                 if isinstance(visual, Pixels):
                     from .renderer_pixels import MatplotlibRendererPixels
 
@@ -184,3 +358,113 @@ class MatplotlibRenderer:
                     )
                 else:
                     raise NotImplementedError(f"Rendering for visual type {type(visual)} is not implemented.")
+
+                # the viewport must be redrawn as one of its visuals changed - or can not be tracked, see VisualBase.get_version()
+                self._blit_changed_viewports.add(viewport.uuid)
+
+                if visual_render_version is not None:
+                    self._visual_render_versions[full_uuid] = visual_render_version
+                else:
+                    self._visual_render_versions.pop(full_uuid, None)
+
+        # remove the artists of the visuals and viewports not rendered anymore - e.g. removed from the scene
+        self.__remove_stale_artists(canvas, [viewport.uuid for viewport in viewports], rendered_full_uuids)
+
+    def __remove_stale_artists(self, canvas: Canvas, viewport_uuids: list[str], rendered_full_uuids: set[str]) -> None:
+        """
+        Remove from the figure of the canvas the axes of the viewports not in viewport_uuids, and the artists of the visuals not in rendered_full_uuids.
+        """
+        figure = self._figures[canvas.uuid]
+        stale_viewport_uuids = [viewport_uuid for viewport_uuid, axes in self._axes.items() if axes.figure is figure and viewport_uuid not in viewport_uuids]
+        figure_viewport_uuids = viewport_uuids + stale_viewport_uuids
+
+        # remove the artists of the visuals not rendered anymore
+        artists_caches: list[dict[str, typing.Any]] = [self._pathCollections, self._polyCollections, self._axesImages, self._densityImages]
+        for artists_cache in artists_caches:
+            for full_uuid in list(artists_cache.keys()):
+                is_in_figure = any(full_uuid.endswith(viewport_uuid) for viewport_uuid in figure_viewport_uuids)
+                if is_in_figure and full_uuid not in rendered_full_uuids:
+                    artists_cache.pop(full_uuid).remove()
+                    self._visual_render_versions.pop(full_uuid, None)
+                    self._meshCaches.pop(full_uuid, None)
+                    self._pickTargets.pop(full_uuid, None)
+                    self._blit_changed_viewports.update(viewport_uuid for viewport_uuid in viewport_uuids if full_uuid.endswith(viewport_uuid))
+
+        # remove the axes of the viewports not rendered anymore
+        for viewport_uuid in stale_viewport_uuids:
+            self._axes.pop(viewport_uuid).remove()
+            self._blit_backgrounds.pop(viewport_uuid, None)
+            self._viewport_render_versions.pop(viewport_uuid, None)
+            self._blit_stale_canvases.add(canvas.uuid)
+
+    @staticmethod
+    def __get_visual_render_version(visual: VisualBase, camera: Camera, viewport_render_version: tuple[typing.Any, ...]) -> tuple[typing.Any, ...] | None:
+        """
+        Return the version of the (visual, camera, viewport) triplet - when it is unchanged, the artist of the visual is up to date.
+        Return None if the visual must be rendered anyway: it can not be tracked, or it has event subscribers
+        which expect to be notified at each render.
+        """
+        visual_version = visual.get_version()
+        if visual_version is None:
+            return None
+        if visual.pre_rendering.receivers or visual.post_transform.receivers or visual.post_rendering.receivers:
+            return None
+        # NOTE: the objects themselves are part of the version, as a parser may create new objects with the same uuid
+        # NOTE: the viewport is part of the version, as its size in pixels selects the level of detail of the meshes
+        return (visual, visual_version, camera, camera.get_version(), viewport_render_version)
+
+    # =============================================================================
+    # Blit mode
+    # =============================================================================
+
+    def __draw_blit(self, canvas: Canvas, viewports: list[Viewport]) -> None:
+        """
+        Draw the figure of the canvas, redrawing only the viewports whose visuals changed.
+
+        The visual artists are animated artists, so a full draw only draws the static parts, cached as the background of each axes.
+        Then the changed axes are redrawn by restoring their background and drawing their artists on top of it.
+        """
+        figure = self._figures[canvas.uuid]
+        figure_canvas = typing.cast(typing.Any, figure.canvas)
+        viewport_uuids = [viewport.uuid for viewport in viewports]
+        axes_list = [self._axes[viewport_uuid] for viewport_uuid in viewport_uuids]
+
+        # overlapping axes would erase each other when restoring their background, and the artists of an axes would be
+        # drawn on top of the background of the next axes - draw everything at once, in the order of a non-blit draw
+        axes_bboxes = [axes.bbox for axes in axes_list]
+        is_overlapping = any(bbox1.fully_overlaps(bbox2) for index, bbox1 in enumerate(axes_bboxes) for bbox2 in axes_bboxes[index + 1 :])
+        if is_overlapping:
+            animated_artists = [artist for axes in axes_list for artist in axes.get_children() if artist.get_animated()]
+            for artist in animated_artists:
+                artist.set_animated(False)
+            try:
+                figure_canvas.draw()
+            finally:
+                for artist in animated_artists:
+                    artist.set_animated(True)
+            self._blit_stale_canvases.discard(canvas.uuid)
+            self._blit_changed_viewports.difference_update(viewport_uuids)
+            return
+
+        is_full_redraw = canvas.uuid in self._blit_stale_canvases or any(uuid not in self._blit_backgrounds for uuid in viewport_uuids)
+        if is_full_redraw:
+            # draw the static parts, and cache the background of each axes
+            figure_canvas.draw()
+            for viewport_uuid, axes in zip(viewport_uuids, axes_list):
+                self._blit_backgrounds[viewport_uuid] = figure_canvas.copy_from_bbox(axes.bbox)
+            self._blit_stale_canvases.discard(canvas.uuid)
+            redrawn_uuids = viewport_uuids
+        else:
+            redrawn_uuids = [viewport_uuid for viewport_uuid in viewport_uuids if viewport_uuid in self._blit_changed_viewports]
+
+        for viewport_uuid in redrawn_uuids:
+            axes = self._axes[viewport_uuid]
+            if not is_full_redraw:
+                figure_canvas.restore_region(self._blit_backgrounds[viewport_uuid])
+            # draw the artists in the same order as a full draw
+            animated_artists = sorted((artist for artist in axes.get_children() if artist.get_animated()), key=lambda artist: artist.get_zorder())
+            for artist in animated_artists:
+                axes.draw_artist(artist)
+            figure_canvas.blit(axes.bbox)
+
+        self._blit_changed_viewports.difference_update(viewport_uuids)
@@ -23,9 +23,9 @@ class MatplotlibRendererImage:
         if full_uuid not in renderer._axesImages:
             # print(f"Creating new AxesImage for image visual {full_uuid}")
             renderer._axesImages[full_uuid] = axes.imshow(np.zeros((2, 2, 3)))
+            renderer._axesImages[full_uuid].set_animated(renderer._blit)
 
         axes_image = renderer._axesImages[full_uuid]
-        axes_image.set_data(image.texture.image_data)
 
         #
 
@@ -57,4 +57,6 @@ class MatplotlibRendererImage:
             transformed_positions[0, 1] + image.image_extent[2],
             transformed_positions[0, 1] + image.image_extent[3],
         )
+
+        axes_image.set_data(image.texture.image_data)
         axes_image.set_extent(transformed_extent)
@@ -1,70 +1,212 @@
 # stdlib imports
+import zlib
 import numpy as np
 
 # pip imports
 import matplotlib.collections
 import matplotlib.colors
 import matplotlib.axes
-import matplotlib.collections
-import mpl3d.glm
+import matplotlib.path
 
 # local imports
 from gsp.core.camera import Camera
 from gsp.visuals.mesh import Mesh
 from .renderer import MatplotlibRenderer
+from .renderer_pick import MatplotlibRendererPickTarget
+
+
+class MatplotlibRendererMeshCache:
+    """
+    The per-mesh state of MatplotlibRendererMesh, kept between renders.
+
+    It holds the face topology, the buffers reused at each render, the depth order of the previous render
+    to warm-start the sort, and one matplotlib Path per face whose vertices are views on the polygons buffer.
+    """
+
+    IS_FAST_PATHS_SUPPORTED = hasattr(matplotlib.path.Path, "_fast_from_codes_and_verts")
+    """
+    True if the matplotlib Path of each face can be built once, on the polygons buffer - it relies on the private
+    Path._fast_from_codes_and_verts(), as PolyCollection.set_verts() does in matplotlib 3.x (tested with 3.10).
+    Otherwise the polygons are set with the public PolyCollection.set_verts() at each render.
+    """
+
+    __slots__ = (
+        "face_indices_checksum",
+        "flat_face_indices",
+        "vertices_buffer",
+        "vertices_w_buffer",
+        "faces_buffer",
+        "depths_buffer",
+        "faces_order",
+        "polygons_buffer",
+        "polygon_paths",
+    )
+
+    def __init__(self, vertices_coords: np.ndarray, face_indices: np.ndarray) -> None:
+        face_indices = np.asarray(face_indices)
+        face_count = len(face_indices)
+        vertex_count = len(vertices_coords)
+
+        self.face_indices_checksum = MatplotlibRendererMeshCache.get_face_indices_checksum(face_indices)
+        """Checksum of mesh.face_indices, to detect a topology change"""
+        self.flat_face_indices = np.ascontiguousarray(face_indices, dtype=np.intp).ravel()
+        """The vertex indices of the faces, flattened - shape (M*3,)"""
+        self.vertices_buffer = np.empty((vertex_count, 3), dtype=np.float64)
+        """The transformed vertices - shape (N, 3)"""
+        self.vertices_w_buffer = np.empty((vertex_count, 1), dtype=np.float64)
+        """The homogeneous w of the transformed vertices - shape (N, 1)"""
+        self.faces_buffer = np.empty((face_count, 3, 3), dtype=np.float64)
+        """The transformed vertices of each face - shape (M, 3, 3)"""
+        self.depths_buffer = np.empty(face_count, dtype=np.float64)
+        """The depth of each face - shape (M,)"""
+        self.faces_order = np.arange(face_count, dtype=np.intp)
+        """All the faces sorted by depth at the previous render - the warm start of the next sort"""
+        self.polygons_buffer = np.zeros((face_count, 4, 2), dtype=np.float64)
+        """The closed 2d polygons of the visible faces, in drawing order - shape (M, 4, 2)"""
+
+        # one closed path per face, sharing the polygons buffer - so the paths are updated without being created again
+        # NOTE: built like the fast path of PolyCollection.set_verts(), from a template path
+        self.polygon_paths: list[matplotlib.path.Path] | None = None
+        """The path of each polygon of polygons_buffer. None if not supported by matplotlib, see IS_FAST_PATHS_SUPPORTED"""
+        if MatplotlibRendererMeshCache.IS_FAST_PATHS_SUPPORTED:
+            template_path = matplotlib.path.Path(np.zeros((4, 2)), closed=True)
+            self.polygon_paths = [
+                matplotlib.path.Path._fast_from_codes_and_verts(polygon, template_path.codes, internals_from=template_path) for polygon in self.polygons_buffer
+            ]
+
+    def is_valid_for(self, vertices_coords: np.ndarray, face_indices: np.ndarray) -> bool:
+        """
+        Return True if the cache matches the topology of the mesh.
+        """
+        return (
+            len(self.vertices_buffer) == len(vertices_coords)
+            and len(self.flat_face_indices) == np.size(face_indices)
+            and self.face_indices_checksum == MatplotlibRendererMeshCache.get_face_indices_checksum(face_indices)
+        )
+
+    @staticmethod
+    def get_face_indices_checksum(face_indices: np.ndarray) -> int:
+        return zlib.crc32(np.ascontiguousarray(face_indices).view(np.uint8))
 
 
 class MatplotlibRendererMesh:
+    LOD_FACES_PER_PIXEL = 1.0
+    """The maximum number of faces per pixel covered by the mesh - beyond it, a decimated level of the mesh is rendered"""
+
     @staticmethod
     def render(renderer: MatplotlibRenderer, axes: matplotlib.axes.Axes, mesh: Mesh, full_uuid: str, camera: Camera) -> None:
         transform = camera.transform
 
+        # =============================================================================
+        # Select the level of detail
+        # =============================================================================
+        vertices_coords = mesh.vertices_coords
+        face_indices = mesh.face_indices
+        source_face_indices: np.ndarray | None = None
+        if renderer._mesh_face_budget is not None:
+            max_face_count = MatplotlibRendererMesh.__get_max_face_count(renderer, axes, mesh, camera)
+            if len(face_indices) > max_face_count:
+                lod_level = mesh.get_lod_pyramid().select_level(max_face_count)
+                if lod_level.grid_size != 0:
+                    vertices_coords = lod_level.vertices_coords
+                    face_indices = lod_level.face_indices
+                    source_face_indices = lod_level.source_face_indices
+
+        # get the mesh cache - built again if the topology changed
+        mesh_cache: MatplotlibRendererMeshCache | None = renderer._meshCaches.get(full_uuid)
+        if mesh_cache is None or mesh_cache.is_valid_for(vertices_coords, face_indices) is False:
+            mesh_cache = MatplotlibRendererMeshCache(vertices_coords, face_indices)
+            renderer._meshCaches[full_uuid] = mesh_cache
+
         # =============================================================================
         # Transform and render the mesh
         # =============================================================================
 
-        vertices_transformed = mpl3d.glm.transform(mesh.vertices_coords, transform)
-        faces_coords = vertices_transformed[mesh.face_indices]
+        # same as mpl3d.glm.transform(), in the buffers of the cache
+        vertices_transformed = mesh_cache.vertices_buffer
+        vertices_w = mesh_cache.vertices_w_buffer
+        np.matmul(vertices_coords, transform[:3, :3].T, out=vertices_transformed)
+        vertices_transformed += transform[:3, 3]
+        np.matmul(vertices_coords, transform[3:, :3].T, out=vertices_w)
+        vertices_w += transform[3, 3]
+        vertices_transformed /= vertices_w
+
+        faces_coords = mesh_cache.faces_buffer
+        np.take(vertices_transformed, mesh_cache.flat_face_indices, axis=0, out=faces_coords.reshape(-1, 3))
 
+        facecolors = mesh.facecolors
         edgecolors = mesh.edgecolors
         linewidths = mesh.linewidths
 
+        # per-face colors of a decimated level - the color of the original face
+        if source_face_indices is not None:
+            facecolors = facecolors[source_face_indices] if len(facecolors) == len(mesh.face_indices) else facecolors
+            edgecolors = edgecolors[source_face_indices] if len(edgecolors) == len(mesh.face_indices) else edgecolors
+
         # =============================================================================
         # Face culling
         # =============================================================================
-        if mesh.culling_mode == "front":
-            faces_to_keep, _ = mpl3d.glm.frontback(faces_coords)
-        elif mesh.culling_mode == "back":
-            _, faces_to_keep = mpl3d.glm.frontback(faces_coords)
+        if mesh.culling_mode in ("front", "back"):
+            # same as mpl3d.glm.frontback()
+            faces_x = faces_coords[:, :, 0]
+            faces_y = faces_coords[:, :, 1]
+            faces_z = (
+                (faces_x[:, 1] - faces_x[:, 0]) * (faces_y[:, 1] + faces_y[:, 0])
+                + (faces_x[:, 2] - faces_x[:, 1]) * (faces_y[:, 2] + faces_y[:, 1])
+                + (faces_x[:, 0] - faces_x[:, 2]) * (faces_y[:, 0] + faces_y[:, 2])
+            )
+            faces_kept_mask = faces_z < 0 if mesh.culling_mode == "front" else faces_z >= 0
         elif mesh.culling_mode == "all":
-            faces_to_keep = np.arange(len(faces_coords))
+            faces_kept_mask = None
         else:
             raise ValueError(f"Invalid mesh.mode: {mesh.culling_mode}, should be 'front', 'back' or 'all'")
 
-        # Cull faces
-        faces_coords = faces_coords[faces_to_keep]
+        # view-frustum culling - remove the faces entirely behind the camera, or entirely outside of one side of the clip box
+        faces_visible_mask = MatplotlibRendererMesh.get_visible_mask(faces_coords, vertices_w[mesh_cache.flat_face_indices].reshape(-1, 3))
+        if faces_visible_mask is not None:
+            faces_kept_mask = faces_visible_mask if faces_kept_mask is None else faces_kept_mask & faces_visible_mask
 
-        faces_depths = -faces_coords[:, :, 2].mean(axis=1)
+        faces_depths = mesh_cache.depths_buffer
+        np.sum(faces_coords[:, :, 2], axis=1, out=faces_depths)
+        faces_depths *= -1.0 / 3.0
+
+        # =============================================================================
+        # Sort triangles by depth (painter's algorithm)
+        # =============================================================================
+        # the depth order changes little between renders, so sort the faces starting from the previous order.
+        # NOTE: the stable sort is a timsort for floats, which is close to linear on nearly sorted input
+        faces_order = mesh_cache.faces_order
+        faces_order = faces_order[np.argsort(faces_depths[faces_order], kind="stable")]
+        mesh_cache.faces_order = faces_order
+
+        # Cull faces
+        faces_indices_sorted = faces_order[faces_kept_mask[faces_order]] if faces_kept_mask is not None else faces_order
+        visible_count = len(faces_indices_sorted)
 
         # compute facecolors
-        if mesh.cmap is not None:
+        if mesh.cmap is not None and visible_count > 0:
             # Facecolors using depth buffer
-            color_normalizer = matplotlib.colors.Normalize(vmin=faces_depths.min(), vmax=faces_depths.max())
-            facecolors = mesh.cmap(color_normalizer(faces_depths))
+            visible_depths = faces_depths[faces_indices_sorted]
+            color_normalizer = matplotlib.colors.Normalize(vmin=visible_depths[0], vmax=visible_depths[-1])
+            facecolors = mesh.cmap(color_normalizer(visible_depths))
         else:
-            facecolors = mesh.facecolors
-
-        # Separate 2d triangles from zbuffer
-        faces_coords_2d = faces_coords[:, :, :2]
+            facecolors = facecolors[faces_indices_sorted, :] if len(facecolors) == len(faces_order) else facecolors
+        edgecolors = edgecolors[faces_indices_sorted, :] if len(edgecolors) == len(faces_order) else edgecolors
         antialiased = linewidths > 0
 
-        # =============================================================================
-        # Sort triangles by depth (painter's algorithm)
-        # =============================================================================
-        faces_indices_sorted = np.argsort(faces_depths)
-        faces_coords_2d = faces_coords_2d[faces_indices_sorted, :]
-        facecolors = facecolors[faces_indices_sorted, :] if len(facecolors) == len(faces_indices_sorted) else facecolors
-        edgecolors = edgecolors[faces_indices_sorted, :] if len(edgecolors) == len(faces_indices_sorted) else edgecolors
+        # Separate 2d triangles from zbuffer, as closed polygons
+        polygons = mesh_cache.polygons_buffer[:visible_count]
+        polygons[:, :3] = faces_coords[faces_indices_sorted, :, :2]
+        polygons[:, 3] = polygons[:, 0]
+        faces_coords_2d = polygons[:, :3]
+
+        # keep the screen triangles of the visible faces, to pick them later - see MatplotlibRenderer.pick()
+        renderer._pickTargets[full_uuid] = MatplotlibRendererPickTarget(
+            faces_coords_2d.mean(axis=1),
+            element_indices=faces_indices_sorted if source_face_indices is None else source_face_indices[faces_indices_sorted],
+            axes_size=(axes.bbox.width, axes.bbox.height),
+            triangles=faces_coords_2d,
+        )
 
         # =============================================================================
         # Create the matplotlib artist if needed
@@ -72,7 +214,9 @@ class MatplotlibRendererMesh:
         # Create a PolyCollection for this mesh if it doesn't exist yet
         if full_uuid not in renderer._polyCollections:
             # print(f"Creating new PathCollection for mesh visual {full_uuid}")
-            renderer._polyCollections[full_uuid] = matplotlib.collections.PolyCollection([], clip_on=False, snap=False)
+            # NOTE: in blit mode, the mesh is clipped to its axes, as only the axes bbox is restored before a redraw - no ghost trails outside of it
+            renderer._polyCollections[full_uuid] = matplotlib.collections.PolyCollection([], clip_on=renderer._blit, snap=False)
+            renderer._polyCollections[full_uuid].set_animated(renderer._blit)
             axes.add_collection(renderer._polyCollections[full_uuid], autolim=False)
 
         # Retrieve the PolyCollection for this mesh
@@ -82,8 +226,61 @@ class MatplotlibRendererMesh:
         # Update the matplotlib artist
         # =============================================================================
 
-        polyCollection.set_verts(faces_coords_2d)
+        # NOTE: the paths views the polygons buffer, so only the list of visible paths is updated - same as .set_verts(faces_coords_2d)
+        paths = polyCollection.get_paths()
+        if mesh_cache.polygon_paths is not None and isinstance(paths, list):
+            paths[:] = mesh_cache.polygon_paths[:visible_count]
+            polyCollection.stale = True
+        else:
+            polyCollection.set_verts(faces_coords_2d)
         polyCollection.set_linewidth(linewidths)
         polyCollection.set_facecolor(facecolors)  # type: ignore
         polyCollection.set_edgecolor(edgecolors)  # type: ignore
         polyCollection.set_antialiased(antialiased)
+
+    @staticmethod
+    def get_visible_mask(faces_coords: np.ndarray, faces_w: np.ndarray) -> np.ndarray | None:
+        """
+        Return the mask of the faces which may be visible in the viewport, or None if they all may be.
+
+        A face is culled if its 3 vertices are behind the camera, or beyond the same side of the [-1, 1] clip box.
+        A face crossing the clip box is kept as a whole.
+
+        Arguments:
+            faces_coords (np.ndarray): the transformed vertices of each face, shape (M, 3, 3)
+            faces_w (np.ndarray): the homogeneous w of the vertices of each face, shape (M, 3)
+        """
+        faces_x = faces_coords[:, :, 0]
+        faces_y = faces_coords[:, :, 1]
+        is_culled = (faces_w <= 0).all(axis=1)
+        is_culled |= (faces_x < -1).all(axis=1)
+        is_culled |= (faces_x > 1).all(axis=1)
+        is_culled |= (faces_y < -1).all(axis=1)
+        is_culled |= (faces_y > 1).all(axis=1)
+        if not is_culled.any():
+            return None
+        return ~is_culled
+
+    @staticmethod
+    def __get_max_face_count(renderer: MatplotlibRenderer, axes: matplotlib.axes.Axes, mesh: Mesh, camera: Camera) -> float:
+        """
+        Return the maximum number of faces to render for this mesh - from the renderer budget,
+        and from the number of pixels covered by the mesh in the viewport.
+        """
+        assert renderer._mesh_face_budget is not None
+        viewport_pixel_count = axes.bbox.width * axes.bbox.height
+        max_face_count = min(renderer._mesh_face_budget, viewport_pixel_count * MatplotlibRendererMesh.LOD_FACES_PER_PIXEL)
+        if len(mesh.face_indices) <= max_face_count:
+            return max_face_count
+
+        # project the bounding box of the mesh, to get the ratio of the viewport it covers
+        bbox_corners = mesh.get_lod_pyramid().bbox_corners
+        corners_transformed = np.c_[bbox_corners, np.ones(len(bbox_corners))] @ camera.transform.T
+        if np.any(corners_transformed[:, 3] <= 0):
+            # the mesh is around or behind the camera - assume it covers the whole viewport
+            return max_face_count
+        corners_2d = corners_transformed[:, :2] / corners_transformed[:, 3:]
+        corners_min = np.clip(corners_2d.min(axis=0), -1, 1)
+        corners_max = np.clip(corners_2d.max(axis=0), -1, 1)
+        covered_ratio = float(np.prod((corners_max - corners_min) / 2))
+        return min(max_face_count, covered_ratio * viewport_pixel_count * MatplotlibRendererMesh.LOD_FACES_PER_PIXEL)
@@ -0,0 +1,123 @@
+# stdlib imports
+import numpy as np
+
+# local imports
+from gsp.types.spatial_index import SpatialIndex
+
+
+class MatplotlibRendererPickTarget:
+    """
+    The screen geometry of a visual at the last render, to find the element under a screen position - see MatplotlibRenderer.pick()
+
+    It keeps references on the arrays computed by the render - in clip coordinates, [-1, 1] over the viewport -
+    and the spatial index over them is built at the first pick only, so a render which is never picked costs nothing more.
+
+    - for points, the element is the nearest point whose marker, plus a tolerance, covers the position.
+    - for triangles, the element is the topmost triangle containing the position - the last one in drawing order.
+    """
+
+    __slots__ = ("positions", "element_indices", "marker_radii", "triangles", "axes_size", "__spatial_index")
+
+    def __init__(
+        self,
+        positions: np.ndarray,
+        element_indices: np.ndarray | None,
+        axes_size: tuple[float, float],
+        marker_radii: np.ndarray | float = 0.0,
+        triangles: np.ndarray | None = None,
+    ) -> None:
+        """
+        Arguments:
+            positions (np.ndarray): the points, or the triangle centroids, in clip coordinates - shape (K, 2) or more columns
+            element_indices (np.ndarray | None): the element index of each point or triangle, shape (K,). None if they are 0 to K-1
+            axes_size (tuple[float, float]): the width and height of the viewport in pixels
+            marker_radii (np.ndarray | float): the radius of each point marker in pixels, shape (K,), or a single one - a float or shape (1,)
+            triangles (np.ndarray | None): the triangles in clip coordinates and in drawing order, shape (K, 3, 2). None for points
+        """
+        self.positions = positions
+        """The points, or the triangle centroids, in clip coordinates - shape (K, 2+)"""
+        self.element_indices = element_indices
+        """The element index of each point or triangle - shape (K,). None if they are 0 to K-1"""
+        self.axes_size = np.array(axes_size, dtype=np.float64)
+        """The width and height of the viewport in pixels"""
+        # NOTE: a single size shared by all the points is a (1,) array - see Pixels.sizes
+        self.marker_radii = float(np.asarray(marker_radii).reshape(-1)[0]) if np.size(marker_radii) == 1 else marker_radii
+        """The radius of the point markers in pixels - shape (K,), or a single one"""
+        self.triangles = triangles
+        """The triangles in clip coordinates, in drawing order - shape (K, 3, 2). None for points"""
+        self.__spatial_index: tuple[SpatialIndex, np.ndarray, np.ndarray] | None = None
+        """The spatial index over the finite positions, the indices of these positions, and the distance in clip coordinates
+        around a position within which its element may be picked - without tolerance. Built at the first pick"""
+
+    def pick(self, x: float, y: float, tolerance: float) -> int | None:
+        """
+        Return the index of the element at the (x, y) clip coordinates, or None if there is none.
+
+        Arguments:
+            x (float): the x position in clip coordinates
+            y (float): the y position in clip coordinates
+            tolerance (float): the distance in pixels a point may be from its marker and still be picked. Unused for triangles
+        """
+        spatial_index, finite_indices, search_extent = self.__get_spatial_index()
+        if len(finite_indices) == 0:
+            return None
+        point = np.array([x, y])
+        pixels_per_clip = self.axes_size / 2.0
+
+        # the candidates are the elements whose center is close enough to be picked
+        if self.triangles is None:
+            search_extent = search_extent + tolerance / pixels_per_clip
+        candidates = spatial_index.query_bbox(point - search_extent, point + search_extent)
+        if len(candidates) == 0:
+            return None
+
+        if self.triangles is None:
+            # the nearest point whose marker covers the position
+            distances = np.linalg.norm((spatial_index.get_positions()[candidates] - point) * pixels_per_clip, axis=1)
+            marker_radii = self.marker_radii[finite_indices[candidates]] if np.ndim(self.marker_radii) > 0 else self.marker_radii
+            is_hit = distances <= marker_radii + tolerance
+            if not np.any(is_hit):
+                return None
+            hit_index = candidates[is_hit][np.argmin(distances[is_hit])]
+        else:
+            # the topmost triangle containing the position
+            is_hit = MatplotlibRendererPickTarget.get_triangles_containing(self.triangles[finite_indices[candidates]], point)
+            if not np.any(is_hit):
+                return None
+            hit_index = candidates[is_hit].max()
+
+        position_index = int(finite_indices[hit_index])
+        return int(self.element_indices[position_index]) if self.element_indices is not None else position_index
+
+    @staticmethod
+    def get_triangles_containing(triangles: np.ndarray, point: np.ndarray) -> np.ndarray:
+        """
+        Return the mask of the triangles containing the point, edges included, whatever their winding.
+
+        Arguments:
+            triangles (np.ndarray): the 2d triangles, shape (K, 3, 2)
+            point (np.ndarray): the 2d point, shape (2,)
+        """
+        # the sign of the cross product of each edge with the point - the same sign for the 3 edges when inside
+        edges = np.roll(triangles, -1, axis=1) - triangles
+        to_point = point - triangles
+        crosses = edges[:, :, 0] * to_point[:, :, 1] - edges[:, :, 1] * to_point[:, :, 0]
+        return np.all(crosses >= 0, axis=1) | np.all(crosses <= 0, axis=1)
+
+    def __get_spatial_index(self) -> tuple[SpatialIndex, np.ndarray, np.ndarray]:
+        if self.__spatial_index is None:
+            # NOTE: the points at w == 0 are not finite after the perspective division - they can not be picked
+            positions_2d = self.positions[:, :2]
+            is_finite = np.isfinite(positions_2d).all(axis=1)
+            if self.triangles is not None:
+                is_finite &= np.isfinite(self.triangles).all(axis=(1, 2))
+            finite_indices = np.flatnonzero(is_finite)
+            finite_positions = positions_2d if len(finite_indices) == len(positions_2d) else positions_2d[finite_indices]
+            # the largest marker radius, or the largest extent of a triangle around its centroid
+            search_extent = np.zeros(2)
+            if self.triangles is None and np.size(self.marker_radii) > 0:
+                search_extent += float(np.max(self.marker_radii)) / (self.axes_size / 2.0)
+            elif self.triangles is not None and len(finite_indices) > 0:
+                search_extent = np.abs(self.triangles[finite_indices] - finite_positions[:, np.newaxis, :]).max(axis=(0, 1))
+            self.__spatial_index = (SpatialIndex(finite_positions), finite_indices, search_extent)
+        return self.__spatial_index
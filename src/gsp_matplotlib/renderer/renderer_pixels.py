@@ -1,8 +1,11 @@
 # stdlib imports
+from typing import Literal
 import numpy as np
 
 # pip imports
 import matplotlib.axes
+import matplotlib.colors
+import matplotlib.image
 import mpl3d.glm
 
 # local imports
@@ -10,6 +13,7 @@ from gsp.core.camera import Camera
 from gsp.visuals.pixels import Pixels
 from gsp.types.ndarray_like_utils import NdarrayLikeUtils
 from .renderer import MatplotlibRenderer
+from .renderer_pick import MatplotlibRendererPickTarget
 
 
 class MatplotlibRendererPixels:
@@ -29,6 +33,7 @@ class MatplotlibRendererPixels:
         else:
             # print(f"Creating new PathCollection for pixels visual {full_uuid}")
             pathCollection = axes.scatter([], [])
+            pathCollection.set_animated(renderer._blit)
             renderer._pathCollections[full_uuid] = pathCollection
 
         # compute positions
@@ -36,6 +41,8 @@ class MatplotlibRendererPixels:
 
         # apply camera transform to positions
         transformed_positions: np.ndarray = mpl3d.glm.transform(pixels_positions, camera.transform)
+        # the homogeneous w of the positions, negative behind the camera - mpl3d.glm.transform() divides by it
+        positions_w = np.asarray(pixels_positions).reshape(-1, 3) @ camera.transform[3, :3] + camera.transform[3, 3]
 
         # Notify post-transform event
         pixels.post_transform.send(
@@ -46,10 +53,163 @@ class MatplotlibRendererPixels:
             },
         )
 
-        pathCollection.set_offsets(transformed_positions)
-        pathCollection.set_sizes(NdarrayLikeUtils.to_numpy(pixels.sizes))
-        pathCollection.set_color(NdarrayLikeUtils.to_numpy(pixels.colors).tolist())
-        # pathCollection.set_edgecolor([0,0,0,1])
+        pixels_sizes = NdarrayLikeUtils.to_numpy(pixels.sizes)
+        pixels_colors = NdarrayLikeUtils.to_numpy(pixels.colors)
+
+        # view-frustum culling - only the visible points reach the artists. post_transform saw all the points
+        # NOTE: a post_transform subscriber may reorder the points, so the w of the points is used only without subscriber
+        is_visible = MatplotlibRendererPixels.get_visible_mask(
+            transformed_positions,
+            pixels_sizes,
+            positions_w=positions_w if not pixels.post_transform.receivers else None,
+            axes_width=axes.bbox.width,
+            axes_height=axes.bbox.height,
+            dpi=axes.figure.dpi,
+        )
+        visible_indices: np.ndarray | None = None
+        if not is_visible.all():
+            point_count = len(transformed_positions)
+            visible_indices = np.flatnonzero(is_visible)
+            transformed_positions = transformed_positions[is_visible]
+            pixels_sizes = pixels_sizes[is_visible] if np.ndim(pixels_sizes) > 0 and len(pixels_sizes) == point_count else pixels_sizes
+            pixels_colors = pixels_colors[is_visible] if len(pixels_colors) == point_count else pixels_colors
+
+        # keep the screen positions of the visible points, to pick them later - see MatplotlibRenderer.pick()
+        renderer._pickTargets[full_uuid] = MatplotlibRendererPickTarget(
+            transformed_positions,
+            element_indices=visible_indices,
+            axes_size=(axes.bbox.width, axes.bbox.height),
+            marker_radii=MatplotlibRendererPixels.get_marker_radii(pixels_sizes, axes.figure.dpi),
+        )
+
+        is_density = renderer._pixels_density_threshold is not None and len(transformed_positions) > renderer._pixels_density_threshold
+
+        if is_density:
+            # too many points for a scatter plot - render the density of points per screen pixel as an image
+            if full_uuid not in renderer._densityImages:
+                density_image = matplotlib.image.AxesImage(axes, origin="lower", interpolation="nearest", extent=(-1, 1, -1, 1), zorder=pathCollection.get_zorder())
+                density_image.set_animated(renderer._blit)
+                axes.add_image(density_image)
+                renderer._densityImages[full_uuid] = density_image
+            density_image = renderer._densityImages[full_uuid]
+
+            density_rgba = MatplotlibRendererPixels.rasterize_density(
+                transformed_positions,
+                pixels_colors,
+                width=max(1, round(axes.bbox.width)),
+                height=max(1, round(axes.bbox.height)),
+                cmap=renderer._pixels_density_cmap,
+                norm=renderer._pixels_density_norm,
+            )
+            density_image.set_data(density_rgba)
+        else:
+            pathCollection.set_offsets(transformed_positions)
+            pathCollection.set_sizes(pixels_sizes)
+            pathCollection.set_color(pixels_colors.tolist())
+            # pathCollection.set_edgecolor([0,0,0,1])
+
+        # show only the artist of the current mode - the number of points may cross the threshold between renders
+        pathCollection.set_visible(not is_density)
+        if full_uuid in renderer._densityImages:
+            renderer._densityImages[full_uuid].set_visible(is_density)
 
         # Notify post-rendering event
         pixels.post_rendering.send()
+
+    @staticmethod
+    def get_visible_mask(
+        transformed_positions: np.ndarray,
+        sizes: np.ndarray,
+        positions_w: np.ndarray | None,
+        axes_width: float,
+        axes_height: float,
+        dpi: float,
+    ) -> np.ndarray:
+        """
+        Return the mask of the points visible in the viewport: in front of the camera, and within the [-1, 1] clip box
+        extended by the radius of their marker - so a marker partly inside the viewport is kept.
+
+        Arguments:
+            transformed_positions (np.ndarray): the positions after the camera transform, shape (N, 3)
+            sizes (np.ndarray): the marker sizes in points^2, as in matplotlib scatter, shape (N,) or (1,)
+            positions_w (np.ndarray | None): the homogeneous w of the positions, shape (N,). None to skip the test of the points behind the camera
+            axes_width (float): the width of the viewport in pixels
+            axes_height (float): the height of the viewport in pixels
+            dpi (float): the dpi of the figure, to convert the marker sizes to pixels
+        """
+        # marker radius in pixels, then in clip coordinates
+        marker_radius = MatplotlibRendererPixels.get_marker_radii(sizes, dpi)
+        margin_x = 1.0 + marker_radius * 2.0 / max(axes_width, 1.0)
+        margin_y = 1.0 + marker_radius * 2.0 / max(axes_height, 1.0)
+        is_visible = (np.abs(transformed_positions[:, 0]) <= margin_x) & (np.abs(transformed_positions[:, 1]) <= margin_y)
+        if positions_w is not None:
+            is_visible &= positions_w > 0
+        return is_visible
+
+    @staticmethod
+    def get_marker_radii(sizes: np.ndarray, dpi: float) -> np.ndarray:
+        """
+        Return the radius in pixels of markers of these sizes - in points^2, as in matplotlib scatter.
+        """
+        return np.sqrt(np.maximum(np.asarray(sizes, dtype=np.float64), 0.0)) / 2.0 * dpi / 72.0
+
+    @staticmethod
+    def rasterize_density(
+        transformed_positions: np.ndarray,
+        colors: np.ndarray,
+        width: int,
+        height: int,
+        cmap: matplotlib.colors.Colormap | None = None,
+        norm: Literal["linear", "log"] = "log",
+    ) -> np.ndarray:
+        """
+        Bin the transformed positions in a width x height grid covering the [-1, 1] clip box, and return the RGBA density image.
+
+        Arguments:
+            transformed_positions (np.ndarray): the positions after the camera transform, shape (N, 2) or (N, 3)
+            colors (np.ndarray): the color of all the points, shape (1, 4), or of each point, shape (N, 4)
+            width (int): the width of the image, typically the width of the viewport in pixels
+            height (int): the height of the image
+            cmap (Colormap | None): the colormap of the density. None to use the (mean) color of the points in each pixel,
+                with an opacity depending on the density
+            norm ("linear" | "log"): how the number of points per pixel is mapped to [0, 1]
+
+        Returns:
+            np.ndarray: the RGBA image, shape (height, width, 4), with the row 0 at the bottom. Empty pixels are transparent.
+        """
+        # the pixel of each point - the points outside of the clip box are dropped
+        pixel_x = np.floor((transformed_positions[:, 0] + 1.0) * (width / 2.0)).astype(np.int64)
+        pixel_y = np.floor((transformed_positions[:, 1] + 1.0) * (height / 2.0)).astype(np.int64)
+        is_inside = (pixel_x >= 0) & (pixel_x < width) & (pixel_y >= 0) & (pixel_y < height)
+        pixel_indices = pixel_y[is_inside] * width + pixel_x[is_inside]
+
+        counts = np.bincount(pixel_indices, minlength=width * height).astype(np.float64)
+        max_count = counts.max() if len(counts) > 0 else 0.0
+
+        # map the counts to [0, 1]
+        if max_count == 0:
+            densities = counts
+        elif norm == "log":
+            densities = np.log1p(counts) / np.log1p(max_count)
+        elif norm == "linear":
+            densities = counts / max_count
+        else:
+            raise ValueError(f"Invalid density norm: {norm}, should be 'linear' or 'log'")
+
+        if cmap is not None:
+            density_rgba = cmap(densities)
+            density_rgba[counts == 0, 3] = 0.0
+        elif len(colors) == len(transformed_positions) and len(colors) > 1:
+            # mean color of the points in each pixel
+            density_rgba = np.zeros((width * height, 4), dtype=np.float64)
+            inside_colors = colors[is_inside]
+            for channel in range(4):
+                density_rgba[:, channel] = np.bincount(pixel_indices, weights=inside_colors[:, channel], minlength=width * height)
+            density_rgba /= np.maximum(counts, 1.0)[:, np.newaxis]
+            density_rgba[:, 3] *= densities
+        else:
+            density_rgba = np.empty((width * height, 4), dtype=np.float64)
+            density_rgba[:] = np.asarray(colors, dtype=np.float64).reshape(-1, 4)[0]
+            density_rgba[:, 3] *= densities
+
+        return density_rgba.reshape(height, width, 4)
@@ -1,11 +1,15 @@
 # stdlib imports
-from typing import TypedDict, Literal, Any
+from collections import OrderedDict
+from typing import TypedDict, Literal, Any, NotRequired
+import io
 import json
+import zlib
 
 # pip imports
+import numpy as np
+import matplotlib.image
 import requests
 import uuid
-import jsonpatch
 import http_constants.status
 
 
@@ -15,6 +19,9 @@ from gsp.core.viewport import Viewport
 from gsp.core.camera import Camera
 from gsp.core.types import SceneDict
 from gsp.renderer.json.renderer import JsonRenderer
+from gsp.renderer.json.scene_delta import SceneDelta, SceneDeltaType
+from gsp.types.ndarray_serialisation import NdarraySerialisation, NdarrayEncodingType
+from gsp.types.ndarray_hash_store import NdarrayHashStore
 
 
 ###############################################################################
@@ -23,27 +30,91 @@ from gsp.renderer.json.renderer import JsonRenderer
 class NetworkPayload(TypedDict):
     client_id: str
     """Unique client ID for the server to identify the client."""
-    type: Literal["absolute", "json_diff"]  # or other literal string values if any
-    """Type of rendering to perform. "absolute" to always render the full scene, "json_diff" to only render changes since last call."""
-    data: SceneDict | str
-    """The scene data in JSON format. `SceneDict` for 'absolute', `str` (JSON Patch) for 'json_diff'"""
+    type: Literal["absolute", "json_diff", "scene_delta"]  # or other literal string values if any
+    """
+    Type of rendering to perform. "absolute" to always render the full scene, "scene_delta" to only render changes since last call.
+    "json_diff" is the legacy jsonpatch diff, still accepted by the server.
+    """
+    data: SceneDict | str | SceneDeltaType
+    """The scene data in JSON format. `SceneDict` for 'absolute', `SceneDeltaType` for 'scene_delta', `str` (JSON Patch) for 'json_diff'"""
+    arrays: NotRequired[dict[str, Any]]
+    """Only with array cache. Arrays uploaded with this payload, keyed by hash. `data` refers to them as {"__ndarray_hash__": hash}"""
+    frame_format: NotRequired["NetworkFrameFormat"]
+    """Format of the rendered frame returned by the server. "png" if absent"""
+
+
+NetworkFrameFormat = Literal["png", "rgba", "rgba_zlib"]
+"""
+Format of the rendered frame returned by the server.
+- "png": PNG image
+- "rgba": raw (height, width, 4) uint8 framebuffer, the shape is in the NetworkRenderer.FRAME_SHAPE_HEADER header
+- "rgba_zlib": the raw framebuffer compressed with zlib at a fast level
+"""
 
 
 ###############################################################################
 #   Network Renderer
 #
 class NetworkRenderer:
-    __slots__ = ("__server_url", "__client_id", "__jsondiff_allowed", "__absolute_scene", "__renderer_json")
+    __slots__ = (
+        "__server_url",
+        "__client_id",
+        "__jsondiff_allowed",
+        "__wire_format",
+        "__frame_format",
+        "__array_cache_allowed",
+        "__uploaded_hashes",
+        "__absolute_scene",
+        "__renderer_json",
+    )
+
+    MULTIPART_CONTENT_TYPE = "application/x-gsp-multipart"
+    """Content-Type of the payloads sent with wire_format="multipart". see NdarraySerialisation.to_multipart()"""
+
+    CLIENT_ID_HEADER = "X-Gsp-Client-Id"
+    """HTTP header carrying the client id, so the server can route the request without decoding the payload"""
+
+    FRAME_SHAPE_HEADER = "X-Gsp-Frame-Shape"
+    """HTTP header carrying the "height,width,4" shape of the raw frames"""
+
+    FRAME_ZLIB_LEVEL = 1
+    """zlib compression level of the "rgba_zlib" frames - fast, as the frames are compressed every render"""
 
-    def __init__(self, server_url: str, jsondiff_allowed: bool = False) -> None:
+    ARRAY_CACHE_MIN_NBYTES = 1024
+    """Arrays smaller than this are always sent inline, even with array cache"""
+
+    ARRAY_CACHE_MAX_HASHES = 4096
+    """Maximum number of uploaded hashes remembered by the client"""
+
+    def __init__(
+        self,
+        server_url: str,
+        jsondiff_allowed: bool = False,
+        wire_format: Literal["json", "multipart"] = "json",
+        array_cache_allowed: bool = False,
+        frame_format: NetworkFrameFormat = "png",
+    ) -> None:
         """
         Renderer that sends the scene to a network server for rendering.
 
         Arguments:
             server_url (str): URL of the server, e.g. "http://localhost:5000/".
             diff_enabled (bool): True to enable diff rendering, False to always render the full scene
+            wire_format (str): "json" to send the payload as JSON, "multipart" to send a small JSON skeleton
+                followed by each np.ndarray as a raw binary part. "multipart" does not support jsondiff.
+            array_cache_allowed (bool): True to send only the hash of the arrays already uploaded to the server.
+                It requires wire_format="multipart".
+            frame_format (NetworkFrameFormat): format of the frames returned by the server. "rgba" and "rgba_zlib" avoid
+                the PNG encoding and decoding, use .render_rgba() to get them as np.ndarray.
         """
 
+        # sanity check - jsonpatch can't diff raw np.ndarray
+        if jsondiff_allowed and wire_format == "multipart":
+            raise ValueError("jsondiff_allowed is not supported with wire_format='multipart'")
+        # sanity check - arrays are hashed in their binary form
+        if array_cache_allowed and wire_format != "multipart":
+            raise ValueError("array_cache_allowed requires wire_format='multipart'")
+
         self.__server_url = server_url
         """URL of the server, e.g. "http://localhost:5000/"."""
 
@@ -53,6 +124,18 @@ class NetworkRenderer:
         self.__jsondiff_allowed = jsondiff_allowed
         """True to allow diff rendering, False to always render the full scene."""
 
+        self.__wire_format = wire_format
+        """Format of the payload on the wire: "json" or "multipart"."""
+
+        self.__frame_format = frame_format
+        """Format of the frames returned by the server."""
+
+        self.__array_cache_allowed = array_cache_allowed
+        """True to send only the hash of the arrays already uploaded to the server."""
+
+        self.__uploaded_hashes: OrderedDict[str, None] = OrderedDict()
+        """Hashes of the arrays uploaded to the server, in least recently used order."""
+
         self.__absolute_scene: SceneDict | None = None
         """The last absolute scene data sent to the server, or None if none has been sent."""
 
@@ -66,27 +149,69 @@ class NetworkRenderer:
         """Close the renderer and free resources."""
         self.__renderer_json.close()
         self.__absolute_scene = None
+        self.__uploaded_hashes.clear()
 
     # =============================================================================
     # .render()
     # =============================================================================
     def render(self, canvas: Canvas, viewports: list[Viewport], cameras: list[Camera]) -> bytes:
+        """
+        Render the scene on the server, and return the frame as sent by the server, in the frame_format of this renderer.
+        """
+        response = self.__render_response(canvas, viewports, cameras)
+        return response.content
+
+    # =============================================================================
+    # .render_rgba()
+    # =============================================================================
+    def render_rgba(self, canvas: Canvas, viewports: list[Viewport], cameras: list[Camera]) -> np.ndarray:
+        """
+        Render the scene on the server, and return the frame as a (height, width, 4) uint8 np.ndarray, whatever the frame_format.
+        """
+        response = self.__render_response(canvas, viewports, cameras)
+        return NetworkRenderer.frame_to_rgba(response.content, self.__frame_format, response.headers.get(NetworkRenderer.FRAME_SHAPE_HEADER))
+
+    @staticmethod
+    def frame_to_rgba(frame_data: bytes, frame_format: NetworkFrameFormat, frame_shape: str | None) -> np.ndarray:
+        """
+        Decode a frame sent by the server into a (height, width, 4) uint8 np.ndarray.
+
+        Arguments:
+            frame_data (bytes): the frame as sent by the server
+            frame_format (NetworkFrameFormat): the format of the frame
+            frame_shape (str | None): the value of the FRAME_SHAPE_HEADER header. Required for the raw formats
+        """
+        if frame_format == "png":
+            image_data_np = matplotlib.image.imread(io.BytesIO(frame_data), format="png")
+            return (image_data_np * 255).round().astype(np.uint8)
+
+        assert frame_shape is not None, f"the {NetworkRenderer.FRAME_SHAPE_HEADER} header is required for frame_format={frame_format}"
+        shape = tuple(int(dim) for dim in frame_shape.split(","))
+        if frame_format == "rgba_zlib":
+            frame_data = zlib.decompress(frame_data)
+        return np.frombuffer(frame_data, dtype=np.uint8).reshape(shape)
+
+    # =============================================================================
+    # .__render_response()
+    # =============================================================================
+    def __render_response(self, canvas: Canvas, viewports: list[Viewport], cameras: list[Camera]) -> requests.Response:
 
         # sanity checks
         assert len(viewports) == len(cameras), "Number of viewports must match number of cameras"
 
-        # Convert the canvas to JSON
-        scene_dict = self.__renderer_json.render(canvas, viewports, cameras)
+        # Convert the canvas to JSON - keep np.ndarray as is for multipart, they are sent as binary parts
+        ndarray_encoding: NdarrayEncodingType = "binary" if self.__wire_format == "multipart" else "list"
+        scene_dict = self.__renderer_json.render(canvas, viewports, cameras, ndarray_encoding=ndarray_encoding)
 
         # Build the payload
         if self.__jsondiff_allowed and self.__absolute_scene is not None:
-            # Diff rendering - compute the diff between the current scene and the last absolute scene
-            json_patch = jsonpatch.JsonPatch.from_diff(self.__absolute_scene, scene_dict)
-            scene_diff = str(json_patch)
+            # Diff rendering - compute the delta between the current scene and the last scene sent
+            scene_delta = SceneDelta.diff(self.__absolute_scene, scene_dict)
             payload: NetworkPayload = {
                 "client_id": self.__client_id,
-                "type": "json_diff",
-                "data": scene_diff,
+                "type": "scene_delta",
+                "data": scene_delta,
+                "frame_format": self.__frame_format,
             }
         else:
             # Absolute rendering
@@ -94,6 +219,7 @@ class NetworkRenderer:
                 "client_id": self.__client_id,
                 "type": "absolute",
                 "data": scene_dict,
+                "frame_format": self.__frame_format,
             }
 
         # =============================================================================
@@ -101,8 +227,7 @@ class NetworkRenderer:
         # =============================================================================
         # Send the POST request with JSON data
         call_url = f"{self.__server_url}/render_scene"
-        headers = {"Content-Type": "application/json"}
-        response = requests.post(call_url, data=json.dumps(payload), headers=headers)
+        response = self.__post_payload(call_url, payload)
 
         # =============================================================================
         # Check the payload not been reject due to a lost context
@@ -114,15 +239,16 @@ class NetworkRenderer:
             # Clear the JSON renderer cache to avoid sending diffs based on old data - typically when using DiffableNdarray
             self.__renderer_json.clear_cache()
             # Rebuild the scene dict from scratch
-            scene_dict = self.__renderer_json.render(canvas, viewports, cameras)
+            scene_dict = self.__renderer_json.render(canvas, viewports, cameras, ndarray_encoding=ndarray_encoding)
             # rebuild the payload as absolute rendering
             payload: NetworkPayload = {
                 "client_id": self.__client_id,
                 "type": "absolute",
                 "data": scene_dict,
+                "frame_format": self.__frame_format,
             }
             # The server does not have the previous state, resend as absolute
-            response = requests.post(call_url, data=json.dumps(payload), headers=headers)
+            response = self.__post_payload(call_url, payload)
 
         # =============================================================================
         #
@@ -132,11 +258,65 @@ class NetworkRenderer:
         if response.status_code != 200:
             raise Exception(f"Request failed with status code {response.status_code}")
 
-        # Mark that an absolute rendering has been sent
+        # Keep the scene sent, the next delta is computed against it - the server stores the same scene
         # - MUST be done after the response is successful
-        if self.__jsondiff_allowed and payload["type"] == "absolute":
+        if self.__jsondiff_allowed:
             self.__absolute_scene = scene_dict
 
-        # return png data as bytes
-        image_png_data = response.content
-        return image_png_data
+        return response
+
+    # =============================================================================
+    # .__post_payload()
+    # =============================================================================
+    def __post_payload(self, call_url: str, payload: NetworkPayload) -> requests.Response:
+        """
+        POST the payload to the server.
+
+        With array cache, the arrays are replaced by their hash, and only the arrays not yet uploaded are attached.
+        If the server replies 409 CONFLICT with the hashes it lacks (e.g. evicted from its store), they are uploaded and the payload is resent.
+        """
+        if self.__array_cache_allowed is False:
+            return self.__post_encoded(call_url, payload)
+
+        # replace the arrays by their hash
+        scene_skeleton, hashed_arrays = NdarrayHashStore.replace_with_hashes(payload["data"], min_nbytes=NetworkRenderer.ARRAY_CACHE_MIN_NBYTES)
+        payload_hashed: NetworkPayload = {
+            "client_id": payload["client_id"],
+            "type": payload["type"],
+            "frame_format": payload.get("frame_format", "png"),
+            "data": scene_skeleton,
+            "arrays": {array_hash: array for array_hash, array in hashed_arrays.items() if array_hash not in self.__uploaded_hashes},
+        }
+        response = self.__post_encoded(call_url, payload_hashed)
+
+        # If the server responds with 409, upload the arrays it lacks and resend
+        if response.status_code == http_constants.status.HttpStatus.CONFLICT:
+            missing_hashes: list[str] = response.json()["missing_hashes"]
+            payload_hashed["arrays"] = {array_hash: hashed_arrays[array_hash] for array_hash in missing_hashes}
+            response = self.__post_encoded(call_url, payload_hashed)
+
+        # Remember the uploaded hashes
+        # - MUST be done after the response is successful
+        if response.status_code == 200:
+            for array_hash in hashed_arrays.keys():
+                self.__uploaded_hashes[array_hash] = None
+                self.__uploaded_hashes.move_to_end(array_hash)
+            while len(self.__uploaded_hashes) > NetworkRenderer.ARRAY_CACHE_MAX_HASHES:
+                self.__uploaded_hashes.popitem(last=False)
+
+        return response
+
+    def __post_encoded(self, call_url: str, payload: NetworkPayload) -> requests.Response:
+        """
+        Encode the payload according to the wire format, and POST it to the server.
+        """
+        if self.__wire_format == "multipart":
+            headers = {"Content-Type": NetworkRenderer.MULTIPART_CONTENT_TYPE}
+            payload_data = NdarraySerialisation.to_multipart(payload)
+        else:
+            headers = {"Content-Type": "application/json"}
+            payload_data = json.dumps(payload)
+        headers[NetworkRenderer.CLIENT_ID_HEADER] = payload["client_id"]
+
+        response = requests.post(call_url, data=payload_data, headers=headers)
+        return response
@@ -0,0 +1,115 @@
+# stdlib imports
+import multiprocessing
+import threading
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+
+class RenderWorkerPoolFullError(Exception):
+    """Raised when the queue of the worker of a client is full."""
+
+    pass
+
+
+class RenderWorkerPool:
+    """
+    A pool of worker processes, where each client is always routed to the same worker (sticky routing).
+
+    It lets a server render several clients in parallel, each worker process having its own matplotlib backend,
+    while the per-client state (last scene, received DiffableNdarray...) stays in the process of its worker.
+
+    Each worker is a single-process ProcessPoolExecutor, with a bounded number of pending tasks (the queue depth).
+    If a worker process dies, its pending tasks fail with BrokenProcessPool and the worker is restarted - with a fresh state.
+    """
+
+    __slots__ = ("__executors", "__pending_counts", "__queue_depth", "__lock", "__executor_factory")
+
+    def __init__(
+        self,
+        worker_count: int,
+        queue_depth: int = 8,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple[Any, ...] = (),
+    ) -> None:
+        """
+        Arguments:
+            worker_count (int): the number of worker processes
+            queue_depth (int): the maximum number of pending tasks per worker. Above it, .submit() raises RenderWorkerPoolFullError
+            initializer (Callable | None): function called in each worker process when it starts
+            initargs (tuple): arguments of the initializer
+        """
+        assert worker_count >= 1, f"worker_count must be at least 1, got {worker_count}"
+        assert queue_depth >= 1, f"queue_depth must be at least 1, got {queue_depth}"
+
+        # NOTE: use "spawn" as "fork" is unsafe in a multi-threaded server
+        mp_context = multiprocessing.get_context("spawn")
+        self.__executor_factory = lambda: ProcessPoolExecutor(max_workers=1, mp_context=mp_context, initializer=initializer, initargs=initargs)
+        """Create the executor of a worker - at start, and when its process died"""
+        self.__executors = [self.__executor_factory() for _ in range(worker_count)]
+        """One single-process executor per worker, so a worker keeps its state between tasks"""
+        self.__pending_counts = [0] * worker_count
+        """The number of pending tasks of each worker"""
+        self.__queue_depth = queue_depth
+        """The maximum number of pending tasks per worker"""
+        self.__lock = threading.Lock()
+        """Protects __pending_counts and __executors, as .submit() is called from the server threads"""
+
+    def get_worker_count(self) -> int:
+        return len(self.__executors)
+
+    def get_worker_index(self, client_id: str) -> int:
+        """
+        Return the index of the worker of this client. It is stable across processes and runs.
+        """
+        return zlib.crc32(client_id.encode("utf-8")) % len(self.__executors)
+
+    def submit(self, client_id: str, task: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run task(*args) in the worker of this client, and return its Future.
+        The task must be picklable - e.g. a module-level function.
+
+        Raises:
+            RenderWorkerPoolFullError: if the worker of this client already has queue_depth pending tasks
+
+        The Future raises BrokenProcessPool if the worker process died before the task is done - the worker is restarted.
+        """
+        worker_index = self.get_worker_index(client_id)
+        with self.__lock:
+            if self.__pending_counts[worker_index] >= self.__queue_depth:
+                raise RenderWorkerPoolFullError(f"worker {worker_index} has {self.__queue_depth} pending tasks")
+            self.__pending_counts[worker_index] += 1
+            executor = self.__executors[worker_index]
+
+        try:
+            future = executor.submit(task, *args)
+        except BrokenProcessPool:
+            # the worker died since its last task - restart it, and submit again
+            executor = self.__restart_worker(worker_index, executor)
+            future = executor.submit(task, *args)
+        future.add_done_callback(lambda done_future: self.__on_task_done(worker_index, executor, done_future))
+        return future
+
+    def shutdown(self) -> None:
+        """
+        Stop the worker processes, after the pending tasks are done.
+        """
+        for executor in self.__executors:
+            executor.shutdown(wait=True)
+
+    def __on_task_done(self, worker_index: int, executor: ProcessPoolExecutor, future: Future) -> None:
+        with self.__lock:
+            self.__pending_counts[worker_index] -= 1
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self.__restart_worker(worker_index, executor)
+
+    def __restart_worker(self, worker_index: int, broken_executor: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """
+        Replace the broken executor of a worker by a new one, unless it is already replaced. Return the current executor.
+        """
+        with self.__lock:
+            if self.__executors[worker_index] is broken_executor:
+                self.__executors[worker_index] = self.__executor_factory()
+                broken_executor.shutdown(wait=False)
+            return self.__executors[worker_index]
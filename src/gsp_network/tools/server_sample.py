@@ -4,11 +4,17 @@ Server example using Flask to render a scene from JSON input.
 
 - use Flask to create a simple web server
 - render with matplotlib
-- it is able to handle delta encoding of the scene using jsonpatch
+- it is able to handle delta encoding of the scene using SceneDelta (or the legacy jsonpatch)
+- with worker_count > 0, the renders run in a pool of worker processes, each client always routed to the same worker
 """
 
 # stdlib imports
 import io
+import json
+import time
+import typing
+import zlib
+from concurrent.futures.process import BrokenProcessPool
 
 # pip imports
 from flask import Flask, request, send_file, Response
@@ -16,13 +22,17 @@ import jsonpatch
 import argparse
 import http_constants.status
 import colorama
+import matplotlib
 
 # local imports
 import gsp
 import gsp_matplotlib
 from gsp.core.types import SceneDict
-from gsp.types import DiffableNdarraySerialisationError
-from gsp_network import NetworkPayload
+from gsp.renderer.json.scene_delta import SceneDelta, SceneDeltaType, SceneOwnedArraysType
+from gsp.types import DiffableNdarrayDb, DiffableNdarrayLruStore, DiffableNdarraySerialisationError, NdarraySerialisation
+from gsp.types.ndarray_hash_store import NdarrayHashStore
+from gsp_network import NetworkPayload, NetworkRenderer
+from gsp_network.tools.render_worker_pool import RenderWorkerPool, RenderWorkerPoolFullError
 
 flask_app = Flask(__name__)
 
@@ -30,7 +40,50 @@ flask_app = Flask(__name__)
 absolute_scenes: dict[str, SceneDict] = {}
 """Dictionary mapping client IDs to their last absolute scene data."""
 
-json_parser = gsp.renderer.json.JsonParser()
+absolute_scene_owned_arrays: dict[str, SceneOwnedArraysType] = {}
+"""Dictionary mapping client IDs to the arrays owned by their absolute scene - patched in place by SceneDelta.apply()"""
+
+diffable_ndarray_store = DiffableNdarrayLruStore(max_bytes=512 * 1024 * 1024)
+"""Bounded store of the DiffableNdarray received, one namespace per client. Evicted arrays trigger a 410 GONE resync"""
+
+ndarray_hash_store = NdarrayHashStore()
+"""Content-addressed store of the arrays uploaded by the clients, shared by all clients"""
+
+CLIENT_IDLE_TIMEOUT = 300.0
+"""Seconds without request after which the state of a client is freed. Its next request gets a 410 GONE, and it resends the full scene"""
+
+
+class ClientSession:
+    """
+    The live rendering state of a client, kept between its requests.
+    The parsed objects and the matplotlib figure, axes and artists are reused, so only the changes cost something.
+    """
+
+    __slots__ = ("json_parser", "matplotlib_renderer", "last_used")
+
+    def __init__(self, client_id: str) -> None:
+        self.json_parser = gsp.renderer.json.JsonParser(DiffableNdarrayDb(from_json_db=diffable_ndarray_store.get_namespace(client_id)), reuse_objects=True)
+        """Parser of the client scene, with the DiffableNdarray of this client"""
+        self.matplotlib_renderer = gsp_matplotlib.MatplotlibRenderer(blit=True)
+        """Renderer of the client scene - in blit mode, so only the viewports with changed visuals are redrawn"""
+        self.last_used = time.monotonic()
+        """time.monotonic() of the last request of this client"""
+
+    def close(self) -> None:
+        self.matplotlib_renderer.close()
+
+
+client_sessions: dict[str, ClientSession] = {}
+"""Dictionary mapping client IDs to their live rendering state"""
+
+evicted_client_ids: set[str] = set()
+"""The clients with evicted DiffableNdarray, whose session is freed at the end of the current request. see evict_client_scene()"""
+
+render_worker_pool: RenderWorkerPool | None = None
+"""The pool of worker processes rendering the scenes, None to render in the server process"""
+
+RenderResultType = tuple[int, str, bytes, dict[str, str]]
+"""The result of a render request: (http status, mimetype, body, http headers)"""
 
 
 # =============================================================================
@@ -53,11 +106,140 @@ def text_red(text: str) -> str:
 # =============================================================================
 @flask_app.route("/render_scene", methods=["POST"])
 def render_scene_json() -> Response:
-    payload: NetworkPayload = request.get_json()
+    if render_worker_pool is None:
+        # render in this process
+        status, mimetype, body, headers = process_render_request(request.mimetype, request.get_data())
+    else:
+        # render in the worker of this client - the client id is in a header, to avoid decoding the payload here
+        client_id = request.headers.get(NetworkRenderer.CLIENT_ID_HEADER)
+        if client_id is None:
+            client_id = decode_payload(request.mimetype, request.get_data())["client_id"]
+        try:
+            future = render_worker_pool.submit(client_id, process_render_request, request.mimetype, request.get_data())
+        except RenderWorkerPoolFullError:
+            # return 503 Service Unavailable
+            return Response("Render queue full, retry later.", status=http_constants.status.HttpStatus.SERVICE_UNAVAILABLE)
+        try:
+            status, mimetype, body, headers = future.result()
+        except BrokenProcessPool:
+            # the worker process died - it is restarted without the client state, return 503 Service Unavailable
+            print(f"Render worker of client_id={text_cyan(client_id)} {text_red('died')}, restarting it")
+            return Response("Render worker restarted, retry later.", status=http_constants.status.HttpStatus.SERVICE_UNAVAILABLE)
+
+    if status != http_constants.status.HttpStatus.OK or mimetype != "image/png":
+        return Response(body, status=status, mimetype=mimetype, headers=headers)
+
+    # Return the rendered image as a PNG file
+    return send_file(
+        io.BytesIO(body),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name="rendered_scene.png",
+    )
+
+
+# =============================================================================
+# Render request processing - run in the server process or in a worker process
+# =============================================================================
+
+
+def init_worker(max_array_bytes: int) -> None:
+    """
+    Initialize the state of a worker process. see RenderWorkerPool
+    """
+    global diffable_ndarray_store
+    diffable_ndarray_store = DiffableNdarrayLruStore(max_bytes=max_array_bytes, on_evict=evict_client_scene)
+    # each client keeps its own figure alive - see ClientSession
+    matplotlib.rcParams["figure.max_open_warning"] = 0
+
+
+def evict_client_scene(client_id: str) -> None:
+    """
+    Drop the absolute scene of a client when one of its DiffableNdarray is evicted - its next delta gets a 410 GONE,
+    and it resends the full scene.
+
+    Its session - the parsed objects and the matplotlib artists, which still reference the evicted arrays - is freed
+    at the end of the current request, see free_evicted_client_sessions(). It may be the session rendering it.
+    So the memory held for a client is bounded by the budget of diffable_ndarray_store.
+    """
+    absolute_scenes.pop(client_id, None)
+    absolute_scene_owned_arrays.pop(client_id, None)
+    evicted_client_ids.add(client_id)
+
+
+def free_evicted_client_sessions() -> None:
+    """
+    Free the state of the clients whose DiffableNdarray were evicted, see evict_client_scene()
+    """
+    for evicted_client_id in evicted_client_ids:
+        print(f"Freeing the state of evicted client_id={text_cyan(evicted_client_id)}")
+        client_session = client_sessions.pop(evicted_client_id, None)
+        if client_session is not None:
+            client_session.close()
+        diffable_ndarray_store.drop_namespace(evicted_client_id)
+    evicted_client_ids.clear()
+
+
+def get_client_session(client_id: str) -> ClientSession:
+    """
+    Return the session of this client, created if needed. The sessions idle for more than CLIENT_IDLE_TIMEOUT are freed.
+    """
+    now = time.monotonic()
+    for idle_client_id in [other_id for other_id, session in client_sessions.items() if now - session.last_used > CLIENT_IDLE_TIMEOUT]:
+        print(f"Freeing the state of idle client_id={text_cyan(idle_client_id)}")
+        client_sessions.pop(idle_client_id).close()
+        absolute_scenes.pop(idle_client_id, None)
+        absolute_scene_owned_arrays.pop(idle_client_id, None)
+        diffable_ndarray_store.drop_namespace(idle_client_id)
+
+    if client_id not in client_sessions:
+        client_sessions[client_id] = ClientSession(client_id)
+    client_session = client_sessions[client_id]
+    client_session.last_used = now
+    return client_session
+
+
+def decode_payload(mimetype: str, request_data: bytes) -> NetworkPayload:
+    if mimetype == NetworkRenderer.MULTIPART_CONTENT_TYPE:
+        # np.ndarray in the scene are read-only views on the request body, no copy
+        return NdarraySerialisation.from_multipart(request_data)
+    else:
+        return json.loads(request_data)
+
+
+def process_render_request(mimetype: str, request_data: bytes) -> RenderResultType:
+    """
+    Decode the payload, update the scene of the client, and render it.
+    """
+    try:
+        return render_request(mimetype, request_data)
+    finally:
+        # the arrays of a client may be evicted by any request - its session is freed once the frame is rendered
+        free_evicted_client_sessions()
+
+
+def render_request(mimetype: str, request_data: bytes) -> RenderResultType:
+    payload = decode_payload(mimetype, request_data)
 
     # Log the received payload for debugging
     print(f"Received payload: client_id={text_cyan(payload.get('client_id'))}, type={text_cyan(payload.get('type'))}")
 
+    ###############################################################################
+    #   Resolve the arrays sent by hash - see NetworkRenderer array_cache_allowed
+    #
+    if "arrays" in payload:
+        # copy the uploaded arrays, to avoid keeping the whole request body alive
+        uploaded_arrays = {array_hash: array.copy() for array_hash, array in payload["arrays"].items()}
+        # replace the hashes by the arrays - the uploaded ones first, so they can not be evicted before their use
+        payload["data"], missing_hashes = ndarray_hash_store.resolve_hashes(payload["data"], uploaded_arrays)
+        # store the uploaded arrays for the next requests
+        for array_hash, array in uploaded_arrays.items():
+            ndarray_hash_store.put(array_hash, array)
+        # If some arrays are missing, ask the client to upload them - return 409 Conflict
+        if len(missing_hashes) > 0:
+            print(f"Missing {text_red(str(len(missing_hashes)))} arrays, asking the client to upload them")
+            return (http_constants.status.HttpStatus.CONFLICT, "application/json", json.dumps({"missing_hashes": missing_hashes}).encode("utf-8"), {})
+
     ###############################################################################
     #   Parse the payload
     #
@@ -65,6 +247,7 @@ def render_scene_json() -> Response:
     if payload["type"] == "absolute":
         # Store the absolute scene for this client
         absolute_scenes[client_id] = payload["data"]
+        absolute_scene_owned_arrays[client_id] = {}
         scene_dict: SceneDict = payload["data"]
         # log the operation
         print(f"Rendering scene for client_id={client_id}. {text_green('Absolute')} Scene size: {text_cyan(str(len(str(scene_dict))))} bytes")
@@ -73,46 +256,68 @@ def render_scene_json() -> Response:
         # If no previous absolute scene exists, return an error
         if old_scene_dict is None:
             # return 410 Gone
-            return Response("json_diff resource not found. Resend as 'absolute'.", status=http_constants.status.HttpStatus.GONE)
+            return (http_constants.status.HttpStatus.GONE, "text/plain", b"json_diff resource not found. Resend as 'absolute'.", {})
         # Reconstruct the absolute scene by applying the diff
         scene_diff = payload["data"]
         scene_dict = jsonpatch.apply_patch(old_scene_dict, scene_diff)
         # Update the stored absolute scene
         absolute_scenes[client_id] = scene_dict
+        absolute_scene_owned_arrays[client_id] = {}
         # log the operation
         print(
             f"Rendering scene for client_id={client_id}. {text_green('Diff')} size: {text_cyan(str(len(str(scene_diff))))} bytes, Full scene size: {text_cyan(str(len(str(scene_dict))))} bytes"
         )
+    elif payload["type"] == "scene_delta":
+        old_scene_dict = absolute_scenes.get(client_id)
+        # If no previous absolute scene exists, return an error
+        if old_scene_dict is None:
+            # return 410 Gone
+            return (http_constants.status.HttpStatus.GONE, "text/plain", b"scene_delta resource not found. Resend as 'absolute'.", {})
+        # Reconstruct the absolute scene by applying the delta
+        scene_delta = typing.cast(SceneDeltaType, payload["data"])
+        scene_dict = SceneDelta.apply(old_scene_dict, scene_delta, absolute_scene_owned_arrays.setdefault(client_id, {}))
+        # Update the stored absolute scene
+        absolute_scenes[client_id] = scene_dict
+        # log the operation
+        print(f"Rendering scene for client_id={client_id}. {text_green('Delta')} operations: {text_cyan(str(len(scene_delta)))}")
     else:
         assert False, f"Unknown rendering type: {payload['type']}"
 
     ###############################################################################
     # Load the scene from JSON
     #
+    # Parse with the session of this client - unchanged objects are reused
+    client_session = get_client_session(client_id)
     try:
-        canvas_parsed, viewports_parsed, cameras_parsed = json_parser.parse(scene_dict)
+        canvas_parsed, viewports_parsed, cameras_parsed = client_session.json_parser.parse(scene_dict)
     except DiffableNdarraySerialisationError as e:
-        # return 410 Gone
-        return Response("DiffableNdarray not found.", status=http_constants.status.HttpStatus.GONE)
+        # the DiffableNdarray has never been received, or has been evicted - return 410 Gone
+        return (http_constants.status.HttpStatus.GONE, "text/plain", b"DiffableNdarray not found.", {})
+
+    store_stats = diffable_ndarray_store.get_stats()
+    print(
+        f"DiffableNdarray store: {text_cyan(str(store_stats.bytes_held))} bytes held, {text_cyan(str(store_stats.hits))} hits, {text_cyan(str(store_stats.evictions))} evictions"
+    )
 
     ###############################################################################
     # Render the loaded scene with matplotlib
     #
-    matplotlib_renderer = gsp_matplotlib.MatplotlibRenderer()
-    image_png_data = matplotlib_renderer.render(canvas_parsed, viewports_parsed, cameras_parsed, show_image=False)
-    matplotlib_renderer.close()  # free memory
-
-    print(f"Rendered image size: {text_cyan(str(len(image_png_data)))} bytes")
+    # the renderer of the session keeps its figure, axes and artists between requests
+    frame_format = payload.get("frame_format", "png")
+    if frame_format == "png":
+        image_png_data = client_session.matplotlib_renderer.render(canvas_parsed, viewports_parsed, cameras_parsed, show_image=False)
+        print(f"Rendered image size: {text_cyan(str(len(image_png_data)))} bytes")
+        return (http_constants.status.HttpStatus.OK, "image/png", image_png_data, {})
 
-    ###############################################################################
-    # Return the rendered image as a PNG file
-    #
-    return send_file(
-        io.BytesIO(image_png_data),
-        mimetype="image/png",
-        as_attachment=True,
-        download_name="rendered_scene.png",
-    )
+    # raw frames - the framebuffer without PNG encoding, optionally compressed with a fast zlib level
+    image_rgba = client_session.matplotlib_renderer.render_rgba(canvas_parsed, viewports_parsed, cameras_parsed)
+    if frame_format == "rgba_zlib":
+        frame_data = zlib.compress(image_rgba, level=NetworkRenderer.FRAME_ZLIB_LEVEL)
+    else:
+        frame_data = image_rgba.tobytes()
+    print(f"Rendered {text_green(frame_format)} frame size: {text_cyan(str(len(frame_data)))} bytes")
+    frame_shape = ",".join(str(dim) for dim in image_rgba.shape)
+    return (http_constants.status.HttpStatus.OK, "application/octet-stream", frame_data, {NetworkRenderer.FRAME_SHAPE_HEADER: frame_shape})
 
 
 # =============================================================================
@@ -125,18 +330,42 @@ class ServerSample:
     Sample class to demonstrate server functionality.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, worker_count: int = 0, queue_depth: int = 8, max_array_mb: int = 512):
+        """
+        Arguments:
+            worker_count (int): the number of render worker processes. 0 to render in the server process, one request at a time
+            queue_depth (int): the maximum number of pending requests per worker. Above it, the server replies 503
+            max_array_mb (int): the memory budget for the DiffableNdarray received, in MB - per worker process
+        """
+        self.worker_count = worker_count
+        self.queue_depth = queue_depth
+        self.max_array_mb = max_array_mb
 
     def run(self):
-        flask_app.run(threaded=False, debug=False)  # Enable debug mode if desired
+        global render_worker_pool
+        max_array_bytes = self.max_array_mb * 1024 * 1024
+        if self.worker_count == 0:
+            init_worker(max_array_bytes)
+            flask_app.run(threaded=False, debug=False)  # Enable debug mode if desired
+            return
+
+        # the server threads only route the requests, the renders run in the worker processes
+        render_worker_pool = RenderWorkerPool(self.worker_count, self.queue_depth, initializer=init_worker, initargs=(max_array_bytes,))
+        try:
+            flask_app.run(threaded=True, debug=False)
+        finally:
+            render_worker_pool.shutdown()
+            render_worker_pool = None
 
 
 #######################################################################################
 
 if __name__ == "__main__":
     argParser = argparse.ArgumentParser(description="Run the network server for rendering. see ./examples/network_client.py for usage.")
+    argParser.add_argument("--workers", type=int, default=0, help="Number of render worker processes. 0 to render in the server process")
+    argParser.add_argument("--queue-depth", type=int, default=8, help="Maximum number of pending requests per worker")
+    argParser.add_argument("--max-array-mb", type=int, default=512, help="Memory budget for the DiffableNdarray received from all the clients, in MB")
     args = argParser.parse_args()
 
-    server = ServerSample()
+    server = ServerSample(worker_count=args.workers, queue_depth=args.queue_depth, max_array_mb=args.max_array_mb)
     server.run()
@@ -104,3 +104,148 @@ def test_diffable_ndarray_copy() -> None:
     assert arr.is_modified() is False, "Original array should not be marked as modified after modifying the copy"
     assert np.array_equal(arr, np.array([[1, 0], [0, 2]])) is True, "Original array should remain unchanged"
     assert np.array_equal(arr_copy, np.array([[1, 3], [0, 2]])) is True, "Copied array should reflect its own modifications"
+
+
+def test_diffable_ndarray_multi_bbox_policy() -> None:
+    arr = DiffableNdarray(np.zeros((1000, 3), dtype=int), tracking_policy="multi_bbox", max_boxes=2)
+
+    # Modify three scattered regions - the two closest ones get merged
+    arr[0] = 1
+    arr[2] = 2
+    arr[999] = 3
+
+    # The single bounding box still covers everything
+    assert arr.get_diff_slices() == (slice(0, 1000), slice(0, 3))
+
+    patches = arr.get_diff_patches()
+    assert [slices for slices, _ in patches] == [(slice(0, 3), slice(0, 3)), (slice(999, 1000), slice(0, 3))]
+    assert np.array_equal(patches[1][1], [[3, 3, 3]])
+
+
+def test_diffable_ndarray_row_bitmap_policy() -> None:
+    arr = DiffableNdarray(np.zeros((1000, 3), dtype=int), tracking_policy="row_bitmap")
+
+    # Modify scattered rows
+    arr[0, 1] = 1
+    arr[1] = 2
+    arr[500:502] = 3
+    arr[999] = 4
+
+    patches = arr.get_diff_patches()
+    assert [slices for slices, _ in patches] == [
+        (slice(0, 2), slice(0, 3)),
+        (slice(500, 502), slice(0, 3)),
+        (slice(999, 1000), slice(0, 3)),
+    ]
+
+    # Clearing the diff also clears the bitmap
+    arr.clear_diff()
+    assert arr.is_modified() is False
+    arr[10] = 5
+    assert [slices for slices, _ in arr.get_diff_patches()] == [(slice(10, 11), slice(0, 3))]
+
+
+def test_diffable_ndarray_negative_and_numpy_integer_index() -> None:
+    arr = DiffableNdarray(np.zeros((5, 3), dtype=int))
+    arr[-1] = 1
+    assert arr.get_diff_slices() == (slice(4, 5), slice(0, 3))
+
+    arr.clear_diff()
+    arr[np.int64(2), -2] = 1
+    assert arr.get_diff_slices() == (slice(2, 3), slice(1, 2))
+
+
+def test_diffable_ndarray_fancy_and_boolean_index() -> None:
+    arr = DiffableNdarray(np.zeros((10, 3), dtype=int), tracking_policy="row_bitmap")
+
+    # integer array index - only the given rows are tracked
+    arr[np.array([1, 7])] = 1
+    assert arr.get_diff_slices() == (slice(1, 8), slice(0, 3))
+    assert [patch_slices for patch_slices, _ in arr.get_diff_patches()] == [(slice(1, 2), slice(0, 3)), (slice(7, 8), slice(0, 3))]
+
+    # boolean mask index
+    arr.clear_diff()
+    mask = np.zeros(10, dtype=bool)
+    mask[[3, 4]] = True
+    arr[mask] = 2
+    assert arr.get_diff_slices() == (slice(3, 5), slice(0, 3))
+    assert np.array_equal(arr[3:5], np.full((2, 3), 2))
+
+    # all-False mask is not a modification
+    arr.clear_diff()
+    arr[np.zeros(10, dtype=bool)] = 3
+    assert arr.is_modified() is False
+
+
+def test_diffable_ndarray_ellipsis_and_newaxis_index() -> None:
+    arr = DiffableNdarray(np.zeros((4, 4, 2), dtype=int))
+    arr[..., 1] = 1
+    assert arr.get_diff_slices() == (slice(0, 4), slice(0, 4), slice(1, 2))
+
+    arr.clear_diff()
+    arr[2, np.newaxis, ...] = 1
+    assert arr.get_diff_slices() == (slice(2, 3), slice(0, 4), slice(0, 2))
+
+
+def test_diffable_ndarray_inplace_ufunc() -> None:
+    arr = DiffableNdarray(np.zeros((4, 3), dtype=np.float32))
+    arr += 1
+    assert arr.is_modified() is True
+    assert arr.get_diff_slices() == (slice(0, 4), slice(0, 3))
+
+    arr.clear_diff()
+    np.add(arr, 1, out=arr)
+    assert arr.is_modified() is True
+    assert np.array_equal(arr, np.full((4, 3), 2, dtype=np.float32))
+
+    # ufunc.at() only tracks the given indices
+    arr.clear_diff()
+    np.add.at(arr, [2], 1)
+    assert arr.get_diff_slices() == (slice(2, 3), slice(0, 3))
+
+    # a ufunc without out= does not modify the array
+    arr.clear_diff()
+    result = arr * 2
+    assert isinstance(result, DiffableNdarray)
+    assert arr.is_modified() is False
+
+
+def test_diffable_ndarray_view_write_propagation() -> None:
+    arr = DiffableNdarray(np.zeros((30, 3), dtype=np.float32))
+
+    # write through a slice view
+    view = arr[10:20]
+    view[:] = 1
+    assert arr.get_diff_slices() == (slice(10, 20), slice(0, 3))
+
+    # in-place ufunc on a view of a view
+    arr.clear_diff()
+    sub_view = view[2:4]
+    sub_view *= 2
+    assert arr.get_diff_slices() == (slice(12, 14), slice(0, 3))
+
+    # write through a transposed and strided view
+    arr.clear_diff()
+    arr.T[1, 4:10:3] = 5
+    assert arr.get_diff_slices() == (slice(4, 8), slice(1, 2))
+    assert arr[4, 1] == 5 and arr[7, 1] == 5
+
+    # write through a reshaped view - the bounding box of the modified byte range
+    arr.clear_diff()
+    arr.reshape(90)[10:20] = 3
+    assert arr.get_diff_slices() == (slice(3, 7), slice(0, 3))
+
+
+def test_diffable_ndarray_inplace_functions() -> None:
+    arr = DiffableNdarray(np.zeros((4, 3), dtype=np.float32))
+    np.copyto(arr, np.ones((4, 3)))
+    assert arr.get_diff_slices() == (slice(0, 4), slice(0, 3))
+
+    arr.clear_diff()
+    np.copyto(arr[1:3], 2)
+    assert arr.get_diff_slices() == (slice(1, 3), slice(0, 3))
+
+    arr.clear_diff()
+    arr[3].fill(7)
+    assert arr.get_diff_slices() == (slice(3, 4), slice(0, 3))
+    assert np.array_equal(arr[3], [7, 7, 7])
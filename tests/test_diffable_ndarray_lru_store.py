@@ -0,0 +1,65 @@
+# stdlib imports
+import typing
+
+# pip imports
+import numpy as np
+import pytest
+
+# local imports
+from gsp.types import DiffableNdarray, DiffableNdarrayDb, DiffableNdarraySerialisation, DiffableNdarraySerialisationError
+from gsp.types import DiffableNdarrayLruStore
+
+
+def test_diffable_ndarray_lru_store_eviction_and_stats() -> None:
+    store = DiffableNdarrayLruStore(max_bytes=250)
+    namespace_a = store.get_namespace("client_a")
+    namespace_b = store.get_namespace("client_b")
+
+    namespace_a["uuid1"] = DiffableNdarray(np.zeros(100, dtype=np.uint8))
+    namespace_b["uuid2"] = DiffableNdarray(np.zeros(100, dtype=np.uint8))
+    # use "uuid1", so "uuid2" is the least recently used
+    assert "uuid1" in namespace_a
+    namespace_a["uuid1"]
+    namespace_a["uuid3"] = DiffableNdarray(np.zeros(100, dtype=np.uint8))
+
+    assert "uuid2" not in namespace_b, "The least recently used array should be evicted, whatever its namespace"
+    assert sorted(namespace_a.keys()) == ["uuid1", "uuid3"]
+    assert store.get_bytes_held() == 200
+
+    stats_a = store.get_stats("client_a")
+    assert (stats_a.bytes_held, stats_a.array_count, stats_a.hits) == (200, 2, 1)
+    stats_b = store.get_stats("client_b")
+    assert (stats_b.bytes_held, stats_b.misses, stats_b.evictions) == (0, 1, 1)
+
+    store.drop_namespace("client_a")
+    assert store.get_bytes_held() == 0
+    assert store.get_namespaces() == ["client_b"]
+
+
+def test_diffable_ndarray_lru_store_evicted_patch_raises() -> None:
+    store = DiffableNdarrayLruStore(max_bytes=1000)
+    diffable_ndarray_db_to_json = DiffableNdarrayDb()
+    diffable_ndarray_db_from_json = DiffableNdarrayDb(from_json_db=store.get_namespace("client"))
+
+    arr = DiffableNdarray(np.zeros((100, 3), dtype=np.float32))
+    serialized = DiffableNdarraySerialisation.to_json(arr, diffable_ndarray_db_to_json)
+    received = typing.cast(DiffableNdarray, DiffableNdarraySerialisation.from_json(serialized, diffable_ndarray_db_from_json))
+    assert np.array_equal(received, arr)
+
+    # another array evicts the first one
+    other_arr = DiffableNdarray(np.zeros((100, 3), dtype=np.float32))
+    DiffableNdarraySerialisation.from_json(DiffableNdarraySerialisation.to_json(other_arr, diffable_ndarray_db_to_json), diffable_ndarray_db_from_json)
+    assert store.get_stats("client").evictions == 1
+
+    # a patch on the evicted array can not be applied - the sender has to resend the full data
+    arr[0] = 1.0
+    with pytest.raises(DiffableNdarraySerialisationError):
+        DiffableNdarraySerialisation.from_json(DiffableNdarraySerialisation.to_json(arr, diffable_ndarray_db_to_json), diffable_ndarray_db_from_json)
+
+
+def test_diffable_ndarray_lru_store_on_evict() -> None:
+    evicted_namespaces: list[str] = []
+    store = DiffableNdarrayLruStore(max_bytes=150, on_evict=evicted_namespaces.append)
+    store.get_namespace("client_a")["uuid1"] = DiffableNdarray(np.zeros(100, dtype=np.uint8))
+    store.get_namespace("client_b")["uuid2"] = DiffableNdarray(np.zeros(100, dtype=np.uint8))
+    assert evicted_namespaces == ["client_a"], "on_evict should be called with the namespace of the evicted array"
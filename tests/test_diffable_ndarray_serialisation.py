@@ -1,4 +1,5 @@
 # stdlib imports
+import json
 import typing
 
 # pip imports
@@ -93,3 +94,47 @@ def test_diffable_ndarray_to_from_json_full_modification() -> None:
     assert np.array_equal(deserialized_arr_2, arr), "Deserialized array should match the modified original"
     assert deserialized_arr_2.get_uuid() != arr.get_uuid(), "UUIDs should not match after deserialization"
     assert deserialized_arr_2.get_uuid() == deserialized1.get_uuid(), "UUIDs should match the first deserialized array"
+
+
+def test_diffable_ndarray_to_from_json_multi_patches() -> None:
+    diffable_ndarray_db_to_json = DiffableNdarrayDb()
+    diffable_ndarray_db_from_json = DiffableNdarrayDb()
+    arr = DiffableNdarray(np.zeros((1000, 3)), tracking_policy="row_bitmap")
+
+    # Send the full array first
+    serialized1 = DiffableNdarraySerialisation.to_json(arr, diffable_ndarray_db_to_json)
+    DiffableNdarraySerialisation.from_json(serialized1, diffable_ndarray_db_from_json)
+
+    # Modify the first and the last rows
+    arr[0] = 1.0
+    arr[999] = 2.0
+
+    serialized2 = DiffableNdarraySerialisation.to_json(arr, diffable_ndarray_db_to_json)
+    assert DiffableNdarraySerialisation.get_patch_type(serialized2) == "multi_diff_data"
+    assert len(serialized2["patches"]) == 2, "Only the two modified rows should be sent"
+
+    deserialized2 = DiffableNdarraySerialisation.from_json(serialized2, diffable_ndarray_db_from_json)
+    assert np.array_equal(deserialized2, arr), "Deserialized array should match the modified original"
+
+
+def test_diffable_ndarray_to_from_json_preserves_dtype() -> None:
+    for ndarray_encoding in ("list", "base64"):
+        diffable_ndarray_db = DiffableNdarrayDb()
+        positions = DiffableNdarray(np.random.uniform(-1, 1, (10, 3)).astype(np.float32))
+        colors = DiffableNdarray(np.random.randint(0, 255, (10, 4)).astype(np.uint8))
+
+        # full data - through an actual JSON roundtrip
+        received = []
+        for arr in (positions, colors):
+            serialized = json.loads(json.dumps(DiffableNdarraySerialisation.to_json(arr, diffable_ndarray_db, ndarray_encoding)))
+            received.append(typing.cast(DiffableNdarray, DiffableNdarraySerialisation.from_json(serialized, diffable_ndarray_db)))
+        assert received[0].dtype == np.float32, f"float32 dtype should be preserved with {ndarray_encoding} encoding"
+        assert received[1].dtype == np.uint8, f"uint8 dtype should be preserved with {ndarray_encoding} encoding"
+
+        # diff data - applied in place, without changing the dtype
+        positions[2:4] = 0.5
+        serialized = json.loads(json.dumps(DiffableNdarraySerialisation.to_json(positions, diffable_ndarray_db, ndarray_encoding)))
+        received_positions = DiffableNdarraySerialisation.from_json(serialized, diffable_ndarray_db)
+        assert received_positions is received[0], "The received array should be updated in place"
+        assert received_positions.dtype == np.float32
+        assert np.array_equal(received_positions, positions)
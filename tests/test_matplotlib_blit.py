@@ -0,0 +1,82 @@
+# pip imports
+import numpy as np
+
+# local imports
+import gsp
+from gsp_matplotlib import MatplotlibRenderer
+
+
+def build_scene() -> tuple[gsp.core.Canvas, list[gsp.core.Viewport], list[gsp.core.Camera]]:
+    np.random.seed(0)
+    canvas = gsp.core.Canvas(128, 64, 100)
+    viewports: list[gsp.core.Viewport] = []
+    for viewport_index in range(2):
+        viewport = gsp.core.Viewport(viewport_index * 64, 0, 64, 64, gsp.Constants.White)
+        canvas.add(viewport)
+        positions = np.random.uniform(-0.5, 0.5, (50, 3)).astype(np.float32)
+        viewport.add(gsp.visuals.Pixels(positions, np.full(50, 5.0, dtype=np.float32), np.array([gsp.Constants.Green], dtype=np.float32)))
+        viewports.append(viewport)
+    camera = gsp.core.Camera("perspective")
+    return canvas, viewports, [camera, camera]
+
+
+def test_matplotlib_blit_matches_full_redraw() -> None:
+    canvas_full, viewports_full, cameras_full = build_scene()
+    canvas_blit, viewports_blit, cameras_blit = build_scene()
+    renderer_full = MatplotlibRenderer()
+    renderer_blit = MatplotlibRenderer(blit=True)
+
+    for step in range(4):
+        # modify the visual of a single viewport - only this viewport is redrawn in blit mode
+        for viewports in (viewports_full, viewports_blit):
+            viewports[step % 2].visuals[0].positions[:5] += 0.1
+        image_full = renderer_full.render_rgba(canvas_full, viewports_full, cameras_full).copy()
+        image_blit = renderer_blit.render_rgba(canvas_blit, viewports_blit, cameras_blit).copy()
+        assert np.array_equal(image_full, image_blit), f"Blit frame differs from the full redraw at step {step}"
+
+    # an unchanged scene gives the same frame
+    image_unchanged = renderer_blit.render_rgba(canvas_blit, viewports_blit, cameras_blit)
+    assert np.array_equal(image_unchanged, image_full)
+
+
+def test_matplotlib_blit_mesh_leaves_no_trail() -> None:
+    def build_mesh_scene(offset_x: float) -> tuple[gsp.core.Canvas, list[gsp.core.Viewport], list[gsp.core.Camera], gsp.visuals.Mesh]:
+        canvas = gsp.core.Canvas(128, 64, 100)
+        viewports = [gsp.core.Viewport(viewport_index * 64, 0, 64, 64, gsp.Constants.White) for viewport_index in range(2)]
+        for viewport in viewports:
+            canvas.add(viewport)
+        # a triangle crossing the left side of the second viewport
+        mesh = gsp.visuals.Mesh(np.array([[-0.5, -0.5, 0.0], [-1.8, 0.0, 0.0], [-0.5, 0.5, 0.0]]) + [offset_x, 0.0, 0.0], np.array([[0, 1, 2]]), facecolors="red", culling_mode="all")
+        viewports[1].add(mesh)
+        camera = gsp.core.Camera("perspective")
+        return canvas, viewports, [camera, camera], mesh
+
+    # move the mesh inside the second viewport - the part drawn over the first viewport must be erased
+    canvas, viewports, cameras, mesh = build_mesh_scene(0.0)
+    renderer_blit = MatplotlibRenderer(blit=True)
+    renderer_blit.render_rgba(canvas, viewports, cameras)
+    mesh.vertices_coords = mesh.vertices_coords + [1.2, 0.0, 0.0]
+    image_moved = renderer_blit.render_rgba(canvas, viewports, cameras).copy()
+
+    canvas_ref, viewports_ref, cameras_ref, _ = build_mesh_scene(1.2)
+    image_ref = MatplotlibRenderer(blit=True).render_rgba(canvas_ref, viewports_ref, cameras_ref)
+    assert np.array_equal(image_moved, image_ref), "The blit frame should not keep the previous mesh outside of its viewport"
+
+
+def test_matplotlib_blit_overlapping_viewports() -> None:
+    def build_overlapping_scene() -> tuple[gsp.core.Canvas, list[gsp.core.Viewport], list[gsp.core.Camera]]:
+        canvas = gsp.core.Canvas(200, 200, 100)
+        # the second viewport is opaque, and covers the top right of the first one
+        viewports = [gsp.core.Viewport(0, 0, 150, 150, gsp.Constants.White), gsp.core.Viewport(50, 50, 150, 150, gsp.Constants.White)]
+        for viewport in viewports:
+            canvas.add(viewport)
+        grid = np.linspace(-0.9, 0.9, 10)
+        positions = np.array([[x, y, 0.0] for x in grid for y in grid], dtype=np.float32)
+        viewports[0].add(gsp.visuals.Pixels(positions, np.full(len(positions), 20.0, dtype=np.float32), np.array([gsp.Constants.Red], dtype=np.float32)))
+        camera = gsp.core.Camera("perspective")
+        return canvas, viewports, [camera, camera]
+
+    # the points of the first viewport must stay hidden under the second viewport
+    image_full = MatplotlibRenderer().render_rgba(*build_overlapping_scene()).copy()
+    image_blit = MatplotlibRenderer(blit=True).render_rgba(*build_overlapping_scene())
+    assert np.array_equal(image_full, image_blit), "The blit frame should draw the overlapping viewports in order"
@@ -0,0 +1,90 @@
+# pip imports
+import numpy as np
+import mpl3d.glm
+import pytest
+
+# local imports
+import gsp
+from gsp_matplotlib import MatplotlibRenderer
+from gsp_matplotlib.renderer.renderer_mesh import MatplotlibRendererMesh, MatplotlibRendererMeshCache
+
+
+def test_matplotlib_mesh_cached_pipeline_matches_mpl3d() -> None:
+    random_generator = np.random.default_rng(0)
+    vertices_coords = random_generator.uniform(-0.5, 0.5, (200, 3))
+    faces_indices = random_generator.integers(0, 200, (400, 3))
+
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64)
+    canvas.add(viewport)
+    mesh = gsp.visuals.Mesh(vertices_coords, faces_indices)
+    viewport.add(mesh)
+    camera = gsp.core.Camera("perspective")
+    renderer = MatplotlibRenderer()
+
+    # move the camera between renders, so the sort is warm-started from the previous order
+    for position_x in (0.0, 0.05, 0.1):
+        camera.set_position(np.array([position_x, 0.0, 2.0]))
+        renderer.render_rgba(canvas, [viewport], [camera])
+
+        # reference pipeline - transform, cull the back faces, and sort the faces by depth
+        faces_coords = mpl3d.glm.transform(vertices_coords, camera.transform)[faces_indices]
+        faces_coords = faces_coords[mpl3d.glm.frontback(faces_coords)[0]]
+        faces_coords = faces_coords[np.argsort(-faces_coords[:, :, 2].mean(axis=1), kind="stable")]
+
+        poly_collection = renderer._polyCollections[mesh.uuid + viewport.uuid]
+        rendered_coords = np.array([path.vertices[:3] for path in poly_collection.get_paths()])
+        assert np.allclose(rendered_coords, faces_coords[:, :, :2])
+
+
+def test_matplotlib_mesh_frustum_culling() -> None:
+    # 2 faces in the viewport, 1 face beyond its right side
+    vertices_coords = np.array(
+        [
+            [0.0, 0.0, 0.0], [0.1, 0.0, 0.0], [0.0, 0.1, 0.0],
+            [-0.1, 0.0, 0.0], [-0.1, -0.1, 0.0], [0.0, -0.1, 0.0],
+            [50.0, 0.0, 0.0], [51.0, 0.0, 0.0], [50.0, 1.0, 0.0],
+        ]
+    )  # fmt: skip
+    faces_indices = np.arange(9).reshape(3, 3)
+
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64)
+    canvas.add(viewport)
+    mesh = gsp.visuals.Mesh(vertices_coords, faces_indices, culling_mode="all")
+    viewport.add(mesh)
+    camera = gsp.core.Camera("perspective")
+    renderer = MatplotlibRenderer()
+    renderer.render_rgba(canvas, [viewport], [camera])
+
+    poly_collection = renderer._polyCollections[mesh.uuid + viewport.uuid]
+    assert len(poly_collection.get_paths()) == 2, "Only the faces in the viewport should reach the PolyCollection"
+
+
+def test_matplotlib_mesh_visible_mask_behind_camera() -> None:
+    faces_coords = np.zeros((3, 3, 3))
+    faces_w = np.array([[1.0, 1.0, 1.0], [-1.0, -1.0, -1.0], [-1.0, 1.0, 1.0]])
+    visible_mask = MatplotlibRendererMesh.get_visible_mask(faces_coords, faces_w)
+    assert visible_mask is not None
+    assert visible_mask.tolist() == [True, False, True], "Only the faces entirely behind the camera should be culled"
+
+
+def test_matplotlib_mesh_without_fast_paths(monkeypatch: pytest.MonkeyPatch) -> None:
+    random_generator = np.random.default_rng(0)
+    vertices_coords = random_generator.uniform(-0.5, 0.5, (200, 3))
+    faces_indices = random_generator.integers(0, 200, (400, 3))
+
+    def render_paths_coords() -> list[np.ndarray]:
+        canvas = gsp.core.Canvas(64, 64, 100)
+        viewport = gsp.core.Viewport(0, 0, 64, 64)
+        canvas.add(viewport)
+        mesh = gsp.visuals.Mesh(vertices_coords, faces_indices)
+        viewport.add(mesh)
+        renderer = MatplotlibRenderer()
+        renderer.render_rgba(canvas, [viewport], [gsp.core.Camera("perspective")])
+        return [path.vertices[:3].copy() for path in renderer._polyCollections[mesh.uuid + viewport.uuid].get_paths()]
+
+    fast_paths_coords = render_paths_coords()
+    # a matplotlib without the private Path API - the polygons are set with PolyCollection.set_verts()
+    monkeypatch.setattr(MatplotlibRendererMeshCache, "IS_FAST_PATHS_SUPPORTED", False)
+    assert np.allclose(render_paths_coords(), fast_paths_coords)
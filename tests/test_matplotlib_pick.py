@@ -0,0 +1,77 @@
+# pip imports
+import numpy as np
+import mpl3d.glm
+
+# local imports
+import gsp
+from gsp_matplotlib import MatplotlibRenderer
+
+
+def test_matplotlib_pick_pixels() -> None:
+    random_generator = np.random.default_rng(0)
+    canvas = gsp.core.Canvas(128, 64, 100)
+    viewport_left = gsp.core.Viewport(0, 0, 64, 64)
+    viewport_right = gsp.core.Viewport(64, 0, 64, 64)
+    canvas.add(viewport_left)
+    canvas.add(viewport_right)
+    positions = random_generator.uniform(-0.5, 0.5, (1_000, 3)).astype(np.float32)
+    pixels = gsp.visuals.Pixels(positions, np.full(1_000, 4.0, dtype=np.float32), np.array([gsp.Constants.Green], dtype=np.float32))
+    viewport_right.add(pixels)
+    camera = gsp.core.Camera("perspective")
+    renderer = MatplotlibRenderer()
+    renderer.render_rgba(canvas, [viewport_left, viewport_right], [camera, camera])
+
+    # pick exactly on the screen position of a point of the right viewport
+    point_index = 123
+    transformed_position = mpl3d.glm.transform(positions[point_index : point_index + 1], camera.transform)[0]
+    x = 64 + (transformed_position[0] + 1.0) / 2.0 * 64
+    y = (transformed_position[1] + 1.0) / 2.0 * 64
+    pick_result = renderer.pick(canvas, x, y, tolerance=0.0)
+    assert pick_result is not None
+    picked_viewport, picked_visual_uuid, picked_index = pick_result
+    assert picked_viewport is viewport_right
+    assert picked_visual_uuid == pixels.uuid
+    assert np.allclose(mpl3d.glm.transform(positions[picked_index : picked_index + 1], camera.transform)[0, :2], transformed_position[:2], atol=0.05)
+
+    # the left viewport has no visual
+    assert renderer.pick(canvas, 32, 32) is None
+
+
+def test_matplotlib_pick_mesh() -> None:
+    # 2 faces side by side, in front of the camera
+    vertices_coords = np.array([[-0.5, -0.5, 0.0], [0.0, -0.5, 0.0], [-0.5, 0.5, 0.0], [0.5, -0.5, 0.0], [0.5, 0.5, 0.0], [0.1, 0.5, 0.0]])
+    faces_indices = np.array([[0, 1, 2], [3, 4, 5]])
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64)
+    canvas.add(viewport)
+    mesh = gsp.visuals.Mesh(vertices_coords, faces_indices, culling_mode="all")
+    viewport.add(mesh)
+    camera = gsp.core.Camera("perspective")
+    renderer = MatplotlibRenderer()
+    renderer.render_rgba(canvas, [viewport], [camera])
+
+    for face_index in range(2):
+        centroid = mpl3d.glm.transform(vertices_coords[faces_indices[face_index]], camera.transform)[:, :2].mean(axis=0)
+        pick_result = renderer.pick(canvas, (centroid[0] + 1.0) * 32, (centroid[1] + 1.0) * 32)
+        assert pick_result is not None and pick_result[1:] == (mesh.uuid, face_index)
+
+    # a corner of the viewport is outside of both faces
+    assert renderer.pick(canvas, 1, 63) is None
+
+
+def test_matplotlib_pick_pixels_shared_size() -> None:
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64)
+    canvas.add(viewport)
+    positions = np.random.default_rng(0).uniform(-0.5, 0.5, (100, 3)).astype(np.float32)
+    # a single size shared by all the points
+    pixels = gsp.visuals.Pixels(positions, np.array([50.0]), np.array([gsp.Constants.Green], dtype=np.float32))
+    viewport.add(pixels)
+    camera = gsp.core.Camera("perspective")
+    renderer = MatplotlibRenderer()
+    renderer.render_rgba(canvas, [viewport], [camera])
+
+    transformed_position = mpl3d.glm.transform(positions[2:3], camera.transform)[0]
+    pick_result = renderer.pick(canvas, (transformed_position[0] + 1.0) / 2.0 * 64, (transformed_position[1] + 1.0) / 2.0 * 64)
+    assert pick_result is not None
+    assert pick_result[1] == pixels.uuid
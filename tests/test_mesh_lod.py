@@ -0,0 +1,58 @@
+# pip imports
+import numpy as np
+
+# local imports
+import gsp
+from gsp.visuals import MeshLodPyramid
+from gsp_matplotlib import MatplotlibRenderer
+
+
+def build_sphere(resolution: int) -> tuple[np.ndarray, np.ndarray]:
+    theta, phi = np.meshgrid(np.linspace(0, np.pi, resolution), np.linspace(0, 2 * np.pi, 2 * resolution), indexing="ij")
+    vertices_coords = np.stack([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)], axis=-1).reshape(-1, 3) * 0.5
+    quad_starts = (np.arange(resolution - 1)[:, np.newaxis] * (2 * resolution) + np.arange(2 * resolution - 1)[np.newaxis, :]).ravel()
+    next_row = quad_starts + 2 * resolution
+    faces_indices = np.concatenate([np.stack([quad_starts, next_row, quad_starts + 1], axis=1), np.stack([quad_starts + 1, next_row, next_row + 1], axis=1)])
+    return vertices_coords, faces_indices
+
+
+def test_mesh_lod_pyramid_levels() -> None:
+    vertices_coords, faces_indices = build_sphere(60)
+    lod_pyramid = MeshLodPyramid(vertices_coords, faces_indices)
+
+    face_counts = [lod_level.get_face_count() for lod_level in lod_pyramid.levels]
+    assert face_counts[0] == len(faces_indices), "The first level should be the original mesh"
+    assert len(face_counts) > 2 and all(count1 > count2 for count1, count2 in zip(face_counts, face_counts[1:]))
+    for lod_level in lod_pyramid.levels[1:]:
+        assert lod_level.face_indices.max() < len(lod_level.vertices_coords)
+        assert len(lod_level.source_face_indices) == lod_level.get_face_count()
+
+    assert lod_pyramid.select_level(face_counts[2]) is lod_pyramid.levels[2]
+    assert lod_pyramid.select_level(0) is lod_pyramid.levels[-1], "The coarsest level should be used if none fits"
+
+
+def test_mesh_lod_pyramid_is_cached() -> None:
+    vertices_coords, faces_indices = build_sphere(30)
+    mesh = gsp.visuals.Mesh(vertices_coords, faces_indices)
+    lod_pyramid = mesh.get_lod_pyramid()
+    assert mesh.get_lod_pyramid() is lod_pyramid, "The pyramid should be built once"
+    mesh.vertices_coords[0] += 0.1
+    assert mesh.get_lod_pyramid() is not lod_pyramid, "The pyramid should be built again when the geometry changes"
+
+
+def test_matplotlib_renderer_mesh_face_budget() -> None:
+    vertices_coords, faces_indices = build_sphere(60)
+    canvas = gsp.core.Canvas(256, 256, 100)
+    viewport = gsp.core.Viewport(0, 0, 256, 256)
+    canvas.add(viewport)
+    mesh = gsp.visuals.Mesh(vertices_coords, faces_indices, culling_mode="all")
+    viewport.add(mesh)
+    camera = gsp.core.Camera("perspective")
+
+    renderer_full = MatplotlibRenderer(mesh_face_budget=None)
+    renderer_full.render_rgba(canvas, [viewport], [camera])
+    assert len(renderer_full._polyCollections[mesh.uuid + viewport.uuid].get_paths()) == len(faces_indices)
+
+    renderer_lod = MatplotlibRenderer(mesh_face_budget=1000)
+    renderer_lod.render_rgba(canvas, [viewport], [camera])
+    assert len(renderer_lod._polyCollections[mesh.uuid + viewport.uuid].get_paths()) <= 1000
@@ -0,0 +1,64 @@
+# pip imports
+import numpy as np
+
+# local imports
+from gsp.types.ndarray_hash_store import NdarrayHashStore
+
+
+def test_ndarray_hash_store_replace_and_resolve() -> None:
+    positions = np.arange(300, dtype=np.float32).reshape(100, 3)
+    colors = np.array([[0, 1, 0, 1]], dtype=np.float32)
+    scene = {"visuals": [{"positions": positions, "colors": colors, "type": "Pixels"}]}
+
+    # client side - only the big array is replaced by its hash
+    skeleton, hashed_arrays = NdarrayHashStore.replace_with_hashes(scene, min_nbytes=1024)
+    assert len(hashed_arrays) == 1, "Only arrays bigger than min_nbytes should be hashed"
+    assert "__ndarray_hash__" in skeleton["visuals"][0]["positions"]
+    assert skeleton["visuals"][0]["colors"] is colors, "Small arrays should be left inline"
+
+    # server side - nothing in the store yet
+    store = NdarrayHashStore()
+    _, missing_hashes = store.resolve_hashes(skeleton)
+    assert missing_hashes == list(hashed_arrays.keys())
+
+    # server side - once uploaded, the scene is resolved
+    for array_hash, array in hashed_arrays.items():
+        store.put(array_hash, array)
+    resolved, missing_hashes = store.resolve_hashes(skeleton)
+    assert missing_hashes == []
+    assert np.array_equal(resolved["visuals"][0]["positions"], positions)
+
+
+def test_ndarray_hash_store_hash_depends_on_content() -> None:
+    array = np.zeros((10, 3), dtype=np.float32)
+    hash_before = NdarrayHashStore.hash_ndarray(array)
+    assert hash_before == NdarrayHashStore.hash_ndarray(array.copy()), "Same content should give the same hash"
+    assert hash_before != NdarrayHashStore.hash_ndarray(array.astype(np.float64)), "dtype should change the hash"
+    array[3, 1] = 1.0
+    assert hash_before != NdarrayHashStore.hash_ndarray(array), "Modified content should change the hash"
+
+
+def test_ndarray_hash_store_lru_eviction() -> None:
+    store = NdarrayHashStore(max_bytes=250)
+    store.put("a", np.zeros(100, dtype=np.uint8))
+    store.put("b", np.zeros(100, dtype=np.uint8))
+    # use "a", so "b" is the least recently used
+    assert store.get("a") is not None
+    store.put("c", np.zeros(100, dtype=np.uint8))
+
+    assert "a" in store
+    assert "b" not in store, "The least recently used array should be evicted"
+    assert "c" in store
+    assert store.get_bytes_held() == 200
+
+
+def test_ndarray_hash_store_resolve_uploaded_over_budget() -> None:
+    # a frame whose arrays exceed the budget of the store - they are resolved from the upload, not from the store
+    arrays = [np.full(100, index, dtype=np.uint8) for index in range(3)]
+    skeleton, hashed_arrays = NdarrayHashStore.replace_with_hashes({"arrays": arrays})
+    store = NdarrayHashStore(max_bytes=150)
+
+    resolved, missing_hashes = store.resolve_hashes(skeleton, hashed_arrays)
+    assert missing_hashes == []
+    for resolved_array, array in zip(resolved["arrays"], arrays):
+        assert np.array_equal(resolved_array, array)
@@ -0,0 +1,79 @@
+# pip imports
+import numpy as np
+
+# local imports
+import gsp
+from gsp.types import NdarraySerialisation
+
+
+def test_ndarray_serialisation_msgpack_preserves_dtype_and_shape() -> None:
+    arrays = {
+        "positions": np.random.uniform(-1, 1, (10, 3)).astype(np.float32),
+        "colors": np.random.randint(0, 255, (10, 4)).astype(np.uint8),
+        "faces": np.arange(12, dtype=np.int32).reshape(4, 3),
+    }
+    packed = NdarraySerialisation.to_msgpack({name: NdarraySerialisation.to_json(array, "binary") for name, array in arrays.items()})
+    unpacked = NdarraySerialisation.from_msgpack(packed)
+
+    for name, array in arrays.items():
+        assert isinstance(unpacked[name], np.ndarray), f"{name} should be decoded as a np.ndarray"
+        assert unpacked[name].dtype == array.dtype, f"{name} dtype should be preserved"
+        assert unpacked[name].shape == array.shape, f"{name} shape should be preserved"
+        assert np.array_equal(unpacked[name], array), f"{name} data should be preserved"
+
+
+def test_ndarray_serialisation_msgpack_big_endian_and_non_contiguous() -> None:
+    array_be = np.arange(6, dtype=">f8").reshape(2, 3)
+    array_strided = np.arange(20, dtype=np.int16).reshape(4, 5)[:, ::2]
+
+    unpacked = NdarraySerialisation.from_msgpack(NdarraySerialisation.to_msgpack([array_be, array_strided]))
+
+    assert unpacked[0].dtype == np.dtype("<f8"), "Arrays should be sent as little-endian"
+    assert np.array_equal(unpacked[0], array_be)
+    assert np.array_equal(unpacked[1], array_strided)
+
+
+def test_ndarray_serialisation_scene_roundtrip() -> None:
+    canvas = gsp.core.Canvas(256, 256, 100)
+    viewport = gsp.core.Viewport(0, 0, 256, 256, gsp.Constants.White)
+    canvas.add(viewport)
+    camera = gsp.core.Camera("perspective")
+
+    positions = np.random.uniform(-0.5, 0.5, (100, 3)).astype(np.float32)
+    sizes = np.random.uniform(5, 10, 100).astype(np.float32)
+    colors = np.array([gsp.Constants.Green], dtype=np.float32)
+    pixels = gsp.visuals.Pixels(positions, sizes, colors)
+    viewport.add(pixels)
+
+    # render the scene with binary arrays and pack it with msgpack
+    json_renderer = gsp.renderer.JsonRenderer()
+    scene_dict = json_renderer.render(canvas, [viewport], [camera], ndarray_encoding="binary")
+    scene_msgpack = NdarraySerialisation.to_msgpack(scene_dict)
+
+    # parse it back
+    json_parser = gsp.renderer.JsonParser()
+    canvas_parsed, viewports_parsed, cameras_parsed = json_parser.parse(scene_msgpack)
+
+    pixels_parsed = viewports_parsed[0].visuals[0]
+    assert isinstance(pixels_parsed, gsp.visuals.Pixels)
+    assert pixels_parsed.uuid == pixels.uuid, "Visual uuid should be preserved"
+    assert isinstance(pixels_parsed.positions, np.ndarray)
+    assert pixels_parsed.positions.dtype == np.float32, "Positions dtype should be preserved"
+    assert np.array_equal(pixels_parsed.positions, positions)
+    assert np.array_equal(pixels_parsed.sizes, sizes)
+
+
+def test_ndarray_serialisation_multipart_zero_copy() -> None:
+    vertices = np.random.uniform(-1, 1, (100, 3)).astype(np.float32)
+    faces = np.random.randint(0, 100, (50, 3)).astype(np.int32)
+    payload = {"client_id": "abc", "data": {"vertices": vertices, "faces": faces, "name": "mesh"}}
+
+    multipart_data = NdarraySerialisation.to_multipart(payload)
+    unpacked = NdarraySerialisation.from_multipart(multipart_data)
+
+    assert unpacked["client_id"] == "abc"
+    assert unpacked["data"]["name"] == "mesh"
+    assert np.array_equal(unpacked["data"]["vertices"], vertices)
+    assert unpacked["data"]["faces"].dtype == np.int32, "Faces dtype should be preserved"
+    # arrays must be views on the received buffer, not copies
+    assert unpacked["data"]["vertices"].base is not None, "Vertices should be a view on the received buffer"
@@ -0,0 +1,21 @@
+# stdlib imports
+import zlib
+
+# pip imports
+import numpy as np
+
+# local imports
+from gsp_network import NetworkRenderer
+
+
+def test_network_frame_to_rgba_raw_formats() -> None:
+    image_rgba = np.random.randint(0, 255, (12, 16, 4)).astype(np.uint8)
+    frame_shape = ",".join(str(dim) for dim in image_rgba.shape)
+
+    decoded_raw = NetworkRenderer.frame_to_rgba(image_rgba.tobytes(), "rgba", frame_shape)
+    assert decoded_raw.shape == (12, 16, 4) and decoded_raw.dtype == np.uint8
+    assert np.array_equal(decoded_raw, image_rgba)
+
+    frame_zlib = zlib.compress(image_rgba, level=NetworkRenderer.FRAME_ZLIB_LEVEL)
+    decoded_zlib = NetworkRenderer.frame_to_rgba(frame_zlib, "rgba_zlib", frame_shape)
+    assert np.array_equal(decoded_zlib, image_rgba)
@@ -0,0 +1,53 @@
+# pip imports
+import numpy as np
+
+# local imports
+import gsp
+from gsp_matplotlib import MatplotlibRenderer
+from gsp_matplotlib.renderer.renderer_pixels import MatplotlibRendererPixels
+
+
+def test_rasterize_density_bins_points_per_pixel() -> None:
+    # 3 points in the bottom-left pixel, 1 in the top-right pixel, 1 outside of the clip box
+    transformed_positions = np.array([[-0.9, -0.9], [-0.8, -0.8], [-0.9, -0.7], [0.9, 0.9], [1.5, 0.0]])
+    colors = np.array([[1.0, 0.0, 0.0, 1.0]])
+
+    density_rgba = MatplotlibRendererPixels.rasterize_density(transformed_positions, colors, width=4, height=4, norm="linear")
+    assert density_rgba.shape == (4, 4, 4)
+    assert density_rgba[0, 0, 3] == 1.0, "The densest pixel should be opaque"
+    assert np.isclose(density_rgba[3, 3, 3], 1.0 / 3.0)
+    assert np.count_nonzero(density_rgba[:, :, 3]) == 2, "Empty pixels should be transparent"
+    assert np.all(density_rgba[0, 0, :3] == (1.0, 0.0, 0.0))
+
+
+def test_matplotlib_renderer_pixels_density_threshold() -> None:
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64)
+    canvas.add(viewport)
+    pixels = gsp.visuals.Pixels(np.random.uniform(-0.5, 0.5, (100, 3)), np.full(100, 5.0), np.array([gsp.Constants.Red]))
+    viewport.add(pixels)
+    camera = gsp.core.Camera("perspective")
+    full_uuid = pixels.uuid + viewport.uuid
+
+    renderer = MatplotlibRenderer(pixels_density_threshold=50)
+    image_rgba = renderer.render_rgba(canvas, [viewport], [camera])
+    assert renderer._densityImages[full_uuid].get_visible()
+    assert not renderer._pathCollections[full_uuid].get_visible(), "The scatter plot should be hidden in density mode"
+    assert np.any(image_rgba[:, :, 1] < 255), "The points should be drawn"
+
+    # below the threshold, the scatter plot is used again
+    pixels.positions = pixels.positions[:10]
+    pixels.sizes = pixels.sizes[:10]
+    renderer.render_rgba(canvas, [viewport], [camera])
+    assert not renderer._densityImages[full_uuid].get_visible()
+    assert renderer._pathCollections[full_uuid].get_visible()
+
+
+def test_pixels_visible_mask() -> None:
+    transformed_positions = np.array([[0.0, 0.0, 0.0], [1.01, 0.0, 0.0], [3.0, 0.0, 0.0], [0.0, -3.0, 0.0], [0.5, 0.5, 0.0]])
+    sizes = np.full(5, 100.0)
+    positions_w = np.array([1.0, 1.0, 1.0, 1.0, -1.0])
+
+    visible_mask = MatplotlibRendererPixels.get_visible_mask(transformed_positions, sizes, positions_w, axes_width=100, axes_height=100, dpi=72)
+    # the point just outside the clip box is kept, as its marker overlaps the viewport
+    assert visible_mask.tolist() == [True, True, False, False, False]
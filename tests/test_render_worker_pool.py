@@ -0,0 +1,39 @@
+# stdlib imports
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+# pip imports
+import pytest
+
+# local imports
+from gsp_network.tools.render_worker_pool import RenderWorkerPool
+
+
+def test_render_worker_pool_sticky_routing() -> None:
+    render_worker_pool = RenderWorkerPool(worker_count=2, queue_depth=4)
+    try:
+        # the same client is always routed to the same worker process
+        worker_pids = {render_worker_pool.submit("client_a", os.getpid).result() for _ in range(4)}
+        assert len(worker_pids) == 1, "A client should always be routed to the same worker"
+        assert worker_pids != {os.getpid()}, "The task should run in a worker process"
+
+        # the routing is spread over the workers
+        worker_indexes = {render_worker_pool.get_worker_index(f"client_{index}") for index in range(20)}
+        assert worker_indexes == {0, 1}
+    finally:
+        render_worker_pool.shutdown()
+
+
+def test_render_worker_pool_restarts_dead_worker() -> None:
+    render_worker_pool = RenderWorkerPool(worker_count=1, queue_depth=4)
+    try:
+        worker_pid = render_worker_pool.submit("client_a", os.getpid).result()
+
+        # the worker process dies during a task
+        with pytest.raises(BrokenProcessPool):
+            render_worker_pool.submit("client_a", os._exit, 1).result()
+
+        # the next tasks run in a new worker process
+        assert render_worker_pool.submit("client_a", os.getpid).result() != worker_pid
+    finally:
+        render_worker_pool.shutdown()
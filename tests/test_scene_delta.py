@@ -0,0 +1,170 @@
+# stdlib imports
+import copy
+import json
+
+# pip imports
+import numpy as np
+
+# local imports
+import gsp
+from gsp.renderer.json import SceneDelta
+
+
+def build_scene() -> tuple[gsp.core.Canvas, gsp.core.Viewport, gsp.core.Camera, np.ndarray]:
+    canvas = gsp.core.Canvas(256, 256, 100)
+    viewport = gsp.core.Viewport(0, 0, 256, 256, gsp.Constants.White)
+    canvas.add(viewport)
+    camera = gsp.core.Camera("perspective")
+
+    positions = np.random.uniform(-0.5, 0.5, (100, 3)).astype(np.float32)
+    sizes = np.full(100, 5.0, dtype=np.float32)
+    colors = np.array([gsp.Constants.Green], dtype=np.float32)
+    viewport.add(gsp.visuals.Pixels(positions, sizes, colors))
+    return canvas, viewport, camera, positions
+
+
+def test_scene_delta_unchanged_scene() -> None:
+    canvas, viewport, camera, _ = build_scene()
+    json_renderer = gsp.renderer.JsonRenderer()
+    scene_dict1 = json_renderer.render(canvas, [viewport], [camera])
+    scene_dict2 = json_renderer.render(canvas, [viewport], [camera])
+
+    assert SceneDelta.diff(scene_dict1, scene_dict2) == [], "No operation expected for an unchanged scene"
+
+
+def test_scene_delta_row_patch() -> None:
+    canvas, viewport, camera, positions = build_scene()
+    json_renderer = gsp.renderer.JsonRenderer()
+    scene_dict1 = json_renderer.render(canvas, [viewport], [camera])
+
+    # modify 2 consecutive points
+    positions[10:12] = 0.25
+    scene_dict2 = json_renderer.render(canvas, [viewport], [camera])
+
+    scene_delta = SceneDelta.diff(scene_dict1, scene_dict2)
+    assert len(scene_delta) == 1
+    assert scene_delta[0]["op"] == "patch_visual_attr"
+    assert scene_delta[0]["key"] == "positions"
+    assert (scene_delta[0]["start"], scene_delta[0]["stop"]) == (10, 12)
+
+    # apply the delta on a JSON copy of the old scene, as the server does
+    server_scene = json.loads(json.dumps(scene_dict1))
+    server_scene = SceneDelta.apply(server_scene, json.loads(json.dumps(scene_delta)))
+    assert server_scene == json.loads(json.dumps(scene_dict2))
+
+
+def test_scene_delta_add_remove_visuals() -> None:
+    canvas, viewport, camera, _ = build_scene()
+    json_renderer = gsp.renderer.JsonRenderer()
+    scene_dict1 = json_renderer.render(canvas, [viewport], [camera])
+
+    # add a new visual, remove the old one, and change the viewport background
+    old_visual = viewport.visuals[0]
+    viewport.add(gsp.visuals.Pixels(np.zeros((3, 3)), np.ones(3), np.array([gsp.Constants.Red])))
+    viewport.remove(old_visual)
+    viewport.background_color = gsp.Constants.Black
+    scene_dict2 = json_renderer.render(canvas, [viewport], [camera])
+
+    scene_delta = SceneDelta.diff(scene_dict1, scene_dict2)
+    server_scene = SceneDelta.apply(copy.deepcopy(scene_dict1), scene_delta)
+    assert server_scene == scene_dict2
+
+
+def test_scene_delta_parser_reuses_unchanged_objects() -> None:
+    canvas, viewport, camera, positions = build_scene()
+    pixels2 = gsp.visuals.Pixels(np.zeros((10, 3)), np.ones(10), np.array([gsp.Constants.Red]))
+    viewport.add(pixels2)
+    json_renderer = gsp.renderer.JsonRenderer()
+    json_parser = gsp.renderer.JsonParser(reuse_objects=True)
+
+    # the server keeps the scene up to date with the deltas
+    server_scene = json.loads(json.dumps(json_renderer.render(canvas, [viewport], [camera])))
+    _, viewports_parsed1, cameras_parsed1 = json_parser.parse(server_scene)
+    visuals_parsed1 = list(viewports_parsed1[0].visuals)
+    colors_parsed1 = visuals_parsed1[0].colors
+    version1 = visuals_parsed1[0].get_version()
+
+    old_scene_dict = json_renderer.render(canvas, [viewport], [camera])
+    positions[10:12] = 0.25
+    scene_delta = SceneDelta.diff(old_scene_dict, json_renderer.render(canvas, [viewport], [camera]))
+    server_scene = SceneDelta.apply(server_scene, json.loads(json.dumps(scene_delta)))
+    _, viewports_parsed2, cameras_parsed2 = json_parser.parse(server_scene)
+
+    assert viewports_parsed2[0] is viewports_parsed1[0], "The unchanged viewport should be reused"
+    assert cameras_parsed2[0] is cameras_parsed1[0], "The unchanged camera should be reused"
+    assert viewports_parsed2[0].visuals[1] is visuals_parsed1[1], "The unchanged visual should be reused"
+    assert viewports_parsed2[0].visuals[0] is visuals_parsed1[0], "The patched visual should be updated in place"
+    assert visuals_parsed1[0].colors is colors_parsed1, "Only the patched attribute should be parsed again"
+    assert visuals_parsed1[0].get_version() != version1, "The patched visual should get a new version"
+    assert np.allclose(viewports_parsed2[0].visuals[0].positions, positions)
+
+
+def test_scene_delta_patch_in_place() -> None:
+    # a read-only array, as decoded from a multipart request body
+    received_positions = np.zeros((100, 3), dtype=np.float32)
+    received_positions.flags.writeable = False
+    scene_dict = {"canvas": {"cameras": [], "viewports": [{"uuid": "viewport", "visuals": [{"uuid": "visual", "positions": {"type": "ndarray", "data": received_positions}}]}]}}
+
+    owned_arrays: dict = {}
+
+    def patch_rows(start: int, value: float) -> np.ndarray:
+        operation = {"op": "patch_visual_attr", "viewport_uuid": "viewport", "visual_uuid": "visual", "key": "positions", "start": start, "stop": start + 2, "rows": np.full((2, 3), value)}
+        SceneDelta.apply(scene_dict, [operation], owned_arrays)
+        return scene_dict["canvas"]["viewports"][0]["visuals"][0]["positions"]["data"]
+
+    # the received array is copied at the first patch only, the next patches are in place in the copy
+    positions1 = patch_rows(10, 1.0)
+    positions2 = patch_rows(20, 2.0)
+    assert np.all(received_positions == 0), "The received array should not be modified"
+    assert positions2 is not positions1, "A patched attribute should be a new object"
+    assert positions2.base is positions1.base, "The next patches should be in place, without copy"
+    assert np.all(positions2[10:12] == 1.0) and np.all(positions2[20:22] == 2.0)
+
+    # the ownership belongs to the scene - another scene sharing the array copies it
+    other_scene_dict = {"canvas": {"cameras": [], "viewports": [{"uuid": "viewport", "visuals": [{"uuid": "visual", "positions": {"type": "ndarray", "data": positions2}}]}]}}
+    operation = {"op": "patch_visual_attr", "viewport_uuid": "viewport", "visual_uuid": "visual", "key": "positions", "start": 30, "stop": 32, "rows": np.full((2, 3), 3.0)}
+    SceneDelta.apply(other_scene_dict, [operation])
+    assert np.all(positions2[30:32] == 0.0), "An array not owned by the scene should not be patched in place"
+
+    # a replaced attribute is not owned anymore
+    SceneDelta.apply(scene_dict, [{"op": "set_visual_attr", "viewport_uuid": "viewport", "visual_uuid": "visual", "key": "positions", "value": {"type": "ndarray", "data": received_positions}}], owned_arrays)
+    assert owned_arrays == {}
+
+
+def test_scene_delta_several_row_ranges() -> None:
+    canvas, viewport, camera, positions = build_scene()
+    json_renderer = gsp.renderer.JsonRenderer()
+    scene_dict1 = json_renderer.render(canvas, [viewport], [camera])
+
+    # modify the first and the last points
+    positions[0] = 0.25
+    positions[-1] = 0.25
+    scene_dict2 = json_renderer.render(canvas, [viewport], [camera])
+
+    scene_delta = SceneDelta.diff(scene_dict1, scene_dict2)
+    assert [(operation["op"], operation["start"], operation["stop"]) for operation in scene_delta] == [("patch_visual_attr", 0, 1), ("patch_visual_attr", 99, 100)]
+
+    server_scene = SceneDelta.apply(json.loads(json.dumps(scene_dict1)), json.loads(json.dumps(scene_delta)))
+    assert server_scene == json.loads(json.dumps(scene_dict2))
+
+
+def test_scene_delta_skips_unchanged_attributes_by_identity() -> None:
+    canvas, viewport, camera, _ = build_scene()
+    pixels = viewport.visuals[0]
+    pixels.positions.flags.writeable = False
+    json_renderer = gsp.renderer.JsonRenderer()
+    scene_dict1 = json_renderer.render(canvas, [viewport], [camera])
+    scene_dict2 = json_renderer.render(canvas, [viewport], [camera])
+
+    # a read-only attribute can not change in place - its JSON is reused, and the diff does not compare it
+    visual_dict1 = scene_dict1["canvas"]["viewports"][0]["visuals"][0]
+    visual_dict2 = scene_dict2["canvas"]["viewports"][0]["visuals"][0]
+    assert visual_dict2["positions"] is visual_dict1["positions"]
+    assert visual_dict2["sizes"] is not visual_dict1["sizes"], "A writeable np.ndarray attribute should be serialized again"
+    assert SceneDelta.diff(scene_dict1, scene_dict2) == []
+
+    # an assignment serializes the attribute again
+    pixels.positions = np.zeros((100, 3), dtype=np.float32)
+    scene_dict3 = json_renderer.render(canvas, [viewport], [camera])
+    assert scene_dict3["canvas"]["viewports"][0]["visuals"][0]["positions"] is not visual_dict1["positions"]
+    assert [operation["key"] for operation in SceneDelta.diff(scene_dict2, scene_dict3)] == ["positions"]
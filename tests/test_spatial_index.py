@@ -0,0 +1,64 @@
+# pip imports
+import numpy as np
+
+# local imports
+import gsp
+from gsp.types import DiffableNdarray, SpatialIndex
+
+
+def test_spatial_index_queries_match_brute_force() -> None:
+    rng = np.random.default_rng(0)
+    positions = rng.normal(size=(20_000, 3))
+    spatial_index = SpatialIndex(positions)
+
+    for point in rng.normal(size=(10, 3)):
+        result = spatial_index.query_nearest(point)
+        assert result is not None
+        distances = np.linalg.norm(positions - point, axis=1)
+        assert np.isclose(result[1], distances.min())
+
+        bbox_min, bbox_max = point - 0.2, point + 0.2
+        expected_indices = np.flatnonzero(np.all((positions >= bbox_min) & (positions <= bbox_max), axis=1))
+        assert np.array_equal(spatial_index.query_bbox(bbox_min, bbox_max), expected_indices)
+
+    assert spatial_index.query_nearest(np.array([10.0, 10.0, 10.0]), max_distance=1.0) is None
+
+
+def test_spatial_index_incremental_sync() -> None:
+    rng = np.random.default_rng(1)
+    positions = DiffableNdarray(rng.uniform(-1, 1, (5_000, 3)))
+    spatial_index = SpatialIndex(positions)
+
+    # move a few rows inside the grid - the index is updated in place
+    positions[100:150] = rng.uniform(-0.5, 0.5, (50, 3))
+    assert not spatial_index.is_synced(positions)
+    assert spatial_index.sync(positions) is spatial_index
+    assert spatial_index.is_synced(positions)
+    for point in rng.uniform(-1, 1, (10, 3)):
+        result = spatial_index.query_nearest(point)
+        assert result is not None and np.isclose(result[1], np.linalg.norm(positions - point, axis=1).min())
+
+    # move rows one by one - the moved points are found in their new cell, not in the old one
+    for row in range(200, 220):
+        positions[row] = rng.uniform(-1, 1, 3)
+        assert spatial_index.sync(positions) is spatial_index
+    for point in rng.uniform(-1, 1, (10, 3)):
+        bbox_min, bbox_max = point - 0.3, point + 0.3
+        expected_indices = np.flatnonzero(np.all((positions >= bbox_min) & (positions <= bbox_max), axis=1))
+        assert np.array_equal(spatial_index.query_bbox(bbox_min, bbox_max), expected_indices)
+
+    # move a row outside the grid - the index is built again
+    positions[0] = 5.0
+    rebuilt_index = spatial_index.sync(positions)
+    assert rebuilt_index is not spatial_index
+    assert rebuilt_index.query_nearest(np.array([5.0, 5.0, 5.0])) == (0, 0.0)
+
+
+def test_visual_spatial_index_is_cached() -> None:
+    positions = np.random.uniform(-0.5, 0.5, (1_000, 3)).astype(np.float32)
+    pixels = gsp.visuals.Pixels(positions, np.ones(1_000), np.array([gsp.Constants.Green]))
+
+    spatial_index = pixels.get_spatial_index()
+    assert pixels.get_spatial_index() is spatial_index, "The unchanged positions should reuse the index"
+    positions[0] = 2.0
+    assert pixels.get_spatial_index().query_nearest(np.array([2.0, 2.0, 2.0])) == (0, 0.0)
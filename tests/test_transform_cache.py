@@ -0,0 +1,95 @@
+# pip imports
+import numpy as np
+import pytest
+
+# local imports
+from gsp.transform import TransformLinkBase, TransformLinkImmediate, TransformLinkLambda
+from gsp.types import DiffableNdarray
+
+
+class TransformLinkCounter(TransformLinkBase):
+    """Add 1 to the input, and count the runs"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.run_count = 0
+
+    def _run(self, np_array: np.ndarray) -> np.ndarray:
+        self.run_count += 1
+        return np_array + 1
+
+    def _to_json(self) -> dict:
+        return {"type": "TransformLinkCounter"}
+
+
+def test_transform_chain_runs_only_downstream_of_a_change() -> None:
+    input_array = DiffableNdarray(np.zeros((10, 3)))
+    link_head = TransformLinkImmediate(input_array)
+    counter_link = TransformLinkCounter()
+    link_head.chain(counter_link).chain(TransformLinkLambda("lambda x: x * 2"))
+
+    output_array = link_head.run()
+    assert np.array_equal(output_array, np.full((10, 3), 2.0))
+    assert link_head.run() is output_array, "An unchanged chain should return its cached output"
+    assert counter_link.run_count == 1
+
+    # a write to the input runs the chain again
+    input_array[0] = 1.0
+    assert np.array_equal(link_head.run()[0], [4.0, 4.0, 4.0])
+    assert counter_link.run_count == 2
+
+    # an explicit invalidation runs the links downstream of it
+    counter_link.invalidate()
+    link_head.run()
+    assert counter_link.run_count == 3
+
+
+def test_transform_cache_memory_cap() -> None:
+    cache_max_bytes = TransformLinkBase.CACHE_MAX_BYTES
+    try:
+        TransformLinkBase.CACHE_MAX_BYTES = 10_000
+        # read-only inputs, so the outputs are cached
+        input_arrays = [np.zeros(500) for _ in range(4)]
+        for input_array in input_arrays:
+            input_array.flags.writeable = False
+        link_heads = [TransformLinkImmediate(input_array) for input_array in input_arrays]
+        for link_head in link_heads:
+            link_head.chain(TransformLinkCounter())
+            link_head.run()
+            assert 0 < TransformLinkBase.get_cache_bytes() <= TransformLinkBase.CACHE_MAX_BYTES
+    finally:
+        TransformLinkBase.CACHE_MAX_BYTES = cache_max_bytes
+        TransformLinkBase.clear_cache()
+    assert TransformLinkBase.get_cache_bytes() == 0
+
+
+def test_transform_cached_output_is_read_only() -> None:
+    input_array = np.zeros((10, 3))
+    link_head = TransformLinkImmediate(input_array)
+    link_head.chain(TransformLinkLambda("lambda x: x * 2")).chain(TransformLinkLambda("lambda x: x + 1"))
+
+    output_array = link_head.run()
+    with pytest.raises(ValueError):
+        output_array[0, 0] = 100.0
+    assert np.array_equal(link_head.run(), np.ones((10, 3))), "The cached output should not be modified by the caller"
+    assert input_array.flags.writeable, "The input array of the caller should stay writeable"
+
+
+def test_transform_writeable_input_is_not_cached() -> None:
+    # a writeable np.ndarray input can be modified in place without notice - the chain runs at each .run()
+    input_array = np.zeros((10, 3))
+    link_head = TransformLinkImmediate(input_array)
+    counter_link = TransformLinkCounter()
+    link_head.chain(counter_link)
+    link_head.run()
+    input_array[0] = 5.0
+    assert np.array_equal(link_head.run()[0], [6.0, 6.0, 6.0])
+    assert counter_link.run_count == 2
+    assert link_head.get_fingerprint() is None
+
+    # a read-only input can not change - the output is cached
+    input_array.flags.writeable = False
+    link_head.run()
+    link_head.run()
+    assert counter_link.run_count == 3
+    assert link_head.get_fingerprint() is not None
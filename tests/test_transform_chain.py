@@ -1,6 +1,6 @@
 import numpy as np
 import pytest
-from gsp.transform import TransformLinkImmediate, TransformLinkAssertShape, TransformLinkLambda
+from gsp.transform import TransformLinkImmediate, TransformLinkAssertShape, TransformLinkLambda, TransformLinkLoad, TransformPlan
 
 
 def test_transformchain_math_op_add():
@@ -36,3 +36,66 @@ def test_transformchain_lambdaFunc():
 def test_transformchain_empty_init():
     result = TransformLinkImmediate(np.array([])).run()
     assert isinstance(result, np.ndarray) and result.size == 0
+
+
+def test_transformchain_fused_elementwise_links():
+    arr = np.array([[1, 2, 3], [4, 5, 6]])
+    link_head = TransformLinkImmediate(arr)
+    lambda_sources = ["lambda x: x * 2", "lambda x: 1 + x", "lambda x: x / 2", "lambda x: np.sqrt(x)", "lambda x: -x"]
+    last_link = link_head
+    for lambda_source in lambda_sources:
+        last_link = last_link.chain(TransformLinkLambda(lambda_source))
+    last_link.chain(TransformLinkAssertShape((2, 3)))
+
+    # the 5 lambdas are fused in a single step
+    chain_links = [link_head]
+    while chain_links[-1].next_transform is not None:
+        chain_links.append(chain_links[-1].next_transform)
+    assert [len(step) for step in TransformPlan.get_steps(chain_links)] == [1, 5, 1]
+
+    # same result as step by step - including the integer to float promotion - and the input is untouched
+    np.testing.assert_allclose(link_head.run(), -np.sqrt((1 + arr * 2) / 2))
+    np.testing.assert_array_equal(arr, [[1, 2, 3], [4, 5, 6]])
+
+
+def test_transformchain_opaque_lambda_not_fused():
+    assert TransformLinkLambda("lambda x: x[::-1]")._get_elementwise_op() is None
+    assert TransformLinkLambda("lambda x: np.clip(x, 0, 1)")._get_elementwise_op() is None
+    assert TransformLinkLambda("lambda x: x ** 2")._get_elementwise_op() is not None
+
+
+def test_transformchain_run_chunks_from_memory_mapped_file(tmp_path):
+    arr = np.arange(30, dtype=np.float64).reshape(10, 3)
+    np.save(tmp_path / "data.npy", arr)
+    link_head = TransformLinkLoad((tmp_path / "data.npy").as_uri())
+    link_head.chain(TransformLinkLambda("lambda x: x * 2")).chain(TransformLinkLambda("lambda x: x + 1")).chain(TransformLinkAssertShape((10, 3)))
+
+    chunks = list(link_head.run_chunks(chunk_rows=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate(chunks), arr * 2 + 1)
+    np.testing.assert_array_equal(link_head.reduce_chunks(np.maximum, chunk_rows=4), (arr * 2 + 1).max(axis=0))
+
+
+def test_transformchain_run_chunks_rejects_non_streamable_chains():
+    arr = np.zeros((10, 3))
+    # the shape assertion is checked on the full shape, before any chunk is read
+    with pytest.raises(ValueError):
+        TransformLinkImmediate(arr).chain(TransformLinkAssertShape((5, 3))).run_chunks(chunk_rows=4)
+    # a reduction is not row-independent
+    with pytest.raises(ValueError):
+        TransformLinkImmediate(arr).chain(TransformLinkLambda("lambda x: x.sum(axis=0)")).run_chunks(chunk_rows=4)
+
+
+def test_transformchain_load_memory_mapped(tmp_path):
+    positions = np.arange(30, dtype=np.float32).reshape(10, 3)
+    np.save(tmp_path / "positions.npy", positions)
+    np.savez(tmp_path / "scene.npz", positions=positions, sizes=np.ones(10))
+
+    for data_url in [(tmp_path / "positions.npy").as_uri(), str(tmp_path / "scene.npz") + "#positions"]:
+        result = TransformLinkLoad(data_url).run()
+        assert isinstance(result, np.memmap), "Local files should be memory-mapped"
+        np.testing.assert_array_equal(result, positions)
+
+    # a .npz file with several members needs the member name
+    with pytest.raises(ValueError):
+        TransformLinkLoad(str(tmp_path / "scene.npz")).run()
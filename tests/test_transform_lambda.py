@@ -0,0 +1,24 @@
+# pip imports
+import numpy as np
+import pytest
+
+# local imports
+from gsp.transform import TransformLinkImmediate, TransformLinkLambda, TransformSerialisation
+
+
+def test_transform_lambda_compiled_once() -> None:
+    lambda_source = "lambda x: np.sqrt(x) + abs(-1)"
+    assert TransformLinkLambda.compile_lambda(lambda_source) is TransformLinkLambda.compile_lambda(lambda_source)
+
+    # a deserialized chain shares the compiled function, and gives the same output
+    link_head = TransformLinkImmediate(np.array([4.0, 9.0]))
+    link_head.chain(TransformLinkLambda(lambda_source))
+    link_head_parsed = TransformSerialisation.from_json(TransformSerialisation.to_json(link_head))
+    assert np.array_equal(link_head.run(), [3.0, 4.0])
+    assert np.array_equal(link_head_parsed.run(), [3.0, 4.0])
+
+
+@pytest.mark.parametrize("lambda_source", ["x + 1", "lambda x: x.__class__", "lambda x: __import__('os')", "lambda x:"])
+def test_transform_lambda_rejects_invalid_sources(lambda_source: str) -> None:
+    with pytest.raises(ValueError):
+        TransformLinkLambda(lambda_source)
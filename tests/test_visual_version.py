@@ -0,0 +1,123 @@
+# pip imports
+import numpy as np
+import pytest
+
+# local imports
+import gsp
+from gsp.types import DiffableNdarray
+from gsp_matplotlib import MatplotlibRenderer
+from gsp_matplotlib.renderer.renderer_mesh import MatplotlibRendererMesh
+from gsp_matplotlib.renderer.renderer_pixels import MatplotlibRendererPixels
+
+
+def test_visual_version_changes_on_modifications() -> None:
+    positions = DiffableNdarray(np.zeros((10, 3), dtype=np.float32))
+    sizes = DiffableNdarray(np.ones(10, dtype=np.float32))
+    colors = np.array([gsp.Constants.Red])
+    colors.flags.writeable = False
+    pixels = gsp.visuals.Pixels(positions, sizes, colors)
+
+    version = pixels.get_version()
+    assert version is not None and pixels.get_version() == version, "An unchanged visual should keep its version"
+
+    positions[3] = 1.0
+    assert pixels.get_version() != version, "A DiffableNdarray write should change the version"
+    version = pixels.get_version()
+
+    pixels.colors = np.array([gsp.Constants.Green])
+    assert pixels.get_version() is None, "A writeable np.ndarray attribute should not be tracked by default"
+
+    pixels.colors.flags.writeable = False
+    assert pixels.get_version() != version, "An attribute assignment should change the version"
+
+
+def test_visual_version_ndarray_checksum() -> None:
+    sizes = np.ones(10, dtype=np.float32)
+    pixels = gsp.visuals.Pixels(DiffableNdarray(np.zeros((10, 3), dtype=np.float32)), sizes, np.array([gsp.Constants.Red]))
+    try:
+        gsp.core.VisualBase.NDARRAY_CHECKSUM_ENABLED = True
+        version = pixels.get_version()
+        assert version is not None and pixels.get_version() == version
+
+        sizes[2] = 5.0
+        assert pixels.get_version() != version, "An in-place write to a np.ndarray should change the checksum version"
+    finally:
+        gsp.core.VisualBase.NDARRAY_CHECKSUM_ENABLED = False
+
+
+def test_camera_and_viewport_versions() -> None:
+    camera = gsp.core.Camera("perspective")
+    camera_version = camera.get_version()
+    assert camera.get_version() == camera_version
+    camera.set_position(np.array([0.0, 0.0, 2.0]))
+    assert camera.get_version() != camera_version
+
+    viewport = gsp.core.Viewport(0, 0, 64, 64)
+    viewport_version = viewport.get_version()
+    viewport.background_color = gsp.Constants.Black
+    assert viewport.get_version() != viewport_version
+
+
+def test_matplotlib_renderer_skips_unchanged_visuals(monkeypatch: pytest.MonkeyPatch) -> None:
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64, gsp.Constants.White)
+    canvas.add(viewport)
+    camera = gsp.core.Camera("perspective")
+    pixels_list = [gsp.visuals.Pixels(DiffableNdarray(np.random.uniform(-0.5, 0.5, (20, 3))), DiffableNdarray(np.full(20, 5.0)), DiffableNdarray(np.array([gsp.Constants.Green]))) for _ in range(2)]
+    for pixels in pixels_list:
+        viewport.add(pixels)
+
+    rendered_pixels: list[gsp.visuals.Pixels] = []
+    original_render = MatplotlibRendererPixels.render
+
+    def counting_render(renderer, axes, pixels, full_uuid, camera) -> bool:
+        rendered_pixels.append(pixels)
+        return original_render(renderer, axes, pixels, full_uuid=full_uuid, camera=camera)
+
+    monkeypatch.setattr(MatplotlibRendererPixels, "render", counting_render)
+    renderer = MatplotlibRenderer()
+    renderer.render_rgba(canvas, [viewport], [camera])
+    assert rendered_pixels == pixels_list
+
+    # only the modified visual is processed again
+    rendered_pixels.clear()
+    pixels_list[1].positions[0] = 0.0
+    renderer.render_rgba(canvas, [viewport], [camera])
+    assert rendered_pixels == [pixels_list[1]]
+
+    # a camera change processes all the visuals
+    rendered_pixels.clear()
+    camera.set_position(np.array([0.0, 0.0, 2.0]))
+    renderer.render_rgba(canvas, [viewport], [camera])
+    assert rendered_pixels == pixels_list
+
+
+def test_matplotlib_renderer_skips_unchanged_mesh(monkeypatch: pytest.MonkeyPatch) -> None:
+    canvas = gsp.core.Canvas(64, 64, 100)
+    viewport = gsp.core.Viewport(0, 0, 64, 64, gsp.Constants.White)
+    canvas.add(viewport)
+    camera = gsp.core.Camera("perspective")
+    vertices_coords = np.array([[-0.5, -0.5, 0.0], [0.5, -0.5, 0.0], [0.0, 0.5, 0.0]])
+    vertices_coords.flags.writeable = False
+    face_indices = np.array([[0, 1, 2]])
+    face_indices.flags.writeable = False
+    mesh = gsp.visuals.Mesh(vertices_coords, face_indices, facecolors="red", culling_mode="all")
+    viewport.add(mesh)
+    assert mesh.get_version() is not None, "A mesh with read-only arrays should be tracked, whatever its colors"
+
+    rendered_meshes: list[gsp.visuals.Mesh] = []
+    original_render = MatplotlibRendererMesh.render
+
+    def counting_render(renderer, axes, mesh, full_uuid, camera) -> None:
+        rendered_meshes.append(mesh)
+        return original_render(renderer, axes, mesh, full_uuid=full_uuid, camera=camera)
+
+    monkeypatch.setattr(MatplotlibRendererMesh, "render", counting_render)
+    renderer = MatplotlibRenderer()
+    renderer.render_rgba(canvas, [viewport], [camera])
+    renderer.render_rgba(canvas, [viewport], [camera])
+    assert rendered_meshes == [mesh], "An unchanged mesh under an unchanged camera should be skipped"
+
+    mesh.facecolors = gsp.visuals.Mesh.to_rgba_colors("blue")
+    renderer.render_rgba(canvas, [viewport], [camera])
+    assert rendered_meshes == [mesh, mesh]
@@ -15,7 +15,10 @@ from gsp_network import ServerSample
 if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Run the network server for rendering. see ./examples/network_client.py for usage.")
+    parser.add_argument("--workers", type=int, default=0, help="Number of render worker processes. 0 to render in the server process")
+    parser.add_argument("--queue-depth", type=int, default=8, help="Maximum number of pending requests per worker")
+    parser.add_argument("--max-array-mb", type=int, default=512, help="Memory budget for the DiffableNdarray received from all the clients, in MB")
     args = parser.parse_args()
 
-    server = ServerSample()
+    server = ServerSample(worker_count=args.workers, queue_depth=args.queue_depth, max_array_mb=args.max_array_mb)
     server.run()